@@ -1,55 +1,64 @@
 """
 Auction logic for reverse auctions.
 """
-from typing import List
-from .models import Seller, Point, Bid, Geocoder
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import time
+
+from .models import Seller, Point, Bid, BidSet, Geocoder
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns, price_columns_anytime
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
 
 
 def run_reverse_auction(
     sellers: List[Seller],
     buyer_location: Point,
     quantity_tons: float,
-):
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    deadline_ms: Optional[float] = None,
+) -> Tuple[Bid, BidSet]:
     """
     Simple reverse auction: each seller submits a price; lowest net price wins.
+
+    Bids are priced by the batch kernel (same values as Seller.quote_price)
+    into a BidSet, which behaves like a list of Bid but only creates Bid
+    objects for the elements that are accessed.
+
+    With a deadline, sellers are priced cheapest-lower-bound first and the
+    auction stops once no remaining seller can win or the budget runs out.
+    The budget starts when this function is called, so building the seller
+    columns counts against it.
+    all_bids then only holds the evaluated sellers; all_bids.exact says
+    whether the winner is guaranteed optimal, and all_bids.max_gap_per_ton
+    bounds how much cheaper the true winner could be.
     
     Args:
         sellers: List of Seller objects
         buyer_location: Point representing buyer's location
         quantity_tons: Quantity of steel to purchase in tons
+        network: Optional TransportNetwork for routed (multimodal) logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+        deadline_ms: Optional latency budget for anytime evaluation
         
     Returns:
-        Tuple of (winning_bid, all_bids)
+        Tuple of (winning_bid, all_bids); all_bids is a BidSet
     """
-    bids: List[Bid] = []
-
-    for s in sellers:
-        quote = s.quote_price(
-            buyer_location=buyer_location,
-            quantity_tons=quantity_tons,
-        )
-        bid = Bid(
-            seller=s,
-            distance_km=quote["distance_km"],
-            transport_mode=quote["transport_mode"],
-            cost_per_ton=quote["cost_per_ton"],
-            risk_buffer_per_ton=quote["risk_buffer_per_ton"],
-            offer_price_per_ton=quote["offer_price_per_ton"],
-            gross_total_undiscounted=quote["gross_total_undiscounted"],
-            volume_discount_pct=quote["volume_discount_pct"],
-            volume_discount_total=quote["volume_discount_total"],
-            gross_total=quote["gross_total"],
-            is_eaf=quote["is_eaf"],
-            eaf_discount_total=quote["eaf_discount_total"],
-            net_price_per_ton=quote["net_price_per_ton"],
-            net_total=quote["net_total"],
-            quantity_tons=quantity_tons,
+    start = time.perf_counter()
+    cols = SellerColumns.from_sellers(sellers)
+    terms = cols.terms_for(policy)
+    if deadline_ms is None:
+        bids = price_columns(cols, buyer_location, quantity_tons, network, terms)
+    else:
+        remaining_ms = deadline_ms - (time.perf_counter() - start) * 1000.0
+        bids = price_columns_anytime(
+            cols, buyer_location, quantity_tons, max(remaining_ms, 0.0), network, terms,
         )
-        bids.append(bid)
 
     # Winner is the lowest net price per ton
-    winning_bid = min(bids, key=lambda b: b.net_price_per_ton)
-    return winning_bid, bids
+    return bids.winner, bids
 
 
 def run_reverse_auction_for_address(
@@ -57,7 +66,9 @@ def run_reverse_auction_for_address(
     buyer_address: str,
     geocoder: Geocoder,
     quantity_tons: float,
-):
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+) -> Tuple[Bid, BidSet]:
     """
     Convenience wrapper: take a buyer address string, geocode it,
     then run the auction.
@@ -67,14 +78,18 @@ def run_reverse_auction_for_address(
         buyer_address: String address to geocode
         geocoder: Geocoder instance
         quantity_tons: Quantity of steel to purchase in tons
+        network: Optional TransportNetwork for routed (multimodal) logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
         
     Returns:
-        Tuple of (winning_bid, all_bids)
+        Tuple of (winning_bid, all_bids); all_bids is a BidSet
     """
     buyer_location = geocoder.geocode(buyer_address)
     return run_reverse_auction(
         sellers=sellers,
         buyer_location=buyer_location,
         quantity_tons=quantity_tons,
+        network=network,
+        policy=policy,
     )
 
@@ -0,0 +1,284 @@
+"""
+Streaming bulk pricing of order files.
+
+Orders (CSV or JSONL, one per row, with an address or lat/lon and a quantity)
+are read in chunks. Each chunk's distinct addresses are geocoded once in the
+parent process, then the chunk is priced by a worker process with the batch
+kernel and written out before later chunks are read, so memory is bounded
+by the number of chunks in flight rather than the size of the file.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple, TYPE_CHECKING
+import csv
+import json
+import os
+import time
+
+from .models import Seller, Point, Geocoder, TRANSPORT_MODES
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+RESULT_FIELDS = (
+    "id", "winner", "transport_mode", "distance_km", "net_price_per_ton", "net_total", "error",
+)
+
+# (id, lat, lon, quantity_tons) or (id, None, None, error) for rows that failed to parse / geocode
+OrderRow = Tuple[str, Optional[float], Optional[float], Any]
+
+# Geocoded addresses kept across chunks; cleared when full to keep memory bounded
+GEOCODE_CACHE_MAX = 100_000
+
+
+@dataclass
+class BulkStats:
+    rows: int = 0
+    errors: int = 0
+    started: float = 0.0
+
+    @property
+    def elapsed_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_s(self) -> float:
+        elapsed = self.elapsed_s
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+# ---------- READING ----------
+
+def read_orders(f: TextIO, fmt: str) -> Iterator[Dict[str, Any]]:
+    """Yield raw order dicts from a CSV (with header) or JSONL stream."""
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    elif fmt == "jsonl":
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown order file format {fmt!r} (expected csv or jsonl)")
+
+
+def _blank(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _chunks(orders: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk: List[Dict[str, Any]] = []
+    for order in orders:
+        chunk.append(order)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def resolve_chunk(
+    orders: Sequence[Dict[str, Any]],
+    geocoder: Geocoder,
+    cache: Dict[str, Optional[Point]],
+    first_row: int,
+) -> List[OrderRow]:
+    """
+    Turn raw orders into (id, lat, lon, quantity) rows, geocoding each
+    distinct address once per chunk (and at most once per run via `cache`).
+    Rows that cannot be resolved carry their error message instead of a quantity.
+    """
+    pending = {
+        o["address"].strip().lower() for o in orders
+        if _blank(o.get("lat")) and not _blank(o.get("address"))
+    }
+    pending -= cache.keys()
+    if len(cache) + len(pending) > GEOCODE_CACHE_MAX:
+        cache.clear()
+        pending = {
+            o["address"].strip().lower() for o in orders
+            if _blank(o.get("lat")) and not _blank(o.get("address"))
+        }
+    if pending:
+        geocode_many = getattr(geocoder, "geocode_many", None)
+        if geocode_many is not None:
+            found = geocode_many(sorted(pending))
+            for key in pending:
+                cache[key] = found.get(key)
+        else:
+            for key in pending:
+                try:
+                    cache[key] = geocoder.geocode(key)
+                except KeyError:
+                    cache[key] = None
+
+    rows: List[OrderRow] = []
+    for n, o in enumerate(orders, start=first_row):
+        order_id = str(o.get("id") or n)
+        try:
+            qty = float(o.get("quantity_tons") or o.get("quantity") or "")
+            if qty <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            rows.append((order_id, None, None, "quantity must be a positive number"))
+            continue
+        if not _blank(o.get("lat")) and not _blank(o.get("lon")):
+            try:
+                rows.append((order_id, float(o["lat"]), float(o["lon"]), qty))
+            except (TypeError, ValueError):
+                rows.append((order_id, None, None, "lat/lon must be numbers"))
+            continue
+        if _blank(o.get("address")):
+            rows.append((order_id, None, None, "either address or lat/lon must be provided"))
+            continue
+        point = cache.get(o["address"].strip().lower())
+        if point is None:
+            rows.append((order_id, None, None, f"unknown address {o['address']!r}"))
+        else:
+            rows.append((order_id, point.lat, point.lon, qty))
+    return rows
+
+
+# ---------- PRICING (runs in worker processes) ----------
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(
+    sellers: Sequence[Seller],
+    network: Optional["TransportNetwork"],
+    policy: CompiledPolicy,
+) -> None:
+    cols = SellerColumns.from_sellers(sellers)
+    _worker_state.update(cols=cols, network=network, terms=cols.terms_for(policy))
+
+
+def price_chunk(rows: Sequence[OrderRow]) -> List[Dict[str, Any]]:
+    """Winning bid per resolved row, in the shape of RESULT_FIELDS."""
+    cols = _worker_state["cols"]
+    network = _worker_state["network"]
+    terms = _worker_state["terms"]
+    out = []
+    for order_id, lat, lon, qty in rows:
+        if lat is None:
+            out.append({"id": order_id, "error": qty})
+            continue
+        bids = price_columns(cols, Point(lat, lon), qty, network, terms)
+        i = bids.winner_index
+        out.append({
+            "id": order_id,
+            "winner": bids.sellers[i].name,
+            "transport_mode": TRANSPORT_MODES[bids.mode_codes[i]],
+            "distance_km": round(bids.distance_km[i], 3),
+            "net_price_per_ton": round(bids.net_price_per_ton[i], 4),
+            "net_total": round(bids.net_total[i], 2),
+        })
+    return out
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted work immediately; used for workers=1 to avoid process overhead."""
+    def submit(self, fn, *args, **kwargs):  # type: ignore[override]
+        future: Future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+# ---------- WRITING ----------
+
+class ResultWriter:
+    def __init__(self, f: TextIO, fmt: str):
+        self.fmt = fmt
+        self.f = f
+        if fmt == "csv":
+            self._csv = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+            self._csv.writeheader()
+        elif fmt != "jsonl":
+            raise ValueError(f"Unknown output format {fmt!r} (expected csv or jsonl)")
+
+    def write(self, results: Sequence[Dict[str, Any]]) -> None:
+        if self.fmt == "csv":
+            self._csv.writerows(results)
+        else:
+            self.f.writelines(json.dumps(r) + "\n" for r in results)
+        self.f.flush()
+
+
+# ---------- DRIVER ----------
+
+def price_order_stream(
+    orders: Iterable[Dict[str, Any]],
+    writer: ResultWriter,
+    sellers: Sequence[Seller],
+    geocoder: Geocoder,
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    progress: Optional[Callable[[BulkStats], None]] = None,
+    progress_every_s: float = 2.0,
+) -> BulkStats:
+    """
+    Price a stream of orders and write the winning bids in input order.
+
+    At most 2 * workers chunks are in flight at once, so memory stays
+    bounded however long the input is.
+
+    Args:
+        orders: Raw order dicts (see read_orders)
+        writer: Destination for result rows
+        sellers: List of Seller objects
+        geocoder: Geocoder for orders given by address
+        network: Optional TransportNetwork for routed logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+        workers: Worker processes (defaults to os.cpu_count(); 1 prices in-process)
+        chunk_size: Orders per chunk
+        progress: Optional callback, called at most every progress_every_s seconds
+        progress_every_s: Minimum seconds between progress callbacks
+
+    Returns:
+        BulkStats for the run
+    """
+    if not sellers:
+        raise ValueError("Cannot run an auction with no sellers")
+    workers = workers or os.cpu_count() or 1
+    stats = BulkStats(started=time.perf_counter())
+    cache: Dict[str, Optional[Point]] = {}
+    last_report = stats.started
+
+    if workers == 1:
+        _init_worker(sellers, network, policy)
+        executor: Executor = _InlineExecutor()
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(sellers, network, policy),
+        )
+
+    in_flight: Deque[Future] = deque()
+
+    def drain_one() -> None:
+        nonlocal last_report
+        results = in_flight.popleft().result()
+        writer.write(results)
+        stats.rows += len(results)
+        stats.errors += sum(1 for r in results if r.get("error"))
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= progress_every_s:
+            last_report = now
+            progress(stats)
+
+    with executor:
+        first_row = 1
+        for chunk in _chunks(orders, chunk_size):
+            rows = resolve_chunk(chunk, geocoder, cache, first_row)
+            first_row += len(chunk)
+            in_flight.append(executor.submit(price_chunk, rows))
+            while len(in_flight) >= 2 * workers:
+                drain_one()
+        while in_flight:
+            drain_one()
+    return stats
@@ -0,0 +1,158 @@
+"""
+Financing offers for auction purchases.
+
+Level-payment amortization has a closed form, so the payment, total interest
+and total landed cost (steel + interest + fees) of every (bid, lender, tenor)
+candidate are computed in one pass over flat arrays, without building
+month-by-month schedules. amortization_schedule() produces the per-month
+schedule for a single loan when one is needed for display (same arithmetic
+as the Loans page).
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import Bid
+
+
+@dataclass(frozen=True)
+class LenderOffer:
+    lender_name: str
+    annual_rate_pct: float                  # APR, e.g. 4.2
+    tenors_months: Tuple[int, ...]
+    max_amount: float
+    min_amount: float = 0.0
+    origination_fee_pct: float = 0.0        # of principal, paid up front
+    lender_rating: str = ""
+
+
+# Stand-in lender panel, same terms as the Loans page's test lenders
+DEFAULT_LENDERS: Tuple[LenderOffer, ...] = (
+    LenderOffer("Test Lender #1", 4.2, (6, 12), max_amount=50_000_000, lender_rating="AAA"),
+    LenderOffer("Test Lender #2", 4.8, (12, 18, 24), max_amount=75_000_000, lender_rating="AA"),
+    LenderOffer("Test Lender #3", 5.2, (12, 24, 36), max_amount=100_000_000, lender_rating="A",
+                origination_fee_pct=0.25),
+)
+
+
+@dataclass
+class FinancingQuote:
+    seller_name: str
+    lender_name: str
+    lender_rating: str
+    annual_rate_pct: float
+    tenor_months: int
+    steel_net_total: float
+    principal: float
+    monthly_payment: float
+    total_interest: float
+    fees: float
+    total_financing_cost: float             # interest + fees
+    total_landed_cost: float                # steel + interest + fees
+    landed_cost_per_ton: float
+
+
+def monthly_payments(
+    principal: Sequence[float], annual_rate_pct: Sequence[float], tenor_months: Sequence[int],
+) -> "array[float]":
+    """Level monthly payment for each loan: P * r / (1 - (1 + r)^-n), or P / n at 0%."""
+    out = array("d")
+    for p, apr, n in zip(principal, annual_rate_pct, tenor_months):
+        r = apr / 1200.0
+        out.append(p / n if r == 0 else p * r / (1.0 - (1.0 + r) ** -n))
+    return out
+
+
+def amortization_schedule(principal: float, annual_rate_pct: float, tenor_months: int) -> List[Dict[str, float]]:
+    """Month-by-month principal / interest split of one loan."""
+    r = annual_rate_pct / 1200.0
+    payment = monthly_payments([principal], [annual_rate_pct], [tenor_months])[0]
+    balance = principal
+    schedule = []
+    for month in range(1, tenor_months + 1):
+        interest = balance * r
+        principal_part = payment - interest
+        balance -= principal_part
+        schedule.append({
+            "month": month,
+            "principal": principal_part,
+            "interest": interest,
+            "total": payment,
+            "remaining_balance": max(0.0, balance),
+        })
+    return schedule
+
+
+def quote_financing(
+    bids: Sequence[Bid],
+    lenders: Sequence[LenderOffer] = DEFAULT_LENDERS,
+    financed_fraction: float = 1.0,
+    top: Optional[int] = None,
+) -> List[FinancingQuote]:
+    """
+    Every (bid, lender, tenor) combination a lender can fund, ranked by total
+    landed cost.
+
+    Args:
+        bids: Bids to finance, e.g. the winner or the cheapest few bids of an auction
+        lenders: Lender offers to compare
+        financed_fraction: Share of each bid's net total that is borrowed (0-1]
+        top: Optional number of best quotes to return
+
+    Returns:
+        List of FinancingQuote, cheapest total landed cost first
+    """
+    if not 0 < financed_fraction <= 1:
+        raise ValueError("financed_fraction must be in (0, 1]")
+
+    # Flatten candidates into columns
+    bid_i, lender_i = array("l"), array("l")
+    principal, rate = array("d"), array("d")
+    tenor = array("l")
+    for b, bid in enumerate(bids):
+        amount = bid.net_total * financed_fraction
+        for k, lender in enumerate(lenders):
+            if not lender.min_amount <= amount <= lender.max_amount:
+                continue
+            for n in lender.tenors_months:
+                if n <= 0:
+                    raise ValueError(f"{lender.lender_name}: tenor must be positive")
+                bid_i.append(b)
+                lender_i.append(k)
+                principal.append(amount)
+                rate.append(lender.annual_rate_pct)
+                tenor.append(n)
+
+    payment = monthly_payments(principal, rate, tenor)
+    landed = array("d")
+    interest, fees = array("d"), array("d")
+    for j in range(len(payment)):
+        bid = bids[bid_i[j]]
+        interest.append(payment[j] * tenor[j] - principal[j])
+        fees.append(principal[j] * lenders[lender_i[j]].origination_fee_pct / 100.0)
+        landed.append(bid.net_total + interest[j] + fees[j])
+
+    order = sorted(range(len(landed)), key=landed.__getitem__)
+    if top is not None:
+        order = order[:top]
+
+    quotes = []
+    for j in order:
+        bid, lender = bids[bid_i[j]], lenders[lender_i[j]]
+        quotes.append(FinancingQuote(
+            seller_name=bid.seller.name,
+            lender_name=lender.lender_name,
+            lender_rating=lender.lender_rating,
+            annual_rate_pct=rate[j],
+            tenor_months=tenor[j],
+            steel_net_total=bid.net_total,
+            principal=principal[j],
+            monthly_payment=payment[j],
+            total_interest=interest[j],
+            fees=fees[j],
+            total_financing_cost=interest[j] + fees[j],
+            total_landed_cost=landed[j],
+            landed_cost_per_ton=landed[j] / bid.quantity_tons,
+        ))
+    return quotes
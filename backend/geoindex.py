@@ -0,0 +1,127 @@
+"""
+Nearest-neighbour lookup over a fixed set of geographic points.
+
+Points are stored as unit vectors on the sphere. Chord length between unit
+vectors grows monotonically with great-circle distance, so a plain 3-d
+KD-tree answers "nearest known point within R km" in O(log n) with no special
+cases at the poles or the antimeridian.
+"""
+from __future__ import annotations
+from array import array
+from typing import List, Optional, Sequence, Tuple, TYPE_CHECKING
+import math
+
+if TYPE_CHECKING:
+    from .models import Point
+
+
+EARTH_RADIUS_KM = 6371.0    # as in Point.distance_km_to
+
+
+def unit_vector(point: "Point") -> Tuple[float, float, float]:
+    lat, lon = math.radians(point.lat), math.radians(point.lon)
+    c = math.cos(lat)
+    return c * math.cos(lon), c * math.sin(lon), math.sin(lat)
+
+
+def chord_for_km(distance_km: float) -> float:
+    """Chord length on the unit sphere for a great-circle distance."""
+    angle = distance_km / EARTH_RADIUS_KM
+    return 2.0 if angle >= math.pi else 2.0 * math.sin(angle / 2.0)
+
+
+class PointIndex:
+    """
+    Static KD-tree over unit vectors, stored implicitly: each (lo, hi) range
+    of `order` is a subtree whose root is its middle element, split on the
+    axis recorded for that slot.
+    """
+    def __init__(self, points: Sequence["Point"]):
+        self.points: Sequence["Point"] = list(points)
+        xs, ys, zs = array("d"), array("d"), array("d")
+        for p in self.points:
+            x, y, z = unit_vector(p)
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+        self.coords: Tuple[Sequence[float], Sequence[float], Sequence[float]] = (xs, ys, zs)
+        self.order: Sequence[int] = array("l", range(len(self.points)))
+        self.axis: Sequence[int] = array("b", bytes(len(self.points)))
+        self._build()
+
+    @classmethod
+    def prebuilt(
+        cls,
+        points: Sequence["Point"],
+        coords: Tuple[Sequence[float], Sequence[float], Sequence[float]],
+        order: Sequence[int],
+        axis: Sequence[int],
+    ) -> "PointIndex":
+        """Index over a tree built earlier (e.g. read from a snapshot), without rebuilding."""
+        index = cls.__new__(cls)
+        index.points, index.coords, index.order, index.axis = points, coords, order, axis
+        return index
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _build(self) -> None:
+        order, coords = self.order, self.coords
+        stack = [(0, len(order))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 0:
+                continue
+            # Split on the axis with the widest spread in this range
+            spans = []
+            for c in coords:
+                values = [c[i] for i in order[lo:hi]]
+                spans.append(max(values) - min(values))
+            axis = spans.index(max(spans))
+            key = coords[axis]
+            order[lo:hi] = array("l", sorted(order[lo:hi], key=key.__getitem__))
+            mid = (lo + hi) // 2
+            self.axis[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+    def nearest(self, point: "Point", max_km: float = math.inf) -> Optional[Tuple[int, float]]:
+        """
+        Index of the point nearest to `point` and its great-circle distance
+        in km, or None if no point lies within `max_km`.
+        """
+        if not len(self.points):
+            return None
+        q = unit_vector(point)
+        qx, qy, qz = q
+        coords = self.coords
+        xs, ys, zs = coords
+        order, axes = self.order, self.axis
+        r = chord_for_km(max_km)
+        best = [r * r, -1]      # squared chord, index
+
+        def search(lo: int, hi: int) -> None:
+            if lo >= hi:
+                return
+            mid = (lo + hi) // 2
+            i = order[mid]
+            dx, dy, dz = xs[i] - qx, ys[i] - qy, zs[i] - qz
+            d2 = dx * dx + dy * dy + dz * dz
+            if d2 < best[0] or (d2 == best[0] and (best[1] < 0 or i < best[1])):
+                best[0], best[1] = d2, i
+            axis = axes[mid]
+            diff = q[axis] - coords[axis][i]
+            if diff < 0:
+                search(lo, mid)
+                if diff * diff <= best[0]:
+                    search(mid + 1, hi)
+            else:
+                search(mid + 1, hi)
+                if diff * diff <= best[0]:
+                    search(lo, mid)
+
+        search(0, len(order))
+        if best[1] < 0:
+            return None
+        i = best[1]
+        return i, self.points[i].distance_km_to(point)
@@ -0,0 +1,463 @@
+"""
+Background jobs for long-running sweeps.
+
+A job is split into chunks that are priced in a separate process pool, so
+heavy analyses never hold the GIL of the server process; pool workers also
+run at a lower OS priority than the server. Jobs wait in a priority queue,
+report progress per chunk, can be cancelled between chunks, and spool their
+result rows to a JSONL file on disk that is read back a page at a time.
+
+A job's seller columns, network and policy are pickled once to a context
+file next to the spool; each worker loads it once per job, so a chunk only
+ships its own arguments.
+"""
+from __future__ import annotations
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import dataclasses
+import itertools
+import json
+import os
+import pickle
+import queue
+import random
+import threading
+import time
+import uuid
+
+from .models import Seller, SellerRows, Point, TRANSPORT_MODES
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+MAX_JOB_ROWS = 2_000_000
+REPRESENTATIVE_MAX_TONS = 100_000.0     # stands in for the unbounded top volume tier
+
+
+# ---------- CHUNK FUNCTIONS (run in pool processes) ----------
+
+def _lower_priority(niceness: int) -> None:
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            pass
+
+
+# Job contexts loaded in this worker process, by file path (newest last)
+_CONTEXTS: Dict[str, Tuple[SellerColumns, Optional["TransportNetwork"], CompiledPolicy]] = {}
+_MAX_CONTEXTS = 2
+
+
+def _job_context(path: str) -> Tuple[SellerColumns, Optional["TransportNetwork"], CompiledPolicy]:
+    """A job's seller columns, network and policy, unpickled once per worker and job."""
+    context = _CONTEXTS.get(path)
+    if context is None:
+        with open(path, "rb") as f:
+            rows, network, policy = pickle.load(f)
+        cols = SellerColumns.from_rows(rows)
+        cols.terms_for(policy)
+        context = _CONTEXTS[path] = (cols, network, policy)
+        while len(_CONTEXTS) > _MAX_CONTEXTS:
+            del _CONTEXTS[next(iter(_CONTEXTS))]
+    return context
+
+
+def _winner_row(cols: SellerColumns, location: Point, quantity_tons: float, network, terms) -> Dict[str, Any]:
+    bids = price_columns(cols, location, quantity_tons, network, terms)
+    i = bids.winner_index
+    return {
+        "winner": bids.sellers[i].name,
+        "transport_mode": TRANSPORT_MODES[bids.mode_codes[i]],
+        "distance_km": bids.distance_km[i],
+        "net_price_per_ton": bids.net_price_per_ton[i],
+        "net_total": bids.net_total[i],
+    }
+
+
+def grid_chunk(context: str, tasks: Sequence[Tuple[float, float, float]]) -> List[Dict[str, Any]]:
+    """Winning bid for each (lat, lon, quantity_tons) task."""
+    cols, network, policy = _job_context(context)
+    terms = cols.terms_for(policy)
+    rows = []
+    for lat, lon, qty in tasks:
+        row = {"lat": lat, "lon": lon, "quantity_tons": qty}
+        row.update(_winner_row(cols, Point(lat, lon), qty, network, terms))
+        rows.append(row)
+    return rows
+
+
+def monte_carlo_chunk(
+    context: str,
+    location: Tuple[float, float],
+    quantity_tons: float,
+    jitter_pct: float,
+    seed: int,
+    trials: Sequence[int],
+) -> List[Dict[str, Any]]:
+    """
+    Winning bid per trial, with every seller's base_cost and msrp jittered
+    by up to +/- jitter_pct. Trial t always uses the same random stream.
+    Only the jittered columns are rebuilt per trial.
+    """
+    cols, network, policy = _job_context(context)
+    sellers: SellerRows = cols.sellers   # type: ignore[assignment]
+    point = Point(*location)
+    rows = []
+    for t in trials:
+        uniform = random.Random(seed * 1_000_003 + t).uniform
+        msrp, base_cost = array("d"), array("d")
+        for m, b in zip(sellers.msrp, sellers.base_cost):
+            # Same draw order as jittering each seller's msrp, then its base_cost
+            msrp.append(m * (1 + uniform(-jitter_pct, jitter_pct)))
+            base_cost.append(b * (1 + uniform(-jitter_pct, jitter_pct)))
+        jittered = dataclasses.replace(
+            cols,
+            base_cost=base_cost,
+            # Same expression as Seller.risk_buffer
+            risk_buffer=array("d", (
+                (ra - 1.0) * max(m - b, 0) for ra, m, b in zip(cols.risk_aversion, msrp, base_cost)
+            )),
+            _terms={},
+        )
+        row: Dict[str, Any] = {"trial": t}
+        row.update(_winner_row(jittered, point, quantity_tons, network, jittered.terms_for(policy)))
+        rows.append(row)
+    return rows
+
+
+# ---------- PLANNING ----------
+
+@dataclass
+class JobPlan:
+    fn: Callable[..., List[Dict[str, Any]]]     # module-level, so it pickles
+    chunks: List[Tuple[Any, ...]]               # fn args per chunk, after the job context path
+    rows: int
+
+
+def _frange(lo: float, hi: float, step: float) -> List[float]:
+    n = int((hi - lo) / step + 1e-9) + 1
+    return [lo + i * step for i in range(n)]
+
+
+def _chunked(items: Sequence[Any], size: int) -> List[List[Any]]:
+    return [list(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+def plan_grid(params: Dict[str, Any], policy: CompiledPolicy, chunk_size: int) -> JobPlan:
+    """
+    Warehouse grid x tonnage sweep. Locations are `locations` ([[lat, lon], ...])
+    or a lat/lon box with `step_deg`; `quantities` default to one per volume tier.
+    """
+    if "locations" in params:
+        locations = [(float(lat), float(lon)) for lat, lon in params["locations"]]
+    else:
+        step = float(params.get("step_deg", 1.0))
+        if step <= 0:
+            raise ValueError("step_deg must be positive")
+        lats = _frange(float(params["lat_min"]), float(params["lat_max"]), step)
+        lons = _frange(float(params["lon_min"]), float(params["lon_max"]), step)
+        locations = [(lat, lon) for lat in lats for lon in lons]
+    for lat, lon in locations:
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ValueError(f"Invalid location {lat}, {lon}")
+
+    if "quantities" in params:
+        quantities = [float(q) for q in params["quantities"]]
+    else:
+        quantities = [b if b != float("inf") else REPRESENTATIVE_MAX_TONS for b in policy.volume_bounds]
+    if not quantities or any(q <= 0 for q in quantities):
+        raise ValueError("quantities must be positive")
+
+    n = len(locations) * len(quantities)
+    if n > MAX_JOB_ROWS:
+        raise ValueError(f"Grid has {n:,} cells; the limit is {MAX_JOB_ROWS:,}")
+    tasks = [(lat, lon, q) for lat, lon in locations for q in quantities]
+    return JobPlan(fn=grid_chunk, chunks=[(c,) for c in _chunked(tasks, chunk_size)], rows=n)
+
+
+def plan_monte_carlo(params: Dict[str, Any], policy: CompiledPolicy, chunk_size: int) -> JobPlan:
+    """Seller-jitter Monte Carlo for one buyer location and quantity."""
+    lat, lon = float(params["lat"]), float(params["lon"])
+    quantity_tons = float(params["quantity_tons"])
+    trials = int(params.get("trials", 1000))
+    jitter_pct = float(params.get("jitter_pct", 0.03))
+    seed = int(params.get("seed", 0))
+    if quantity_tons <= 0:
+        raise ValueError("quantity_tons must be positive")
+    if not 0 < trials <= MAX_JOB_ROWS:
+        raise ValueError(f"trials must be between 1 and {MAX_JOB_ROWS:,}")
+    if not 0 <= jitter_pct < 1:
+        raise ValueError("jitter_pct must be in [0, 1)")
+    chunks = [
+        ((lat, lon), quantity_tons, jitter_pct, seed, c)
+        for c in _chunked(range(trials), chunk_size)
+    ]
+    return JobPlan(fn=monte_carlo_chunk, chunks=chunks, rows=trials)
+
+
+JOB_KINDS: Dict[str, Callable[[Dict[str, Any], CompiledPolicy, int], JobPlan]] = {
+    "grid": plan_grid,
+    "monte_carlo": plan_monte_carlo,
+}
+
+
+# ---------- JOBS ----------
+
+def _snapshot_sellers(sellers: Sequence[Seller]) -> Sequence[Seller]:
+    """
+    Point-in-time copy of a seller book that is cheap to take: a list of the
+    same Seller objects, or columns detached from a SellerRows (mapped
+    columns are shared). Packing into plain columns happens in the runner.
+    """
+    return sellers.detached() if isinstance(sellers, SellerRows) else list(sellers)
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    priority: int                   # lower runs first
+    plan: JobPlan = field(repr=False)
+    sellers: Optional[Sequence[Seller]] = field(repr=False)     # dropped when the job finishes
+    network: Optional["TransportNetwork"] = field(repr=False)
+    policy: CompiledPolicy = field(repr=False)
+    spool_path: str = ""
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks_done: int = 0
+    rows_written: int = 0
+    error: Optional[str] = None
+    _offsets: "array[int]" = field(default_factory=lambda: array("q"), repr=False)
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def chunks_total(self) -> int:
+        return len(self.plan.chunks)
+
+    @property
+    def progress(self) -> float:
+        return self.chunks_done / self.chunks_total if self.chunks_total else 1.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled")
+
+
+class JobManager:
+    """
+    Priority queue of jobs, `workers` runner threads that drive them chunk by
+    chunk, and the process pool the chunks are priced in. The spool
+    directory, pool and runners are created on the first submit; close()
+    stops them.
+    """
+    def __init__(
+        self,
+        spool_dir: str,
+        workers: int = 1,
+        chunk_size: int = 500,
+        niceness: int = 10,
+        max_finished: int = 100,
+        executor: Optional[Executor] = None,
+    ):
+        self.spool_dir = spool_dir
+        self.chunk_size = chunk_size
+        self.max_finished = max_finished
+        self.workers = max(1, workers)
+        self.niceness = niceness
+        self._given_executor = executor
+        self._executor: Optional[Executor] = None
+        self._runners: List[threading.Thread] = []
+        self._jobs: Dict[str, Job] = {}
+        # (priority, seq, job_id); a job_id of None stops one runner
+        self._queue: "queue.PriorityQueue[Tuple[float, int, Optional[str]]]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        # Called with self._lock held
+        if self._runners:
+            return
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._executor = self._given_executor or ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_lower_priority, initargs=(self.niceness,),
+        )
+        for i in range(self.workers):
+            runner = threading.Thread(target=self._run_forever, name=f"hot-iron-jobs-{i}", daemon=True)
+            runner.start()
+            self._runners.append(runner)
+
+    def close(self) -> None:
+        """
+        Cancel every job, wait for the runners to finish their current chunk
+        and shut down the process pool (unless it was passed in). A later
+        submit starts them again.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                self._cancel_locked(job)
+            runners, self._runners = self._runners, []
+            executor, self._executor = self._executor, None
+            for _ in runners:
+                self._queue.put((float("-inf"), next(self._seq), None))
+        for runner in runners:
+            runner.join()
+        if executor is not None and executor is not self._given_executor:
+            executor.shutdown()
+
+    # ----- API -----
+
+    def submit(
+        self,
+        kind: str,
+        params: Dict[str, Any],
+        sellers: Sequence[Seller],
+        network: Optional["TransportNetwork"] = None,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+        priority: int = 5,
+    ) -> Job:
+        """Plan a job (raises ValueError / KeyError on bad params) and queue it."""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind!r}. Valid kinds: {sorted(JOB_KINDS)}")
+        if not sellers:
+            raise ValueError("Cannot run an auction with no sellers")
+        plan = JOB_KINDS[kind](params, policy, self.chunk_size)
+        job_id = uuid.uuid4().hex
+        job = Job(
+            job_id=job_id,
+            kind=kind,
+            priority=priority,
+            plan=plan,
+            sellers=_snapshot_sellers(sellers),
+            network=network,
+            policy=policy,
+            spool_path=os.path.join(self.spool_dir, f"{job_id}.jsonl"),
+        )
+        with self._lock:
+            self._start()
+            self._jobs[job_id] = job
+            self._evict_finished()
+            self._queue.put((priority, next(self._seq), job_id))
+        return job
+
+    def get(self, job_id: str) -> Job:
+        return self._jobs[job_id]
+
+    def jobs(self) -> List[Job]:
+        return sorted(self._jobs.values(), key=lambda j: j.created_at)
+
+    def cancel(self, job_id: str) -> Job:
+        """Stop a queued or running job after its current chunk. Rows already spooled are kept."""
+        with self._lock:
+            job = self._jobs[job_id]
+            self._cancel_locked(job)
+        return job
+
+    def delete(self, job_id: str) -> None:
+        """Cancel a job and remove it and its spool file."""
+        with self._lock:
+            job = self._jobs.pop(job_id)
+            self._cancel_locked(job)
+            # A running job's runner removes the spool when it finishes
+            running = job.status == "running"
+        if not running:
+            self._remove_spool(job)
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Dict[str, Any]]:
+        """A page of spooled result rows (available while the job is still running)."""
+        job = self._jobs[job_id]
+        end = min(offset + limit, len(job._offsets))
+        if offset >= end:
+            return []
+        with open(job.spool_path, "rb") as f:
+            f.seek(job._offsets[offset])
+            return [json.loads(f.readline()) for _ in range(end - offset)]
+
+    # ----- RUNNERS -----
+
+    def _run_forever(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            if job_id is None:
+                return
+            # queued -> running under the lock cancel() and delete() take
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue        # cancelled or deleted while queued
+                job.status = "running"
+                job.started_at = time.time()
+                executor = self._executor
+            try:
+                status = self._run(job, executor)
+            except Exception as e:  # noqa: BLE001 - reported on the job
+                job.error = str(e)
+                status = "failed"
+            with self._lock:
+                self._finish(job, status)
+                deleted = job.job_id not in self._jobs
+            if deleted:
+                self._remove_spool(job)     # deleted while running
+
+    def _run(self, job: Job, executor: Executor) -> str:
+        """Price the job's chunks into its spool file; returns its final status."""
+        context = self._write_context(job)
+        try:
+            with open(job.spool_path, "wb") as out:
+                for args in job.plan.chunks:
+                    if job._cancel.is_set():
+                        break
+                    rows = executor.submit(job.plan.fn, context, *args).result()
+                    offsets = []
+                    for row in rows:
+                        offsets.append(out.tell())
+                        out.write(json.dumps(row).encode() + b"\n")
+                    out.flush()
+                    job._offsets.extend(offsets)    # rows become readable once on disk
+                    job.rows_written += len(rows)
+                    job.chunks_done += 1
+        finally:
+            os.remove(context)
+        return "cancelled" if job._cancel.is_set() else "done"
+
+    def _write_context(self, job: Job) -> str:
+        """
+        Pickle the job's sellers (as plain columns), network and policy to a
+        file that pool workers load once per job, so chunks only carry their
+        own arguments.
+        """
+        sellers = job.sellers
+        rows = sellers.packed() if isinstance(sellers, SellerRows) else SellerRows.from_sellers(sellers)
+        path = os.path.join(self.spool_dir, f"{job.job_id}.context")
+        with open(path, "wb") as f:
+            pickle.dump((rows, job.network, job.policy), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    def _cancel_locked(self, job: Job) -> None:
+        job._cancel.set()
+        if job.status == "queued":
+            self._finish(job, "cancelled")
+
+    @staticmethod
+    def _remove_spool(job: Job) -> None:
+        if os.path.exists(job.spool_path):
+            os.remove(job.spool_path)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.sellers = None              # finished jobs keep only their spooled rows
+        job.finished_at = time.time()
+
+    def _evict_finished(self) -> None:
+        finished = [j for j in self._jobs.values() if j.finished]
+        for job in sorted(finished, key=lambda j: j.finished_at or 0.0)[:-self.max_finished or None]:
+            del self._jobs[job.job_id]
+            self._remove_spool(job)
@@ -0,0 +1,416 @@
+"""
+Joint procurement auction across several buyer sites.
+
+A buyer sourcing for several warehouses at once can consolidate volume: the
+volume discount applies to each seller's aggregated tonnage, so giving a
+seller one more site can move every ton it ships into a better tier.
+
+For seller i and site j the net price per ton factors as
+
+    net = effective_ij * (1 - volume_pct(Q_i)),   effective_ij = offer_ij * (1 - eaf_i)
+
+where Q_i is everything seller i ships. The effective price matrix is priced
+once per site, without building bids. The assignment (each site sourced whole
+from one seller) minimizing sum_i (1 - volume_pct(Q_i)) * sum_{j -> i} q_j * effective_ij
+is found by:
+
+1. A heuristic incumbent: per-site winners, seller consolidation moves
+   (give one seller every site that pays off once it reaches a tier), then
+   single-site moves until none improves.
+2. Depth-first branch and bound over sites, largest first. A node's bound
+   gives every seller the best multiplier its volume could still reach, and
+   children are screened in effective-price order so only sellers that can
+   beat the incumbent are expanded.
+
+The search stops once the incumbent is proven within a gap tolerance of the
+optimum, or at the deadline, and reports the best assignment with a lower
+bound on the optimal cost (exact=True once it is proven optimal).
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+import time
+
+from .models import Seller, Point, Bid, TRANSPORT_MODES
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, PolicyTerms, distances_km, price_columns
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+CANDIDATES_PER_SITE = 8     # sellers per site tried by the heuristic moves
+
+
+@dataclass
+class JointSite:
+    site_id: str
+    location: Point
+    quantity_tons: float
+
+
+@dataclass
+class SellerAllocation:
+    seller_name: str
+    sites: List[str]
+    quantity_tons: float            # aggregated over the seller's sites
+    volume_discount_pct: float      # tier of the aggregated quantity
+    net_total: float
+
+
+@dataclass
+class JointAuctionResult:
+    bids: List[Tuple[str, Bid]]     # (site_id, bid priced at the seller's aggregated tier), in input order
+    sellers: List[SellerAllocation]
+    net_total: float
+    independent_net_total: float    # same sites auctioned one by one
+    lower_bound: float              # no assignment costs less than this
+    exact: bool                     # True if the assignment is proven optimal
+    nodes: int                      # branch-and-bound nodes visited
+    elapsed_ms: float
+
+    @property
+    def savings(self) -> float:
+        return self.independent_net_total - self.net_total
+
+    @property
+    def gap(self) -> float:
+        return max(0.0, self.net_total - self.lower_bound)
+
+
+class _Tiers:
+    """Volume multipliers (1 - pct) and the best one reachable in a volume range."""
+    def __init__(self, policy: CompiledPolicy):
+        self.bounds = policy.volume_bounds
+        self.mults = [1.0 - pct for pct in policy.volume_pcts]
+
+    def mult(self, volume: float) -> float:
+        return self.mults[bisect_left(self.bounds, volume)]
+
+    def best(self, lo: float, hi: float) -> float:
+        """Lowest multiplier of any volume in [lo, hi]."""
+        a, b = bisect_left(self.bounds, lo), bisect_left(self.bounds, hi)
+        return self.mults[a] if a == b else min(self.mults[a:b + 1])
+
+
+class _Assignment:
+    """Site -> seller assignment with per-seller volume and pre-discount cost, for O(1) move deltas."""
+    def __init__(self, assign: Sequence[int], q: Sequence[float], eff: Sequence[Sequence[float]], tiers: _Tiers):
+        self.assign = list(assign)
+        self.q, self.eff, self.tiers = q, eff, tiers
+        self.volume: Dict[int, float] = {}
+        self.base: Dict[int, float] = {}
+        for j, i in enumerate(self.assign):
+            self.volume[i] = self.volume.get(i, 0.0) + q[j]
+            self.base[i] = self.base.get(i, 0.0) + q[j] * eff[j][i]
+        self.cost = sum(b * tiers.mult(self.volume[i]) for i, b in self.base.items())
+
+    def _seller_cost(self, volume: float, base: float) -> float:
+        return base * self.tiers.mult(volume) if volume > 0 else 0.0
+
+    def delta(self, j: int, i: int) -> float:
+        """Change in total cost if site j moved to seller i."""
+        a = self.assign[j]
+        if a == i:
+            return 0.0
+        qj, row = self.q[j], self.eff[j]
+        va, ba = self.volume[a], self.base[a]
+        vi, bi = self.volume.get(i, 0.0), self.base.get(i, 0.0)
+        before = self._seller_cost(va, ba) + self._seller_cost(vi, bi)
+        after = self._seller_cost(va - qj, ba - qj * row[a]) + self._seller_cost(vi + qj, bi + qj * row[i])
+        return after - before
+
+    def move(self, j: int, i: int) -> None:
+        a = self.assign[j]
+        if a == i:
+            return
+        self.cost += self.delta(j, i)
+        qj, row = self.q[j], self.eff[j]
+        self.volume[a] -= qj
+        self.base[a] -= qj * row[a]
+        if self.assign.count(a) == 1:
+            del self.volume[a], self.base[a]
+        self.volume[i] = self.volume.get(i, 0.0) + qj
+        self.base[i] = self.base.get(i, 0.0) + qj * row[i]
+        self.assign[j] = i
+
+
+def _consolidate(state: _Assignment, sellers_to_try: Sequence[int]) -> None:
+    """
+    For each seller, hand it sites in order of how little they cost extra
+    with it, and keep the prefix that lowers the total most (a seller may
+    only pay off once the added volume reaches a better tier).
+    """
+    eff = state.eff
+    for i in sellers_to_try:
+        order = sorted(
+            (j for j, a in enumerate(state.assign) if a != i),
+            key=lambda j: eff[j][i] / eff[j][state.assign[j]],
+        )
+        undo = []
+        start = running = best = state.cost
+        keep = 0
+        for j in order:
+            undo.append((j, state.assign[j]))
+            state.move(j, i)
+            running = state.cost
+            if running < best - 1e-9 * max(1.0, start):
+                best, keep = running, len(undo)
+        for j, a in reversed(undo[keep:]):
+            state.move(j, a)
+
+
+def _improve(state: _Assignment, candidates: Sequence[Sequence[int]]) -> None:
+    """Best single-site moves among each site's candidates until none improves."""
+    eps = 1e-9 * max(1.0, state.cost)
+    improved = True
+    while improved:
+        improved = False
+        for j, cands in enumerate(candidates):
+            options = set(cands) | state.volume.keys()
+            best_delta, best_i = -eps, None
+            for i in options:
+                d = state.delta(j, i)
+                if d < best_delta:
+                    best_delta, best_i = d, i
+            if best_i is not None:
+                state.move(j, best_i)
+                improved = True
+
+
+def effective_prices(
+    cols: SellerColumns,
+    buyer_location: Point,
+    network: Optional["TransportNetwork"] = None,
+    terms: Optional[PolicyTerms] = None,
+) -> List[float]:
+    """
+    offer_price_per_ton * (1 - eaf_factor) for every seller in `cols`: the
+    net price per ton before the volume discount, as price_columns computes
+    it but without building bids.
+    """
+    if terms is None:
+        terms = cols.terms_for(DEFAULT_COMPILED_POLICY)
+    if network is not None:
+        bids = price_columns(cols, buyer_location, 1.0, network, terms)
+        return [o * (1.0 - e) for o, e in zip(bids.offer_price_per_ton, terms.eaf_factor)]
+    policy = terms.policy
+    bounds = policy.mode_bounds
+    fractions = [policy.fraction_per_1000km[mode] for mode in policy.modes]
+    return [
+        (base + base * fractions[bisect_left(bounds, d)] * (d / 1000.0) + buf) * (1.0 - e)
+        for d, base, buf, e in zip(
+            distances_km(cols, buyer_location), cols.base_cost, terms.offer_buffer, terms.eaf_factor,
+        )
+    ]
+
+
+def _bid(
+    cols: SellerColumns, i: int, buyer_location: Point, quantity_tons: float, volume_pct: float,
+    network: Optional["TransportNetwork"], policy: CompiledPolicy,
+) -> Bid:
+    # Price the one seller, then apply the discounts at its aggregated tier
+    # in the same order of operations as pricing.price_columns
+    one = cols.subset([i])
+    terms = one.terms_for(policy)
+    priced = price_columns(one, buyer_location, quantity_tons, network, terms)
+    seller = priced.sellers[0]
+    gross0 = priced.gross_total_undiscounted[0]
+    e = terms.eaf_factor[0]
+    if policy.eaf_before_volume:
+        eaf = e * gross0
+        volume = (gross0 - eaf) * volume_pct
+        gross = gross0 - volume
+    else:
+        volume = gross0 * volume_pct
+        gross = gross0 - volume
+        eaf = e * gross if seller.is_eaf else 0.0
+    net = gross - eaf
+    return Bid(
+        seller=seller,
+        distance_km=priced.distance_km[0],
+        transport_mode=TRANSPORT_MODES[priced.mode_codes[0]],
+        cost_per_ton=priced.cost_per_ton[0],
+        risk_buffer_per_ton=priced.risk_buffer_per_ton[0],
+        offer_price_per_ton=priced.offer_price_per_ton[0],
+        gross_total_undiscounted=gross0,
+        volume_discount_pct=volume_pct,
+        volume_discount_total=volume,
+        gross_total=gross,
+        is_eaf=seller.is_eaf,
+        eaf_discount_total=eaf,
+        net_price_per_ton=net / quantity_tons,
+        net_total=net,
+        quantity_tons=quantity_tons,
+    )
+
+
+def run_joint_auction(
+    sellers: Union[Sequence[Seller], SellerColumns],
+    sites: Sequence[JointSite],
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    deadline_ms: Optional[float] = 500.0,
+    gap_tolerance: float = 0.001,
+) -> JointAuctionResult:
+    """
+    Source several buyer sites at once, each site from one seller, at the
+    lowest total net cost given volume tiers on each seller's aggregated
+    tonnage.
+
+    Args:
+        sellers: List of Seller objects, or prebuilt SellerColumns
+        sites: Buyer sites with their quantities
+        network: Optional TransportNetwork for routed logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+        deadline_ms: Search budget; None searches until the assignment is proven optimal
+        gap_tolerance: Stop refining once the assignment is proven within this
+            fraction of the optimum (0 searches for the exact optimum)
+
+    Returns:
+        JointAuctionResult with per-site bids, per-seller totals and the optimality gap
+    """
+    started = time.perf_counter()
+    if not len(sellers):
+        raise ValueError("Cannot run an auction with no sellers")
+    if not sites:
+        raise ValueError("A joint auction needs at least one site")
+    if any(s.quantity_tons <= 0 for s in sites):
+        raise ValueError("quantity_tons must be positive")
+    cols = sellers if isinstance(sellers, SellerColumns) else SellerColumns.from_sellers(sellers)
+    terms = cols.terms_for(policy)
+    tiers = _Tiers(policy)
+    n, m = len(cols), len(sites)
+
+    # Seller x site matrix of effective prices (net per ton before volume discount)
+    eff = [effective_prices(cols, site.location, network, terms) for site in sites]
+    q = [s.quantity_tons for s in sites]
+    by_price = [sorted(range(n), key=row.__getitem__) for row in eff]
+
+    # ----- HEURISTIC INCUMBENT -----
+
+    independent = [order[0] for order in by_price]
+    independent_cost = sum(q[j] * eff[j][independent[j]] * tiers.mult(q[j]) for j in range(m))
+    candidates = [order[:CANDIDATES_PER_SITE] for order in by_price]
+    state = _Assignment(independent, q, eff, tiers)
+    _consolidate(state, sorted({i for c in candidates for i in c}))
+    _improve(state, candidates)
+    best_cost, best_assign = state.cost, list(state.assign)
+
+    # ----- BRANCH AND BOUND -----
+
+    deadline = None if deadline_ms is None else started + deadline_ms / 1000.0
+    site_order = sorted(range(m), key=lambda j: -q[j])
+    volume: Dict[int, float] = {}    # touched sellers only
+    base: Dict[int, float] = {}
+    current = [-1] * m
+    nodes = 0
+    open_bound = float("inf")        # lowest bound among nodes cut off by the deadline or the tolerance
+    eps = 1e-9 * max(1.0, best_cost)
+
+    def site_bounds(depth: int, remaining: float) -> Tuple[float, List[float]]:
+        fixed = sum(b * tiers.best(volume[i], volume[i] + remaining) for i, b in base.items())
+        lbs = []
+        for j in site_order[depth:]:
+            qj, row = q[j], eff[j]
+            untouched = next((i for i in by_price[j] if i not in volume), None)
+            lb = row[untouched] * tiers.best(qj, remaining) if untouched is not None else float("inf")
+            for i, v in volume.items():
+                lb = min(lb, row[i] * tiers.best(v + qj, v + remaining))
+            lbs.append(qj * lb)
+        return fixed + sum(lbs), lbs
+
+    def pruned(bound: float) -> bool:
+        # Within the gap tolerance of the incumbent is as good as beaten;
+        # remember such bounds, they limit how much better the optimum can be
+        nonlocal open_bound
+        if bound < best_cost * (1.0 - gap_tolerance) - eps:
+            return False
+        if bound < best_cost - eps:
+            open_bound = min(open_bound, bound)
+        return True
+
+    def search(depth: int, remaining: float) -> None:
+        nonlocal nodes, best_cost, best_assign, open_bound
+        nodes += 1
+        if depth == m:
+            cost = sum(b * tiers.mult(volume[i]) for i, b in base.items())
+            if cost < best_cost - eps:
+                best_cost, best_assign = cost, list(current)
+            return
+        bound, lbs = site_bounds(depth, remaining)
+        if pruned(bound):
+            return
+        if deadline is not None and time.perf_counter() > deadline:
+            open_bound = min(open_bound, bound)
+            return
+
+        j = site_order[depth]
+        qj, row = q[j], eff[j]
+        rest = bound - lbs[0]       # a child's bound is at least rest + its own term
+        children = []
+        for i, v in volume.items():
+            screen = qj * row[i] * tiers.best(v + qj, v + remaining)
+            if not pruned(rest + screen):
+                children.append((screen, i))
+        untouched_mult = tiers.best(qj, remaining)
+        for i in by_price[j]:
+            if i in volume:
+                continue
+            if pruned(rest + qj * row[i] * untouched_mult):
+                break       # the rest of by_price[j] is dearer still
+            children.append((qj * row[i] * untouched_mult, i))
+        children.sort()
+
+        for k, (screen, i) in enumerate(children):
+            if pruned(rest + screen):
+                break       # the incumbent improved since screening
+            saved = volume.get(i), base.get(i)
+            volume[i] = (saved[0] or 0.0) + qj
+            base[i] = (saved[1] or 0.0) + qj * row[i]
+            current[j] = i
+            search(depth + 1, remaining - qj)
+            if saved[0] is None:
+                del volume[i], base[i]
+            else:
+                volume[i], base[i] = saved
+            if deadline is not None and k + 1 < len(children) and time.perf_counter() > deadline:
+                # Out of time: the cheapest unexplored sibling bounds the rest
+                open_bound = min(open_bound, rest + children[k + 1][0])
+                return
+
+    search(0, sum(q))
+    exact = open_bound >= best_cost - eps
+    lower_bound = min(best_cost, open_bound)
+
+    # ----- RESULT -----
+
+    totals: Dict[int, float] = {}
+    for j, i in enumerate(best_assign):
+        totals[i] = totals.get(i, 0.0) + q[j]
+    bids: List[Tuple[str, Bid]] = []
+    for j, i in enumerate(best_assign):
+        pct = policy.volume_discount_pct(totals[i])
+        bids.append((sites[j].site_id, _bid(cols, i, sites[j].location, q[j], pct, network, policy)))
+    allocations: Dict[int, SellerAllocation] = {}
+    for (site_id, bid), i in zip(bids, best_assign):
+        alloc = allocations.get(i)
+        if alloc is None:
+            alloc = allocations[i] = SellerAllocation(
+                seller_name=bid.seller.name, sites=[], quantity_tons=totals[i],
+                volume_discount_pct=bid.volume_discount_pct, net_total=0.0,
+            )
+        alloc.sites.append(site_id)
+        alloc.net_total += bid.net_total
+
+    return JointAuctionResult(
+        bids=bids,
+        sellers=sorted(allocations.values(), key=lambda a: -a.quantity_tons),
+        net_total=sum(bid.net_total for _, bid in bids),
+        independent_net_total=independent_cost,
+        lower_bound=lower_bound,
+        exact=exact,
+        nodes=nodes,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
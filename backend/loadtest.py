@@ -0,0 +1,379 @@
+"""
+Open-loop load generation against a running auction API.
+
+Requests are sent on a Poisson arrival schedule at a fixed offered rate per
+step, whether or not earlier requests have completed. Latency is measured from
+each request's scheduled send time, so a saturated server (or a saturated
+client) shows up as queueing delay instead of silently lowering the offered
+load. Each step reports throughput, latency percentiles, errors and the mean
+of the server's own Server-Timing stages; a list of steps at increasing rates
+is the latency-vs-load curve.
+
+The client uses threads and http.client only, so it runs anywhere the backend
+does. On a single box it shares CPUs with the server: compare `achieved_rps`
+and `send_lag_ms` with the offered rate to tell client saturation from
+server saturation.
+"""
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode, urlsplit
+import http.client
+import json
+import math
+import random
+import threading
+import time
+
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .synthetic import generate_sites
+from .timing import parse_server_timing
+
+
+# Addresses known to StaticGeocoder
+DEFAULT_ADDRESSES: Tuple[str, ...] = ("central us warehouse", "chicago, il", "pittsburgh, pa")
+MAX_QUANTITY_TONS = 100_000.0   # API limit, stands in for the unbounded top volume tier
+
+# Request kinds and their default share of traffic
+REQUEST_KINDS: Tuple[str, ...] = (
+    "auction_coords",           # POST /auction/run with lat/lon
+    "auction_address",          # POST /auction/run with buyer_address
+    "auction_by_address",       # POST /auction/run-by-address
+    "sellers",                  # GET /sellers (gzip)
+    "sellers_conditional",      # GET /sellers with If-None-Match
+)
+DEFAULT_MIX: Dict[str, float] = {
+    "auction_coords": 0.5,
+    "auction_address": 0.2,
+    "auction_by_address": 0.1,
+    "sellers": 0.05,
+    "sellers_conditional": 0.15,
+}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "kind=weight,kind=weight" into a request mix."""
+    mix: Dict[str, float] = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind {kind!r}. Valid kinds: {list(REQUEST_KINDS)}")
+        mix[kind] = float(weight)
+    if not mix or sum(mix.values()) <= 0 or any(w < 0 for w in mix.values()):
+        raise ValueError("Request mix needs at least one positive weight")
+    return mix
+
+
+@dataclass
+class PlannedRequest:
+    kind: str
+    method: str
+    path: str
+    body: Optional[bytes] = None
+
+
+class RequestFactory:
+    """
+    Seeded stream of requests following a mix. Coordinates are synthetic
+    buyer sites around the demand hubs; quantities pick a volume tier
+    uniformly, then a log-uniform quantity inside it, so every discount tier
+    is exercised in proportion.
+    """
+    def __init__(
+        self,
+        mix: Dict[str, float],
+        seed: int = 0,
+        sites: int = 1000,
+        addresses: Sequence[str] = DEFAULT_ADDRESSES,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    ):
+        self.rng = random.Random(seed)
+        self.kinds = list(mix)
+        self.weights = [mix[k] for k in self.kinds]
+        self.sites = generate_sites(sites, seed)
+        self.addresses = list(addresses)
+        lower = 1.0
+        self.tiers: List[Tuple[float, float]] = []
+        for bound in policy.volume_bounds:
+            upper = min(bound, MAX_QUANTITY_TONS)
+            if upper > lower:
+                self.tiers.append((lower, upper))
+            lower = upper
+
+    def quantity(self) -> float:
+        lo, hi = self.rng.choice(self.tiers)
+        return round(math.exp(self.rng.uniform(math.log(lo), math.log(hi))), 1)
+
+    def next(self) -> PlannedRequest:
+        rng = self.rng
+        kind = rng.choices(self.kinds, weights=self.weights)[0]
+        if kind == "auction_coords":
+            i = rng.randrange(len(self.sites))
+            body = {"lat": self.sites.lat[i], "lon": self.sites.lon[i], "quantity_tons": self.quantity()}
+            return PlannedRequest(kind, "POST", "/auction/run", json.dumps(body).encode())
+        if kind == "auction_address":
+            body = {"buyer_address": rng.choice(self.addresses), "quantity_tons": self.quantity()}
+            return PlannedRequest(kind, "POST", "/auction/run", json.dumps(body).encode())
+        if kind == "auction_by_address":
+            query = urlencode({"buyer_address": rng.choice(self.addresses), "quantity_tons": self.quantity()})
+            return PlannedRequest(kind, "POST", f"/auction/run-by-address?{query}")
+        return PlannedRequest(kind, "GET", "/sellers")
+
+
+# ---------- CLIENT ----------
+
+@dataclass
+class Sample:
+    kind: str
+    latency_ms: float               # from scheduled send time to response read
+    send_lag_ms: float              # how late the request actually started
+    status: int                     # 0 on connection errors
+    server_timing: Dict[str, float]
+
+
+class _Client:
+    """One keep-alive connection per worker thread."""
+    def __init__(self, base_url: str, timeout_s: float):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL {base_url!r}")
+        self.scheme, self.netloc = parts.scheme, parts.netloc
+        self.prefix = parts.path.rstrip("/")
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+        self.etag: Optional[str] = None     # last /sellers ETag seen
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout_s)
+        return conn
+
+    def send(self, request: PlannedRequest, scheduled: float) -> Sample:
+        lag = (time.perf_counter() - scheduled) * 1000.0
+        headers = {"Accept-Encoding": "gzip"}
+        if request.body is not None:
+            headers["Content-Type"] = "application/json"
+        if request.kind == "sellers_conditional" and self.etag:
+            headers["If-None-Match"] = self.etag
+        status, timing = 0, {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(request.method, self.prefix + request.path, body=request.body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                timing = parse_server_timing(response.getheader("Server-Timing", ""))
+                if request.path == "/sellers" and response.getheader("ETag"):
+                    self.etag = response.getheader("ETag")
+                break
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                self._local.conn = None
+                # A keep-alive connection the server closed is retried once;
+                # anything else (refused, timed out) counts as an error
+                stale = isinstance(e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError))
+                if not stale:
+                    break
+        return Sample(request.kind, (time.perf_counter() - scheduled) * 1000.0, lag, status, timing)
+
+
+# ---------- STEPS ----------
+
+@dataclass
+class StepResult:
+    offered_rps: float
+    duration_s: float
+    requests: int
+    achieved_rps: float             # completed requests per second of the step
+    errors: int                     # connection errors and 4xx/5xx (304 is a success)
+    error_rate: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+    send_lag_p99_ms: float          # client-side scheduling delay; large = client saturated
+    server_timing_ms: Dict[str, float] = field(default_factory=dict)     # mean per stage
+    by_kind: Dict[str, Dict[str, float]] = field(default_factory=dict)   # requests, errors, p99_ms
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values (0 when empty)."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples: Sequence[Sample], offered_rps: float, duration_s: float) -> StepResult:
+    latencies = sorted(s.latency_ms for s in samples)
+    lags = sorted(s.send_lag_ms for s in samples)
+    errors = sum(1 for s in samples if s.status == 0 or s.status >= 400)
+    totals: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for s in samples:
+        for name, ms in s.server_timing.items():
+            totals[name] = totals.get(name, 0.0) + ms
+            counts[name] = counts.get(name, 0) + 1
+
+    by_kind: Dict[str, Dict[str, float]] = {}
+    for kind in sorted({s.kind for s in samples}):
+        mine = [s for s in samples if s.kind == kind]
+        by_kind[kind] = {
+            "requests": len(mine),
+            "errors": sum(1 for s in mine if s.status == 0 or s.status >= 400),
+            "p99_ms": percentile(sorted(s.latency_ms for s in mine), 99),
+        }
+
+    return StepResult(
+        offered_rps=offered_rps,
+        duration_s=duration_s,
+        requests=len(samples),
+        achieved_rps=len(samples) / duration_s if duration_s > 0 else 0.0,
+        errors=errors,
+        error_rate=errors / len(samples) if samples else 0.0,
+        p50_ms=percentile(latencies, 50),
+        p95_ms=percentile(latencies, 95),
+        p99_ms=percentile(latencies, 99),
+        max_ms=latencies[-1] if latencies else 0.0,
+        send_lag_p99_ms=percentile(lags, 99),
+        server_timing_ms={name: totals[name] / counts[name] for name in sorted(totals)},
+        by_kind=by_kind,
+    )
+
+
+def run_step(
+    client: _Client,
+    factory: RequestFactory,
+    rate_rps: float,
+    duration_s: float,
+    pool: ThreadPoolExecutor,
+    warmup_s: float = 0.0,
+) -> StepResult:
+    """
+    Offer `rate_rps` Poisson arrivals for `warmup_s + duration_s` seconds and
+    summarize the requests scheduled after the warmup.
+    """
+    if rate_rps <= 0:
+        raise ValueError("rate must be positive")
+    rng = random.Random(factory.rng.random())
+    futures = []
+    start = time.perf_counter()
+    measure_from = start + warmup_s
+    end = measure_from + duration_s
+    t = start
+    while True:
+        t += rng.expovariate(rate_rps)
+        if t >= end:
+            break
+        delay = t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        request = factory.next()
+        future = pool.submit(client.send, request, t)
+        if t >= measure_from:
+            futures.append(future)
+    samples = [f.result() for f in futures]
+    # Completion rate over the measured window, stretched if the tail ran late
+    finished = time.perf_counter()
+    return summarize(samples, rate_rps, max(duration_s, finished - measure_from))
+
+
+def run_load_curve(
+    base_url: str,
+    rates: Sequence[float],
+    step_seconds: float = 30.0,
+    warmup_seconds: float = 5.0,
+    mix: Optional[Dict[str, float]] = None,
+    seed: int = 0,
+    max_in_flight: int = 256,
+    timeout_s: float = 30.0,
+    stop_error_rate: Optional[float] = None,
+    stop_p99_ms: Optional[float] = None,
+    on_step: Optional[Callable[[StepResult], None]] = None,
+) -> List[StepResult]:
+    """
+    Run one open-loop step per offered rate, in order.
+
+    Args:
+        base_url: Server root, e.g. http://127.0.0.1:8000
+        rates: Offered request rates (requests/s); repeat a rate for a soak test
+        step_seconds: Measured duration of each step
+        warmup_seconds: Unmeasured lead-in before each step
+        mix: Share of traffic per request kind (default: DEFAULT_MIX)
+        seed: Seed for arrivals, locations and quantities
+        max_in_flight: Client threads, i.e. the most requests outstanding at once
+        timeout_s: Per-request socket timeout
+        stop_error_rate: Stop the ramp after a step above this error rate
+        stop_p99_ms: Stop the ramp after a step above this p99 latency
+        on_step: Called with each StepResult as soon as its step finishes
+
+    Returns:
+        List of StepResult, one per completed step
+    """
+    client = _Client(base_url, timeout_s)
+    factory = RequestFactory(mix or DEFAULT_MIX, seed)
+    results: List[StepResult] = []
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for rate in rates:
+            result = run_step(client, factory, rate, step_seconds, pool, warmup_seconds)
+            results.append(result)
+            if on_step is not None:
+                on_step(result)
+            if stop_error_rate is not None and result.error_rate > stop_error_rate:
+                break
+            if stop_p99_ms is not None and result.p99_ms > stop_p99_ms:
+                break
+    return results
+
+
+# ---------- REPORTING ----------
+
+CURVE_FIELDS: Tuple[str, ...] = (
+    "offered_rps", "achieved_rps", "requests", "errors", "error_rate",
+    "p50_ms", "p95_ms", "p99_ms", "max_ms", "send_lag_p99_ms",
+)
+
+
+def format_step(result: StepResult) -> str:
+    stages = " ".join(f"{name}={ms:.2f}" for name, ms in result.server_timing_ms.items())
+    return (
+        f"{result.offered_rps:8.1f} {result.achieved_rps:8.1f} {result.requests:8d} "
+        f"{result.error_rate * 100:6.2f}% {result.p50_ms:9.2f} {result.p95_ms:9.2f} "
+        f"{result.p99_ms:9.2f} {result.send_lag_p99_ms:8.2f}  {stages}"
+    )
+
+
+STEP_HEADER = (
+    f"{'offered':>8} {'achieved':>8} {'requests':>8} {'errors':>7} {'p50 ms':>9} "
+    f"{'p95 ms':>9} {'p99 ms':>9} {'lag p99':>8}  server stages (mean ms)"
+)
+
+
+def format_curve(results: Sequence[StepResult], width: int = 50) -> str:
+    """Text plot of p50 / p99 latency against offered load."""
+    if not results:
+        return ""
+    top = max(r.p99_ms for r in results) or 1.0
+    lines = [f"latency vs load (full bar = {top:.1f} ms; '#' p50, '-' up to p99)"]
+    for r in results:
+        p50 = round(r.p50_ms / top * width)
+        p99 = round(r.p99_ms / top * width)
+        lines.append(f"{r.offered_rps:8.1f} rps |{'#' * p50}{'-' * max(0, p99 - p50)}")
+    return "\n".join(lines)
+
+
+def write_curve_csv(f, results: Sequence[StepResult]) -> None:
+    """One row per step: CURVE_FIELDS, then one column per server stage."""
+    stage_names = sorted({name for r in results for name in r.server_timing_ms})
+    f.write(",".join(CURVE_FIELDS + tuple(f"server_{name}_ms" for name in stage_names)) + "\n")
+    for r in results:
+        row = [repr(getattr(r, name)) for name in CURVE_FIELDS]
+        row += [repr(r.server_timing_ms[name]) if name in r.server_timing_ms else "" for name in stage_names]
+        f.write(",".join(row) + "\n")
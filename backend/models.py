@@ -2,11 +2,23 @@
 Data models for the auction system.
 """
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from typing import List, Protocol, Literal, Tuple
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, MutableSequence, Optional, Protocol, Literal, Sequence,
+    Tuple, Union, TYPE_CHECKING,
+    overload,
+)
+import heapq
 import math
 import random
 
+from .geoindex import PointIndex
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
 
 # ---------- GEO MODEL ----------
 
@@ -49,6 +61,14 @@ class Geocoder(Protocol):
         ...
 
 
+@dataclass(frozen=True)
+class SiteMatch:
+    """Known site a coordinate was snapped to."""
+    address: str
+    location: Point
+    distance_km: float              # from the requested coordinates
+
+
 class StaticGeocoder:
     """
     Very simple geocoder for demos/tests.
@@ -60,6 +80,13 @@ class StaticGeocoder:
             "chicago, il": Point(41.8781, -87.6298),
             "pittsburgh, pa": Point(40.4406, -79.9959),
         }
+        self._site_index: Optional[PointIndex] = None
+        self._site_addresses: List[str] = []
+
+    @property
+    def address_book(self) -> Dict[str, Point]:
+        """Normalized address -> Point (read-only by convention)."""
+        return self._address_book
 
     def geocode(self, address: str) -> Point:
         key = address.strip().lower()
@@ -70,14 +97,45 @@ class StaticGeocoder:
             )
         return self._address_book[key]
 
+    def geocode_many(self, addresses: Sequence[str]) -> Dict[str, Point]:
+        """
+        Geocode a batch of addresses. Returns {normalized address: Point};
+        unknown addresses are left out rather than raising.
+        """
+        out = {}
+        for address in addresses:
+            key = address.strip().lower()
+            if key in self._address_book:
+                out[key] = self._address_book[key]
+        return out
+
     def geocode_from_coords(self, lat: float, lon: float) -> Point:
         """
         Create a Point directly from coordinates.
         """
         return Point(lat=lat, lon=lon)
 
+    def reverse_geocode(self, lat: float, lon: float, max_km: float) -> Optional[SiteMatch]:
+        """
+        Nearest address-book site within `max_km` of (lat, lon), or None.
+        Addresses sharing a location are one site, named by the first of them.
+        """
+        if self._site_index is None:
+            first: Dict[Point, str] = {}
+            for address, point in self._address_book.items():
+                first.setdefault(point, address)
+            self._site_addresses = list(first.values())
+            self._site_index = PointIndex(list(first))
+        found = self._site_index.nearest(Point(lat=lat, lon=lon), max_km)
+        if found is None:
+            return None
+        i, distance_km = found
+        return SiteMatch(self._site_addresses[i], self._site_index.points[i], distance_km)
+
 
 TransportMode = Literal["truck", "rail", "ocean"]
+TRANSPORT_MODES: Tuple[TransportMode, ...] = ("truck", "rail", "ocean")
+RISK_AVERSION_RANGE: Tuple[float, float] = (1.0, 1.5)      # values a seller may be given
 
 
 # ---------- SELLER / BID MODEL ----------
@@ -97,23 +155,22 @@ class Seller:
     # ----- MODE-AWARE, COST-SCALED LOGISTICS (distance-based mode) -----
 
     @staticmethod
-    def choose_transport_mode(distance_km: float) -> TransportMode:
+    def choose_transport_mode(
+        distance_km: float,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    ) -> TransportMode:
         """
-        Simple distance-based routing:
+        Simple distance-based routing (default policy):
           - ≤ 500 km    -> truck
           - 500–3000 km -> rail
           - > 3000 km   -> ocean
         """
-        if distance_km <= 500:
-            return "truck"
-        elif distance_km <= 3000:
-            return "rail"
-        else:
-            return "ocean"
+        return policy.transport_mode(distance_km)  # type: ignore[return-value]
 
     def logistics_cost_per_ton(
         self,
         distance_km: float,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
     ) -> Tuple[float, TransportMode]:
         """
         Logistics cost per ton based on:
@@ -121,22 +178,13 @@ class Seller:
           - transport mode (chosen by distance)
           - base_cost (scaled as a fraction of base_cost per 1000 km)
 
-        Rough calibration (per 1000 km):
+        Rough calibration of the default policy (per 1000 km):
           - truck: ~1% of base_cost per 1000 km
           - rail:  ~0.5%
           - ocean: ~0.2%
         """
-        mode = self.choose_transport_mode(distance_km)
-
-        if mode == "truck":
-            fraction_per_1000km = 0.010  # 1% of base_cost per 1000 km
-        elif mode == "rail":
-            fraction_per_1000km = 0.005  # 0.5%
-        elif mode == "ocean":
-            fraction_per_1000km = 0.002  # 0.2%
-        else:
-            fraction_per_1000km = 0.007  # fallback
-
+        mode = self.choose_transport_mode(distance_km, policy)
+        fraction_per_1000km = policy.fraction_per_1000km[mode]
         logistics_cost = self.base_cost * fraction_per_1000km * (distance_km / 1000.0)
         return logistics_cost, mode
 
@@ -160,26 +208,30 @@ class Seller:
         return (self.risk_aversion - 1.0) * baseline_margin
 
     @staticmethod
-    def volume_discount_pct(quantity_tons: float) -> float:
+    def volume_discount_pct(
+        quantity_tons: float,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    ) -> float:
         """
         Simple piecewise volume discount based on order size.
 
         Returns a fraction in [0, 0.15], e.g. 0.07 = 7% discount.
         Larger orders monotonically decrease per-ton prices.
+
+        Default policy tiers:
+          - ≤ 1,000 t     -> 0%
+          - ≤ 5,000 t     -> 3%
+          - ≤ 20,000 t    -> 7%
+          - > 20,000 t    -> 12%
         """
-        if quantity_tons <= 1_000:
-            return 0.00    # no discount
-        elif quantity_tons <= 5_000:
-            return 0.03    # 3%
-        elif quantity_tons <= 20_000:
-            return 0.07    # 7%
-        else:
-            return 0.12    # 12% for very large orders
+        return policy.volume_discount_pct(quantity_tons)
 
     def quote_price(
         self,
         buyer_location: Point,
         quantity_tons: float,
+        network: Optional["TransportNetwork"] = None,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
     ) -> dict:
         """
         Compute this seller's offer and net price, including:
@@ -190,31 +242,49 @@ class Seller:
 
         EAF discount is a flat discount on total price *after* volume discount:
           eaf_discount_total = risk_aversion * 0.06 * gross_total_after_volume
+
+        Coefficients and tiers come from `policy` (see policy.py).
+
+        If a transport network is given, logistics follow the least-cost
+        multimodal route (distance_km is then the routed distance). Sellers
+        that cannot be routed fall back to the great-circle model.
         """
-        distance_km = self.distance_to(buyer_location)
-        logistics_cost, mode = self.logistics_cost_per_ton(distance_km)
+        route = network.route(self.location, buyer_location) if network is not None else None
+        if route is None:
+            distance_km = self.distance_to(buyer_location)
+            logistics_cost, mode = self.logistics_cost_per_ton(distance_km, policy)
+        else:
+            distance_km, logistics_cost, mode = route.distance_km, route.cost_per_ton, route.mode
 
         # Base cost + logistics
         cost_per_ton = self.base_cost + logistics_cost
 
         # Add risk buffer to form offer (per ton, before discounts)
         buffer_per_ton = self.risk_buffer()
-        offer_price_per_ton = cost_per_ton + buffer_per_ton*0.5
+        offer_price_per_ton = cost_per_ton + buffer_per_ton*policy.risk_buffer_weight
 
         # Total gross price BEFORE volume discount
         gross_total_undiscounted = offer_price_per_ton * quantity_tons
 
-        # Volume discount on gross total
-        volume_pct = self.volume_discount_pct(quantity_tons)
-        volume_discount_total = gross_total_undiscounted * volume_pct
-        gross_total_after_volume = gross_total_undiscounted - volume_discount_total
+        volume_pct = self.volume_discount_pct(quantity_tons, policy)
+        eaf_factor = self.risk_aversion * policy.eaf_per_risk_aversion if self.is_eaf else 0.0
+
+        if policy.eaf_before_volume:
+            eaf_discount_total = eaf_factor * gross_total_undiscounted
+            volume_discount_total = (gross_total_undiscounted - eaf_discount_total) * volume_pct
+            gross_total_after_volume = gross_total_undiscounted - volume_discount_total
+            net_total = gross_total_after_volume - eaf_discount_total
+        else:
+            # Volume discount on gross total
+            volume_discount_total = gross_total_undiscounted * volume_pct
+            gross_total_after_volume = gross_total_undiscounted - volume_discount_total
 
-        # EAF discount (if applicable) – applied on volume-discounted total
-        eaf_discount_total = 0.0
-        if self.is_eaf:
-            eaf_discount_total = self.risk_aversion * 0.06 * gross_total_after_volume
+            # EAF discount (if applicable) – applied on volume-discounted total
+            eaf_discount_total = 0.0
+            if self.is_eaf:
+                eaf_discount_total = eaf_factor * gross_total_after_volume
+            net_total = gross_total_after_volume - eaf_discount_total
 
-        net_total = gross_total_after_volume - eaf_discount_total
         net_price_per_ton = net_total / quantity_tons
 
         return {
@@ -258,6 +328,418 @@ class Bid:
         return self.net_total
 
 
+class BidSet(MutableSequence[Bid]):
+    """
+    All bids of one auction, stored as contiguous per-component arrays.
+
+    Behaves as a list of Bid (len, indexing, iteration, slicing, == against
+    a list of bids, and the list methods: append, insert, sort, del, ...),
+    but Bid objects are only created when an element is accessed. Winner,
+    top-k, sorting and filtering work on the arrays and return indices or
+    smaller BidSets.
+
+    `exact` is False when the set was cut short by a deadline (see
+    pricing.price_columns_anytime); the true winning net price per ton is
+    then at most `max_gap_per_ton` below this set's winner.
+    """
+    FLOAT_FIELDS = (
+        "distance_km",
+        "cost_per_ton",
+        "risk_buffer_per_ton",
+        "offer_price_per_ton",
+        "gross_total_undiscounted",
+        "volume_discount_total",
+        "gross_total",
+        "eaf_discount_total",
+        "net_price_per_ton",
+        "net_total",
+    )
+
+    def __init__(
+        self,
+        sellers: Sequence[Seller],
+        quantity_tons: float,
+        volume_discount_pct: float,
+        mode_codes: "array[int]",
+        **columns: "array[float]",
+    ):
+        missing = set(self.FLOAT_FIELDS) - set(columns)
+        if missing:
+            raise TypeError(f"BidSet missing columns: {sorted(missing)}")
+        self.sellers = sellers
+        self.quantity_tons = quantity_tons
+        self.volume_discount_pct = volume_discount_pct
+        self.mode_codes = mode_codes            # index into TRANSPORT_MODES
+        for name in self.FLOAT_FIELDS:
+            setattr(self, name, columns[name])
+        self.exact = True
+        self.max_gap_per_ton = 0.0
+        self._winner: Optional[int] = None
+        self._owns_sellers = False              # `sellers` may be shared with SellerColumns
+
+    @classmethod
+    def empty(cls, quantity_tons: float, volume_discount_pct: float) -> "BidSet":
+        return cls(
+            [], quantity_tons, volume_discount_pct, array("b"),
+            **{name: array("d") for name in cls.FLOAT_FIELDS},
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["BidSet"]) -> "BidSet":
+        """Join BidSets priced for the same quantity into one."""
+        if not parts:
+            raise ValueError("Cannot concatenate zero BidSets")
+        out = cls.empty(parts[0].quantity_tons, parts[0].volume_discount_pct)
+        sellers: List[Seller] = []
+        for part in parts:
+            sellers.extend(part.sellers)
+            out.mode_codes.extend(part.mode_codes)
+            for name in cls.FLOAT_FIELDS:
+                getattr(out, name).extend(getattr(part, name))
+        out.sellers = sellers
+        return out
+
+    # ----- SEQUENCE INTERFACE -----
+
+    def __len__(self) -> int:
+        return len(self.sellers)
+
+    @overload
+    def __getitem__(self, i: int) -> Bid: ...
+    @overload
+    def __getitem__(self, i: slice) -> "BidSet": ...
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Bid, "BidSet"]:
+        if isinstance(i, slice):
+            return self.take(range(*i.indices(len(self))))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("BidSet index out of range")
+        return self.bid(i)
+
+    def __iter__(self) -> Iterator[Bid]:
+        for i in range(len(self)):
+            yield self.bid(i)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (BidSet, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"BidSet({len(self)} bids, quantity_tons={self.quantity_tons})"
+
+    # ----- LIST INTERFACE -----
+
+    def __setitem__(self, i: Union[int, slice], value: Union[Bid, Iterable[Bid]]) -> None:
+        if isinstance(i, slice):
+            rows = [self._row(b) for b in value]  # type: ignore[union-attr]
+            self._writable()
+            for c, column in enumerate(self._columns()):
+                column[i] = self._like(column, [row[c] for row in rows])
+        else:
+            row = self._row(value)  # type: ignore[arg-type]
+            self._writable()
+            for column, v in zip(self._columns(), row):
+                column[i] = v
+
+    def __delitem__(self, i: Union[int, slice]) -> None:
+        self._writable()
+        for column in self._columns():
+            del column[i]
+
+    def insert(self, i: int, bid: Bid) -> None:
+        row = self._row(bid)
+        self._writable()
+        for column, v in zip(self._columns(), row):
+            column.insert(i, v)
+
+    def clear(self) -> None:
+        del self[:]
+
+    def sort(self, *, key: Optional[Callable[[Bid], Any]] = None, reverse: bool = False) -> None:
+        """In-place sort, like list.sort (use argsort/sorted to sort on a column without creating bids)."""
+        self._reorder(sorted(
+            range(len(self)),
+            key=(lambda i: key(self.bid(i))) if key is not None else self.bid,
+            reverse=reverse,
+        ))
+
+    def reverse(self) -> None:
+        self._reorder(range(len(self) - 1, -1, -1))
+
+    def copy(self) -> "BidSet":
+        return self.take(range(len(self)))
+
+    def __add__(self, other: Iterable[Bid]) -> List[Bid]:
+        return list(self) + list(other)
+
+    def __radd__(self, other: Iterable[Bid]) -> List[Bid]:
+        return list(other) + list(self)
+
+    def _columns(self) -> List[Any]:
+        return [self.sellers, self.mode_codes, *(getattr(self, name) for name in self.FLOAT_FIELDS)]
+
+    def _writable(self) -> None:
+        """Copy the seller list before the first change, and forget the cached winner."""
+        if not self._owns_sellers:
+            self.sellers = list(self.sellers)
+            self._owns_sellers = True
+        self._winner = None
+
+    def _reorder(self, order: Sequence[int]) -> None:
+        reordered = self.take(order)
+        self.sellers, self._owns_sellers, self._winner = reordered.sellers, True, None
+        self.mode_codes = reordered.mode_codes
+        for name in self.FLOAT_FIELDS:
+            setattr(self, name, getattr(reordered, name))
+
+    def _row(self, bid: Bid) -> Tuple[Any, ...]:
+        """A bid's values in _columns() order; it must be priced like the rest of the set."""
+        if len(self) == 0:
+            self.quantity_tons, self.volume_discount_pct = bid.quantity_tons, bid.volume_discount_pct
+        elif (bid.quantity_tons, bid.volume_discount_pct) != (self.quantity_tons, self.volume_discount_pct):
+            raise ValueError("Bid was priced for a different quantity than this BidSet")
+        return (bid.seller, TRANSPORT_MODES.index(bid.transport_mode),
+                *(getattr(bid, name) for name in self.FLOAT_FIELDS))
+
+    @staticmethod
+    def _like(column: Any, values: List[Any]) -> Any:
+        return array(column.typecode, values) if isinstance(column, array) else values
+
+    def bid(self, i: int) -> Bid:
+        """Materialize the i-th bid."""
+        seller = self.sellers[i]
+        return Bid(
+            seller=seller,
+            distance_km=self.distance_km[i],
+            transport_mode=TRANSPORT_MODES[self.mode_codes[i]],
+            cost_per_ton=self.cost_per_ton[i],
+            risk_buffer_per_ton=self.risk_buffer_per_ton[i],
+            offer_price_per_ton=self.offer_price_per_ton[i],
+            gross_total_undiscounted=self.gross_total_undiscounted[i],
+            volume_discount_pct=self.volume_discount_pct,
+            volume_discount_total=self.volume_discount_total[i],
+            gross_total=self.gross_total[i],
+            is_eaf=seller.is_eaf,
+            eaf_discount_total=self.eaf_discount_total[i],
+            net_price_per_ton=self.net_price_per_ton[i],
+            net_total=self.net_total[i],
+            quantity_tons=self.quantity_tons,
+        )
+
+    # ----- ARRAY OPERATIONS -----
+
+    def _key(self, key: str) -> Callable[[int], object]:
+        if key == "seller_name":
+            sellers = self.sellers
+            return lambda i: sellers[i].name
+        if key == "transport_mode":
+            return self.mode_codes.__getitem__
+        if key not in self.FLOAT_FIELDS:
+            raise KeyError(f"Unknown bid column: {key!r}")
+        return getattr(self, key).__getitem__
+
+    @property
+    def winner_index(self) -> int:
+        """Index of the lowest net price per ton (first one on ties)."""
+        if self._winner is None:
+            if not len(self):
+                raise ValueError("No bids in BidSet")
+            prices = self.net_price_per_ton
+            self._winner = min(range(len(prices)), key=prices.__getitem__)
+        return self._winner
+
+    @property
+    def winner(self) -> Bid:
+        return self.bid(self.winner_index)
+
+    def argsort(self, key: str = "net_price_per_ton", descending: bool = False) -> List[int]:
+        return sorted(range(len(self)), key=self._key(key), reverse=descending)
+
+    def top_k_indices(self, k: int, key: str = "net_price_per_ton", descending: bool = False) -> List[int]:
+        """Indices of the k best bids by `key`, using partial selection."""
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(k, range(len(self)), key=self._key(key))
+
+    def take(self, indices: Sequence[int]) -> "BidSet":
+        """New BidSet with the bids at `indices`, in that order."""
+        return BidSet(
+            [self.sellers[i] for i in indices],
+            self.quantity_tons,
+            self.volume_discount_pct,
+            array("b", [self.mode_codes[i] for i in indices]),
+            **{name: array("d", [getattr(self, name)[i] for i in indices]) for name in self.FLOAT_FIELDS},
+        )
+
+    def sorted(self, key: str = "net_price_per_ton", descending: bool = False) -> "BidSet":
+        return self.take(self.argsort(key, descending))
+
+    def top_k(self, k: int, key: str = "net_price_per_ton", descending: bool = False) -> "BidSet":
+        return self.take(self.top_k_indices(k, key, descending))
+
+    def where(self, mask: Sequence[bool]) -> "BidSet":
+        """Bids whose mask entry is true."""
+        return self.take([i for i, keep in enumerate(mask) if keep])
+
+    def to_list(self) -> List[Bid]:
+        return list(self)
+
+
+def writable_column(column: Sequence) -> Sequence:
+    """
+    `column` if it supports item assignment, else a writable copy of it
+    (an array of the same typecode for read-only buffers, e.g. memory-mapped
+    snapshot sections; a list otherwise).
+    """
+    if isinstance(column, memoryview):
+        if not column.readonly:
+            return column
+        copy = array(column.format)
+        copy.frombytes(column.cast("B"))
+        return copy
+    if hasattr(column, "__setitem__"):
+        return column
+    return list(column)
+
+
+def _detached_column(column: Sequence) -> Sequence:
+    # Columns that cannot be written (e.g. read-only mapped sections) are shared
+    if (isinstance(column, memoryview) and column.readonly) or not hasattr(column, "__setitem__"):
+        return column
+    return column.copy() if hasattr(column, "copy") else column[:]
+
+
+def _array_column(typecode: str, column: Sequence) -> "array":
+    if isinstance(column, memoryview):
+        copy = array(column.format)
+        copy.frombytes(column.cast("B"))
+        return copy
+    return array(typecode, column)
+
+
+class SellerRows(Sequence[Seller]):
+    """
+    Sequence of Seller over per-field columns. Seller objects are only
+    created when an element is accessed, so very large seller books
+    (generated or loaded from disk) can be priced from their columns alone.
+    Rows can be replaced in place; read-only columns are copied on first write.
+    """
+    def __init__(
+        self,
+        names: Sequence[str],
+        lat: Sequence[float],
+        lon: Sequence[float],
+        msrp: Sequence[float],
+        base_cost: Sequence[float],
+        risk_aversion: Sequence[float],
+        is_eaf: Sequence[bool],
+    ):
+        self.names = names
+        self.lat = lat
+        self.lon = lon
+        self.msrp = msrp
+        self.base_cost = base_cost
+        self.risk_aversion = risk_aversion
+        self.is_eaf = is_eaf
+
+    @classmethod
+    def from_sellers(cls, sellers: Sequence[Seller]) -> "SellerRows":
+        return cls(
+            [s.name for s in sellers],
+            array("d", (s.location.lat for s in sellers)),
+            array("d", (s.location.lon for s in sellers)),
+            array("d", (s.msrp for s in sellers)),
+            array("d", (s.base_cost for s in sellers)),
+            array("d", (s.risk_aversion for s in sellers)),
+            array("b", (1 if s.is_eaf else 0 for s in sellers)),
+        )
+
+    def detached(self) -> "SellerRows":
+        """
+        Rows that later writes to these ones do not affect. Columns that
+        cannot be written (e.g. read-only mapped ones) are shared, not copied.
+        """
+        return SellerRows(*(_detached_column(c) for c in (
+            self.names, self.lat, self.lon, self.msrp, self.base_cost, self.risk_aversion, self.is_eaf,
+        )))
+
+    def packed(self) -> "SellerRows":
+        """Copy over plain arrays and a list of names, e.g. to pickle for another process."""
+        return SellerRows(
+            list(self.names),
+            _array_column("d", self.lat),
+            _array_column("d", self.lon),
+            _array_column("d", self.msrp),
+            _array_column("d", self.base_cost),
+            _array_column("d", self.risk_aversion),
+            _array_column("b", self.is_eaf),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, i: int) -> Seller: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[Seller]: ...
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return Seller(
+            name=self.names[i],
+            location=Point(self.lat[i], self.lon[i]),
+            msrp=self.msrp[i],
+            base_cost=self.base_cost[i],
+            risk_aversion=self.risk_aversion[i],
+            is_eaf=bool(self.is_eaf[i]),
+        )
+
+    def __setitem__(self, i: int, seller: Seller) -> None:
+        if i < 0:
+            i += len(self)
+        for name, value in (
+            ("names", seller.name),
+            ("lat", seller.location.lat),
+            ("lon", seller.location.lon),
+            ("msrp", seller.msrp),
+            ("base_cost", seller.base_cost),
+            ("risk_aversion", seller.risk_aversion),
+            ("is_eaf", seller.is_eaf),
+        ):
+            column = writable_column(getattr(self, name))
+            column[i] = value
+            setattr(self, name, column)
+
+
+class IndexedNames(Sequence[str]):
+    """Names "<prefix><zero-padded index>", computed on access instead of stored."""
+    def __init__(self, prefix: str, n: int, width: int = 7):
+        self.prefix = prefix
+        self.n = n
+        self.width = width
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        return f"{self.prefix}{i:0{self.width}d}"
+
+
 # ---------- DEFAULT SELLERS ----------
 
 def make_default_sellers() -> List[Seller]:
@@ -0,0 +1,344 @@
+"""
+Order persistence on SQLite (WAL mode).
+
+Reads go through a small pool of connections; writes are queued to a single
+writer thread that commits whatever has accumulated as one transaction
+(group commit), so concurrent order creation costs one fsync per batch rather
+than per order. Listing uses composite indexes ending in (created_at, id) and
+keyset pagination, so a page costs the same however deep into the table it is.
+Every call that touches the database blocks, so async callers should run
+reads with asyncio.to_thread and await writes via asyncio.wrap_future.
+"""
+from __future__ import annotations
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass, astuple, fields
+from typing import Any, Iterator, List, Optional, Tuple
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+from .models import Bid
+
+
+ORDER_STATUSES = ("Pending", "In transit", "Settled", "Cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    order_id TEXT NOT NULL UNIQUE,
+    buyer TEXT NOT NULL,
+    seller TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    quantity_tons REAL NOT NULL,
+    net_price_per_ton REAL NOT NULL,
+    net_total REAL NOT NULL,
+    transport_mode TEXT NOT NULL,
+    distance_km REAL NOT NULL,
+    is_eaf INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lon REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_by_created ON orders (created_at, id);
+CREATE INDEX IF NOT EXISTS orders_by_buyer ON orders (buyer, created_at, id);
+CREATE INDEX IF NOT EXISTS orders_by_seller ON orders (seller, created_at, id);
+CREATE INDEX IF NOT EXISTS orders_by_status ON orders (status, created_at, id);
+"""
+
+
+@dataclass
+class Order:
+    order_id: str
+    buyer: str
+    seller: str
+    status: str
+    created_at: float               # epoch seconds
+    quantity_tons: float
+    net_price_per_ton: float
+    net_total: float
+    transport_mode: str
+    distance_km: float
+    is_eaf: bool
+    lat: float
+    lon: float
+
+    @classmethod
+    def from_bid(cls, bid: Bid, buyer: str, lat: float, lon: float) -> "Order":
+        return cls(
+            order_id=f"ORD-{uuid.uuid4().hex[:12].upper()}",
+            buyer=buyer,
+            seller=bid.seller.name,
+            status="Pending",
+            created_at=time.time(),
+            quantity_tons=bid.quantity_tons,
+            net_price_per_ton=bid.net_price_per_ton,
+            net_total=bid.net_total,
+            transport_mode=bid.transport_mode,
+            distance_km=bid.distance_km,
+            is_eaf=bid.is_eaf,
+            lat=lat,
+            lon=lon,
+        )
+
+
+_COLUMNS = tuple(f.name for f in fields(Order))
+_SELECT = f"SELECT id, {', '.join(_COLUMNS)} FROM orders"
+
+
+def _row_to_order(row: Tuple[Any, ...]) -> Order:
+    order = Order(*row[1:])
+    order.is_eaf = bool(order.is_eaf)
+    return order
+
+
+def encode_cursor(created_at: float, row_id: int) -> str:
+    return f"{created_at!r}:{row_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        created_at, row_id = cursor.rsplit(":", 1)
+        return float(created_at), int(row_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+
+
+# ---------- CONNECTIONS ----------
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections in WAL mode, created on first use."""
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn: Optional[sqlite3.Connection] = None
+        with self._lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                conn = self._connect()
+        if conn is None:
+            conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        """Close the idle connections (all of them once no caller holds one)."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+# ---------- STORE ----------
+
+class OrderStore:
+    """
+    Orders table plus a group-commit writer thread.
+
+    Writes queued within `commit_window_ms` of each other (up to
+    `max_batch` of them) are committed in one transaction.
+    """
+    def __init__(self, path: str, pool_size: int = 4, max_batch: int = 512, commit_window_ms: float = 2.0):
+        self.pool = ConnectionPool(path, pool_size)
+        self.max_batch = max_batch
+        self.commit_window_ms = commit_window_ms
+        self._writes: "queue.Queue[Optional[Tuple[str, Tuple[Any, ...], Future]]]" = queue.Queue()  # None stops the writer
+        self._writer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _ensure_schema(self) -> None:
+        if not self._schema_ready:
+            with self.pool.connection() as conn:
+                conn.executescript(_SCHEMA)
+            self._schema_ready = True
+
+    def start(self) -> None:
+        """
+        Create the schema and start the writer thread. Blocks on SQLite, so
+        call it off the event loop (the server does so while warming up).
+        """
+        self._ensure_schema()
+        self._start_writer()
+
+    def close(self) -> None:
+        """Commit the queued writes, stop the writer thread and close the connections."""
+        with self._start_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._writes.put(None)
+            writer.join()
+        self.pool.close()
+
+    def _start_writer(self) -> None:
+        if self._writer is None:
+            with self._start_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_forever, daemon=True)
+                    self._writer.start()
+
+    # ----- WRITES -----
+
+    def _submit(self, sql: str, params: Tuple[Any, ...]) -> Future:
+        # Never touches SQLite: the writer thread creates the schema if start() has not
+        self._start_writer()
+        future: Future = Future()
+        self._writes.put((sql, params, future))
+        return future
+
+    def create(self, order: Order) -> Future:
+        """Queue an order insert; the future resolves to the order once committed."""
+        sql = f"INSERT INTO orders ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})"
+        inserted = self._submit(sql, astuple(order))
+        result: Future = Future()
+
+        def done(f: Future) -> None:
+            error = f.exception()
+            if error is not None:
+                result.set_exception(error)
+            else:
+                result.set_result(order)
+
+        inserted.add_done_callback(done)
+        return result
+
+    def set_status(self, order_id: str, status: str) -> Future:
+        """Queue a status change; the future resolves to True if the order exists."""
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Unknown order status {status!r}. Valid statuses: {list(ORDER_STATUSES)}")
+        return self._submit("UPDATE orders SET status = ? WHERE order_id = ?", (status, order_id))
+
+    def _write_forever(self) -> None:
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            stopping = False
+            while not stopping:
+                first = self._writes.get()
+                if first is None:
+                    return
+                batch = [first]
+                deadline = time.monotonic() + self.commit_window_ms / 1000.0
+                while len(batch) < self.max_batch:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        write = self._writes.get(timeout=timeout) if timeout > 0 else self._writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if write is None:
+                        stopping = True
+                        break
+                    batch.append(write)
+                self._commit(conn, batch)
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[Tuple[str, Tuple[Any, ...], Future]]) -> None:
+        try:
+            results = self._execute(conn, batch, isolate=False)
+        except sqlite3.Error:
+            # Some write failed: redo the batch with each write in a savepoint
+            # so only the failing ones are rejected
+            try:
+                results = self._execute(conn, batch, isolate=True)
+            except sqlite3.Error as e:
+                results = [e] * len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _execute(
+        conn: sqlite3.Connection, batch: List[Tuple[str, Tuple[Any, ...], Future]], isolate: bool,
+    ) -> List[Any]:
+        results: List[Any] = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params, _ in batch:
+                if not isolate:
+                    results.append(conn.execute(sql, params).rowcount > 0)
+                    continue
+                conn.execute("SAVEPOINT w")
+                try:
+                    results.append(conn.execute(sql, params).rowcount > 0)
+                    conn.execute("RELEASE w")
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO w")
+                    conn.execute("RELEASE w")
+                    results.append(e)
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return results
+
+    # ----- READS -----
+
+    def get(self, order_id: str) -> Optional[Order]:
+        self._ensure_schema()
+        with self.pool.connection() as conn:
+            row = conn.execute(f"{_SELECT} WHERE order_id = ?", (order_id,)).fetchone()
+        return _row_to_order(row) if row else None
+
+    def list(
+        self,
+        buyer: Optional[str] = None,
+        seller: Optional[str] = None,
+        status: Optional[str] = None,
+        created_from: Optional[float] = None,
+        created_to: Optional[float] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Order], Optional[str]]:
+        """
+        Orders newest first, filtered by buyer / seller / status and a
+        created_at range [created_from, created_to). Returns the page and the
+        cursor for the next page (None on the last page).
+        """
+        self._ensure_schema()
+        where, params = [], []  # type: List[str], List[Any]
+        for column, value in (("buyer", buyer), ("seller", seller), ("status", status)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if created_from is not None:
+            where.append("created_at >= ?")
+            params.append(created_from)
+        if created_to is not None:
+            where.append("created_at < ?")
+            params.append(created_to)
+        if cursor is not None:
+            where.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+
+        sql = _SELECT
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self.pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][_COLUMNS.index("created_at") + 1], rows[-1][0])
+        return [_row_to_order(r) for r in rows], next_cursor
@@ -0,0 +1,308 @@
+"""
+Declarative pricing policies.
+
+A policy is an ordered list of stages (logistics, risk buffer, volume
+discount, EAF discount) with their tier tables and coefficients. Policies
+compile once into flat lookup tables that the batch kernel in pricing.py
+evaluates over whole seller arrays, and that Seller uses for scalar quotes,
+so there is a single definition of the pricing formula.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import json
+import math
+
+
+INF = math.inf
+
+
+# ---------- STAGES ----------
+
+@dataclass(frozen=True)
+class LogisticsStage:
+    """
+    Per-ton logistics cost: base_cost * fraction_per_1000km[mode] * distance / 1000,
+    with the mode picked from distance by `mode_tiers` (upper bound inclusive).
+    """
+    mode_tiers: Tuple[Tuple[float, str], ...]
+    fraction_per_1000km: Dict[str, float]
+    type: str = "logistics"
+
+
+@dataclass(frozen=True)
+class RiskBufferStage:
+    """
+    Adds weight * Seller.risk_buffer() to the per-ton offer.
+    """
+    weight: float
+    type: str = "risk_buffer"
+
+
+@dataclass(frozen=True)
+class VolumeDiscountStage:
+    """
+    Fractional discount on the running total by order size.
+    `tiers` are (upper bound inclusive in tons, discount fraction).
+    """
+    tiers: Tuple[Tuple[float, float], ...]
+    type: str = "volume_discount"
+
+
+@dataclass(frozen=True)
+class EafDiscountStage:
+    """
+    Discount of risk_aversion * per_risk_aversion on the running total,
+    for EAF sellers only.
+    """
+    per_risk_aversion: float
+    type: str = "eaf_discount"
+
+
+Stage = Union[LogisticsStage, RiskBufferStage, VolumeDiscountStage, EafDiscountStage]
+
+_STAGE_TYPES = {
+    "logistics": LogisticsStage,
+    "risk_buffer": RiskBufferStage,
+    "volume_discount": VolumeDiscountStage,
+    "eaf_discount": EafDiscountStage,
+}
+_DISCOUNT_STAGES = ("volume_discount", "eaf_discount")
+_TRANSPORT_MODES = ("truck", "rail", "ocean")
+
+
+def _bound(x: Optional[float]) -> float:
+    return INF if x is None else float(x)
+
+
+def _unbound(x: float) -> Optional[float]:
+    return None if x == INF else x
+
+
+def _stage_from_dict(kind: str, raw: Dict[str, Any]) -> Stage:
+    if kind == "logistics":
+        mode_tiers = tuple((_bound(ub), str(mode)) for ub, mode in raw["mode_tiers"])
+        fractions = {str(m): float(f) for m, f in dict(raw["fraction_per_1000km"]).items()}
+        return LogisticsStage(mode_tiers=mode_tiers, fraction_per_1000km=fractions)
+    if kind == "risk_buffer":
+        return RiskBufferStage(weight=float(raw["weight"]))
+    if kind == "volume_discount":
+        return VolumeDiscountStage(tiers=tuple((_bound(ub), float(pct)) for ub, pct in raw["tiers"]))
+    return EafDiscountStage(per_risk_aversion=float(raw["per_risk_aversion"]))
+
+
+# ---------- POLICY ----------
+
+@dataclass(frozen=True)
+class PricingPolicy:
+    """
+    Ordered pricing stages. Per-ton stages (logistics, risk_buffer) must come
+    before the discount stages, which apply to the running total in order.
+    """
+    name: str
+    stages: Tuple[Stage, ...]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PricingPolicy":
+        """
+        Build a policy from its JSON form. Tier upper bounds may be null for "no limit".
+        Raises ValueError if `data` is not a well-formed policy.
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("stages"), list):
+            raise ValueError("Pricing policy must be an object with a list of stages")
+        name = data.get("name", "custom")
+        if not isinstance(name, str):
+            raise ValueError("Pricing policy name must be a string")
+        stages: List[Stage] = []
+        for raw in data["stages"]:
+            if not isinstance(raw, dict):
+                raise ValueError(f"Pricing stage must be an object, got {raw!r}")
+            kind = raw.get("type")
+            if not isinstance(kind, str) or kind not in _STAGE_TYPES:
+                raise ValueError(f"Unknown pricing stage type: {kind!r}")
+            try:
+                stages.append(_stage_from_dict(kind, raw))
+            except KeyError as e:
+                raise ValueError(f"{kind} stage is missing {e.args[0]!r}") from None
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"Malformed {kind} stage: {e}") from None
+        return cls(name=name, stages=tuple(stages))
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages: List[Dict[str, Any]] = []
+        for st in self.stages:
+            if isinstance(st, LogisticsStage):
+                stages.append({
+                    "type": st.type,
+                    "mode_tiers": [[_unbound(ub), mode] for ub, mode in st.mode_tiers],
+                    "fraction_per_1000km": dict(st.fraction_per_1000km),
+                })
+            elif isinstance(st, RiskBufferStage):
+                stages.append({"type": st.type, "weight": st.weight})
+            elif isinstance(st, VolumeDiscountStage):
+                stages.append({
+                    "type": st.type,
+                    "tiers": [[_unbound(ub), pct] for ub, pct in st.tiers],
+                })
+            else:
+                stages.append({"type": st.type, "per_risk_aversion": st.per_risk_aversion})
+        return {"name": self.name, "stages": stages}
+
+    def compile(self) -> "CompiledPolicy":
+        return CompiledPolicy.from_policy(self)
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledPolicy:
+    """
+    Flattened form of a PricingPolicy: sorted tier bounds for bisect lookups
+    and plain coefficients for the fused evaluator. Absent stages compile to
+    no-ops (zero logistics, zero buffer, no discount).
+    """
+    name: str
+    mode_bounds: Tuple[float, ...]
+    modes: Tuple[str, ...]
+    fraction_per_1000km: Dict[str, float]
+    risk_buffer_weight: float
+    volume_bounds: Tuple[float, ...]
+    volume_pcts: Tuple[float, ...]
+    eaf_per_risk_aversion: float
+    eaf_before_volume: bool
+    source: PricingPolicy = field(repr=False)
+
+    @classmethod
+    def from_policy(cls, policy: PricingPolicy) -> "CompiledPolicy":
+        seen: Dict[str, Stage] = {}
+        order: List[str] = []
+        for st in policy.stages:
+            if st.type in seen:
+                raise ValueError(f"Pricing policy {policy.name!r} has more than one {st.type} stage")
+            if st.type not in _DISCOUNT_STAGES and any(t in _DISCOUNT_STAGES for t in order):
+                raise ValueError(
+                    f"Pricing policy {policy.name!r}: {st.type} stage must come before discount stages"
+                )
+            seen[st.type] = st
+            order.append(st.type)
+
+        logistics = seen.get("logistics")
+        if logistics is not None:
+            tiers = sorted(logistics.mode_tiers)  # type: ignore[union-attr]
+            if not tiers or tiers[-1][0] != INF:
+                raise ValueError(f"Pricing policy {policy.name!r}: last mode tier must be unbounded")
+            unknown = {m for _, m in tiers} - set(_TRANSPORT_MODES)
+            if unknown:
+                raise ValueError(f"Pricing policy {policy.name!r}: unknown transport modes {sorted(unknown)}")
+            missing = {m for _, m in tiers} - set(logistics.fraction_per_1000km)  # type: ignore[union-attr]
+            if missing:
+                raise ValueError(f"Pricing policy {policy.name!r}: no logistics fraction for {sorted(missing)}")
+            mode_bounds = tuple(ub for ub, _ in tiers)
+            modes = tuple(m for _, m in tiers)
+            fractions = dict(logistics.fraction_per_1000km)  # type: ignore[union-attr]
+        else:
+            mode_bounds, modes, fractions = (INF,), ("truck",), {"truck": 0.0}
+
+        volume = seen.get("volume_discount")
+        if volume is not None:
+            vtiers = sorted(volume.tiers)  # type: ignore[union-attr]
+            if not vtiers or vtiers[-1][0] != INF:
+                raise ValueError(f"Pricing policy {policy.name!r}: last volume tier must be unbounded")
+            volume_bounds = tuple(ub for ub, _ in vtiers)
+            volume_pcts = tuple(pct for _, pct in vtiers)
+        else:
+            volume_bounds, volume_pcts = (INF,), (0.0,)
+
+        buffer = seen.get("risk_buffer")
+        eaf = seen.get("eaf_discount")
+        return cls(
+            name=policy.name,
+            mode_bounds=mode_bounds,
+            modes=modes,
+            fraction_per_1000km=fractions,
+            risk_buffer_weight=buffer.weight if buffer is not None else 0.0,  # type: ignore[union-attr]
+            volume_bounds=volume_bounds,
+            volume_pcts=volume_pcts,
+            eaf_per_risk_aversion=eaf.per_risk_aversion if eaf is not None else 0.0,  # type: ignore[union-attr]
+            eaf_before_volume=(
+                "eaf_discount" in order and "volume_discount" in order
+                and order.index("eaf_discount") < order.index("volume_discount")
+            ),
+            source=policy,
+        )
+
+    def transport_mode(self, distance_km: float) -> str:
+        return self.modes[bisect_left(self.mode_bounds, distance_km)]
+
+    def volume_discount_pct(self, quantity_tons: float) -> float:
+        return self.volume_pcts[bisect_left(self.volume_bounds, quantity_tons)]
+
+
+# ---------- DEFAULT POLICY ----------
+
+DEFAULT_POLICY = PricingPolicy(
+    name="default",
+    stages=(
+        LogisticsStage(
+            # ≤ 500 km truck, 500–3000 km rail, > 3000 km ocean
+            mode_tiers=((500.0, "truck"), (3000.0, "rail"), (INF, "ocean")),
+            # 1% / 0.5% / 0.2% of base_cost per 1000 km
+            fraction_per_1000km={"truck": 0.010, "rail": 0.005, "ocean": 0.002},
+        ),
+        RiskBufferStage(weight=0.5),
+        VolumeDiscountStage(
+            tiers=((1_000.0, 0.00), (5_000.0, 0.03), (20_000.0, 0.07), (INF, 0.12)),
+        ),
+        EafDiscountStage(per_risk_aversion=0.06),
+    ),
+)
+
+DEFAULT_COMPILED_POLICY = DEFAULT_POLICY.compile()
+
+
+# ---------- PER-TENANT REGISTRY ----------
+
+class PolicyRegistry:
+    """
+    Compiled pricing policies by tenant. Unknown tenants get the default policy.
+
+    Callbacks in `on_discard` are called with each policy that is replaced or
+    removed, so caches keyed on it (e.g. SellerColumns.terms_for) can drop it.
+    """
+    def __init__(self, default: CompiledPolicy = DEFAULT_COMPILED_POLICY):
+        self.default = default
+        self._by_tenant: Dict[str, CompiledPolicy] = {}
+        self.on_discard: List[Callable[[CompiledPolicy], None]] = []
+
+    def get(self, tenant: Optional[str]) -> CompiledPolicy:
+        if tenant is None:
+            return self.default
+        return self._by_tenant.get(tenant, self.default)
+
+    def set(self, tenant: str, policy: PricingPolicy) -> CompiledPolicy:
+        compiled = policy.compile()
+        old = self._by_tenant.get(tenant)
+        self._by_tenant[tenant] = compiled
+        if old is not None:
+            self._discard(old)
+        return compiled
+
+    def remove(self, tenant: str) -> None:
+        old = self._by_tenant.pop(tenant, None)
+        if old is not None:
+            self._discard(old)
+
+    def _discard(self, policy: CompiledPolicy) -> None:
+        for callback in self.on_discard:
+            callback(policy)
+
+    def tenants(self) -> List[str]:
+        return sorted(self._by_tenant)
+
+    def load_json(self, path: str) -> None:
+        """
+        Load {"tenant": <policy dict>, ...} from a JSON file.
+        """
+        with open(path) as f:
+            data = json.load(f)
+        for tenant, raw in data.items():
+            self.set(tenant, PricingPolicy.from_dict(raw))
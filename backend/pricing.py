@@ -0,0 +1,410 @@
+"""
+Batch pricing kernel: prices many buyer requests against the seller book in one pass.
+
+Seller-side terms (radians, risk buffer, EAF factor) are computed once per batch
+instead of once per (request, seller) pair, which is where most of the Python
+overhead of calling Seller.quote_price() in a loop goes. Coefficients and tiers
+come from a CompiledPolicy (see policy.py).
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union, TYPE_CHECKING
+import math
+import time
+
+from .models import Seller, SellerRows, Point, Bid, BidSet, TRANSPORT_MODES, writable_column
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+EARTH_RADIUS_KM = 6371.0  # same constant as Point.distance_km_to
+
+
+@dataclass
+class SellerColumns:
+    """
+    Struct-of-arrays view of a seller list, holding every per-seller term
+    of the pricing formula that does not depend on the buyer.
+    """
+    sellers: Sequence[Seller]       # a list, or a lazy SellerRows
+    lat_rad: Sequence[float]
+    lon_rad: Sequence[float]
+    cos_lat: Sequence[float]
+    base_cost: Sequence[float]
+    risk_buffer: Sequence[float]    # full buffer per ton (reported on the bid)
+    risk_aversion: Sequence[float]
+    is_eaf: Sequence[bool]
+    _terms: Dict[CompiledPolicy, "PolicyTerms"] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_sellers(cls, sellers: Sequence[Seller]) -> "SellerColumns":
+        sellers = list(sellers)
+        lat_rad = [math.radians(s.location.lat) for s in sellers]
+        return cls(
+            sellers=sellers,
+            lat_rad=lat_rad,
+            lon_rad=[math.radians(s.location.lon) for s in sellers],
+            cos_lat=[math.cos(x) for x in lat_rad],
+            base_cost=[s.base_cost for s in sellers],
+            risk_buffer=[s.risk_buffer() for s in sellers],
+            risk_aversion=[s.risk_aversion for s in sellers],
+            is_eaf=[s.is_eaf for s in sellers],
+        )
+
+    @classmethod
+    def from_rows(cls, rows: SellerRows) -> "SellerColumns":
+        """Columns straight from a SellerRows' arrays, without creating Seller objects."""
+        radians, cos = math.radians, math.cos
+        lat_rad = array("d", map(radians, rows.lat))
+        return cls(
+            sellers=rows,
+            lat_rad=lat_rad,
+            lon_rad=array("d", map(radians, rows.lon)),
+            cos_lat=array("d", map(cos, lat_rad)),
+            base_cost=rows.base_cost,
+            # Same expression as Seller.risk_buffer
+            risk_buffer=array("d", (
+                (ra - 1.0) * max(m - b, 0)
+                for ra, m, b in zip(rows.risk_aversion, rows.msrp, rows.base_cost)
+            )),
+            risk_aversion=rows.risk_aversion,
+            is_eaf=rows.is_eaf,
+        )
+
+    def __len__(self) -> int:
+        return len(self.sellers)
+
+    def terms_for(self, policy: CompiledPolicy) -> "PolicyTerms":
+        """PolicyTerms for `policy`, cached on these columns until discard_terms(policy)."""
+        terms = self._terms.get(policy)
+        if terms is None:
+            terms = self._terms[policy] = PolicyTerms.bind(policy, self)
+        return terms
+
+    def discard_terms(self, policy: CompiledPolicy) -> None:
+        """Drop the cached terms of a policy that will not be priced again."""
+        self._terms.pop(policy, None)
+
+    def set_row(self, index: int, seller: Seller) -> None:
+        """
+        Replace one seller's row in place, along with its cached policy terms.
+        Read-only columns (e.g. memory-mapped) are copied on first write.
+        """
+        lat_rad = math.radians(seller.location.lat)
+        for name, value in (
+            ("lat_rad", lat_rad),
+            ("lon_rad", math.radians(seller.location.lon)),
+            ("cos_lat", math.cos(lat_rad)),
+            ("base_cost", seller.base_cost),
+            ("risk_buffer", seller.risk_buffer()),
+            ("risk_aversion", seller.risk_aversion),
+            ("is_eaf", seller.is_eaf),
+        ):
+            column = writable_column(getattr(self, name))
+            column[index] = value
+            setattr(self, name, column)
+        if self.sellers[index] is not seller:
+            self.sellers = writable_column(self.sellers)
+            self.sellers[index] = seller
+        # A copy: pricing threads may cache terms for another policy meanwhile
+        for terms in list(self._terms.values()):
+            terms.set_row(index, self)
+
+    def subset(self, indices: Sequence[int]) -> "SellerColumns":
+        """Columns for the sellers at `indices`, in that order."""
+        return SellerColumns(
+            sellers=[self.sellers[i] for i in indices],
+            lat_rad=[self.lat_rad[i] for i in indices],
+            lon_rad=[self.lon_rad[i] for i in indices],
+            cos_lat=[self.cos_lat[i] for i in indices],
+            base_cost=[self.base_cost[i] for i in indices],
+            risk_buffer=[self.risk_buffer[i] for i in indices],
+            risk_aversion=[self.risk_aversion[i] for i in indices],
+            is_eaf=[self.is_eaf[i] for i in indices],
+        )
+
+
+@dataclass
+class PolicyTerms:
+    """
+    Per-seller terms of a compiled policy over one SellerColumns, computed
+    once per batch: the buffer added to the offer and the EAF discount factor.
+    """
+    policy: CompiledPolicy
+    offer_buffer: List[float]
+    eaf_factor: List[float]
+    price_floor: List[float]        # lower bound on net/t before volume discount
+    _priority: Optional[List[int]] = field(default=None, repr=False)
+
+    @classmethod
+    def bind(cls, policy: CompiledPolicy, cols: SellerColumns) -> "PolicyTerms":
+        w = policy.risk_buffer_weight
+        k = policy.eaf_per_risk_aversion
+        offer_buffer = [b * w for b in cols.risk_buffer]
+        eaf_factor = [ra * k if eaf else 0.0 for ra, eaf in zip(cols.risk_aversion, cols.is_eaf)]
+        # Logistics are never negative, so base_cost + buffer bounds the offer from below
+        return cls(
+            policy=policy,
+            offer_buffer=offer_buffer,
+            eaf_factor=eaf_factor,
+            price_floor=[
+                (base + buf) * (1.0 - e)
+                for base, buf, e in zip(cols.base_cost, offer_buffer, eaf_factor)
+            ],
+        )
+
+    def set_row(self, index: int, cols: SellerColumns) -> None:
+        """Recompute seller `index`'s terms after SellerColumns.set_row."""
+        e = cols.risk_aversion[index] * self.policy.eaf_per_risk_aversion if cols.is_eaf[index] else 0.0
+        self.offer_buffer[index] = cols.risk_buffer[index] * self.policy.risk_buffer_weight
+        self.eaf_factor[index] = e
+        self.price_floor[index] = (cols.base_cost[index] + self.offer_buffer[index]) * (1.0 - e)
+        if self._priority is not None:
+            # Move the seller to its new place in the floor order (ties by index, as sorted() leaves them)
+            order = self._priority
+            order.remove(index)
+            floor = self.price_floor
+            key = (floor[index], index)
+            lo, hi = 0, len(order)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if (floor[order[mid]], order[mid]) < key:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            order.insert(lo, index)
+
+    @property
+    def priority(self) -> List[int]:
+        """Seller indices by ascending price floor (cheapest possible first)."""
+        if self._priority is None:
+            floor = self.price_floor
+            self._priority = sorted(range(len(floor)), key=floor.__getitem__)
+        return self._priority
+
+
+def distances_km(cols: SellerColumns, buyer_location: Point) -> List[float]:
+    """
+    Haversine distance from every seller to one buyer, seller -> buyer,
+    evaluated in the same order of operations as Point.distance_km_to.
+    """
+    lat2 = math.radians(buyer_location.lat)
+    lon2 = math.radians(buyer_location.lon)
+    cos_lat2 = math.cos(lat2)
+    sin, atan2, sqrt = math.sin, math.atan2, math.sqrt
+    out = []
+    for lat1, lon1, cos_lat1 in zip(cols.lat_rad, cols.lon_rad, cols.cos_lat):
+        a = (
+            sin((lat2 - lat1) / 2) ** 2
+            + cos_lat1 * cos_lat2 * sin((lon2 - lon1) / 2) ** 2
+        )
+        out.append(EARTH_RADIUS_KM * (2 * atan2(sqrt(a), sqrt(1 - a))))
+    return out
+
+
+def price_columns(
+    cols: SellerColumns,
+    buyer_location: Point,
+    quantity_tons: float,
+    network: Optional["TransportNetwork"] = None,
+    terms: Optional[PolicyTerms] = None,
+) -> BidSet:
+    """
+    Price one buyer request against every seller in `cols`.
+
+    Produces the same bid values as Seller.quote_price() for each seller
+    under the same policy (the default policy if `terms` is not given),
+    written straight into BidSet arrays without creating Bid objects.
+    """
+    if terms is None:
+        terms = cols.terms_for(DEFAULT_COMPILED_POLICY)
+    return _price_legs(cols, _legs(cols, buyer_location, network, terms.policy), quantity_tons, terms)
+
+
+def _legs(
+    cols: SellerColumns,
+    buyer_location: Point,
+    network: Optional["TransportNetwork"],
+    policy: CompiledPolicy,
+) -> Tuple[List[float], List[str], List[float]]:
+    """
+    Per-seller (distance_km, mode, cost_per_ton) to one buyer. None of it
+    depends on the quantity, so requests for the same location can share it.
+    """
+    choose_mode = policy.transport_mode
+    fractions = policy.fraction_per_1000km
+    routes = (
+        network.routes_to([s.location for s in cols.sellers], buyer_location)
+        if network is not None else None
+    )
+    distances, modes, costs = [], [], []
+    for i, distance_km in enumerate(distances_km(cols, buyer_location)):
+        base_cost = cols.base_cost[i]
+        route = routes[i] if routes is not None else None
+        if route is None:
+            mode = choose_mode(distance_km)
+            cost_per_ton = base_cost + base_cost * fractions[mode] * (distance_km / 1000.0)
+        else:
+            distance_km, mode = route.distance_km, route.mode
+            cost_per_ton = base_cost + route.cost_per_ton
+        distances.append(distance_km)
+        modes.append(mode)
+        costs.append(cost_per_ton)
+    return distances, modes, costs
+
+
+def _price_legs(
+    cols: SellerColumns,
+    legs: Tuple[List[float], List[str], List[float]],
+    quantity_tons: float,
+    terms: PolicyTerms,
+) -> BidSet:
+    policy = terms.policy
+    mode_code = {m: i for i, m in enumerate(TRANSPORT_MODES)}
+    volume_pct = policy.volume_discount_pct(quantity_tons)
+    eaf_first = policy.eaf_before_volume
+
+    out = BidSet.empty(quantity_tons, volume_pct)
+    out.sellers = cols.sellers
+    modes = out.mode_codes
+    (distance_col, cost_col, buffer_col, offer_col, gross0_col, volume_col,
+     gross_col, eaf_col, net_pp_col, net_col) = (getattr(out, f) for f in BidSet.FLOAT_FIELDS)
+
+    for i, (distance_km, mode, cost_per_ton) in enumerate(zip(*legs)):
+        offer_price_per_ton = cost_per_ton + terms.offer_buffer[i]
+
+        gross_total_undiscounted = offer_price_per_ton * quantity_tons
+        eaf_factor = terms.eaf_factor[i]
+        if eaf_first:
+            eaf_discount_total = eaf_factor * gross_total_undiscounted
+            volume_discount_total = (gross_total_undiscounted - eaf_discount_total) * volume_pct
+            gross_total = gross_total_undiscounted - volume_discount_total
+        else:
+            volume_discount_total = gross_total_undiscounted * volume_pct
+            gross_total = gross_total_undiscounted - volume_discount_total
+            eaf_discount_total = eaf_factor * gross_total if cols.is_eaf[i] else 0.0
+        net_total = gross_total - eaf_discount_total
+
+        modes.append(mode_code[mode])
+        distance_col.append(distance_km)
+        cost_col.append(cost_per_ton)
+        buffer_col.append(cols.risk_buffer[i])
+        offer_col.append(offer_price_per_ton)
+        gross0_col.append(gross_total_undiscounted)
+        volume_col.append(volume_discount_total)
+        gross_col.append(gross_total)
+        eaf_col.append(eaf_discount_total)
+        net_pp_col.append(net_total / quantity_tons)
+        net_col.append(net_total)
+    return out
+
+
+def price_columns_anytime(
+    cols: SellerColumns,
+    buyer_location: Point,
+    quantity_tons: float,
+    deadline_ms: float,
+    network: Optional["TransportNetwork"] = None,
+    terms: Optional[PolicyTerms] = None,
+    chunk_size: int = 64,
+) -> BidSet:
+    """
+    Price sellers in order of their lower-bound price until the best bid
+    found cannot be beaten or `deadline_ms` runs out.
+
+    The returned BidSet holds only the sellers that were evaluated. It is
+    exact if every unevaluated seller's lower bound is at least the best
+    net price found; otherwise `exact` is False and `max_gap_per_ton` bounds
+    how far the true winner's net price per ton can be below the returned one.
+
+    The budget runs from this call, and includes sorting the price floors the
+    first time `terms` is used; callers that build the columns or terms
+    themselves pass what is left of their own budget.
+    """
+    start = time.perf_counter()
+    budget = deadline_ms / 1000.0
+    if terms is None:
+        terms = cols.terms_for(DEFAULT_COMPILED_POLICY)
+    volume_multiplier = 1.0 - terms.policy.volume_discount_pct(quantity_tons)
+    order = terms.priority
+    floor = terms.price_floor
+
+    parts: List[BidSet] = []
+    best = float("inf")
+    pos = 0
+    while pos < len(order):
+        # Everything left is at least this expensive (floors are sorted)
+        next_lb = floor[order[pos]] * volume_multiplier
+        if next_lb * (1.0 - 1e-12) >= best:
+            break
+        if parts and time.perf_counter() - start >= budget:
+            break
+        chunk = order[pos:pos + chunk_size]
+        sub = cols.subset(chunk)
+        part = price_columns(sub, buyer_location, quantity_tons, network, _sub_terms(terms, chunk))
+        parts.append(part)
+        best = min(best, part.net_price_per_ton[part.winner_index])
+        pos += len(chunk)
+
+    out = BidSet.concat(parts) if parts else BidSet.empty(quantity_tons, 1.0 - volume_multiplier)
+    if pos < len(order):
+        next_lb = floor[order[pos]] * volume_multiplier
+        gap = best - next_lb
+        if gap > 0:
+            out.exact = False
+            out.max_gap_per_ton = gap
+    return out
+
+
+def _sub_terms(terms: PolicyTerms, indices: Sequence[int]) -> PolicyTerms:
+    return PolicyTerms(
+        policy=terms.policy,
+        offer_buffer=[terms.offer_buffer[i] for i in indices],
+        eaf_factor=[terms.eaf_factor[i] for i in indices],
+        price_floor=[terms.price_floor[i] for i in indices],
+    )
+
+
+def price_batch(
+    sellers: Union[Sequence[Seller], SellerColumns],
+    requests: Sequence[Tuple[Point, float]],
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    policies: Optional[Sequence[CompiledPolicy]] = None,
+) -> List[Tuple[Bid, BidSet]]:
+    """
+    Run one reverse auction per (buyer_location, quantity_tons) request,
+    sharing the seller-side precomputation across the whole batch.
+
+    Args:
+        sellers: List of Seller objects, or prebuilt SellerColumns
+        requests: Sequence of (buyer_location, quantity_tons) pairs
+        network: Optional TransportNetwork for routed logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+        policies: Optional per-request policies, overriding `policy`
+
+    Returns:
+        List of (winning_bid, all_bids) tuples, one per request, in order;
+        all_bids is a BidSet
+    """
+    if not len(sellers):
+        raise ValueError("Cannot run an auction with no sellers")
+    cols = sellers if isinstance(sellers, SellerColumns) else SellerColumns.from_sellers(sellers)
+    # Distances, routes and logistics costs depend only on (location, policy),
+    # so requests repeating a location in the batch are priced from one set of legs
+    groups: Dict[Tuple[Point, CompiledPolicy], List[int]] = {}
+    for j, (buyer_location, _) in enumerate(requests):
+        p = policies[j] if policies is not None else policy
+        groups.setdefault((buyer_location, p), []).append(j)
+
+    results: List[Tuple[Bid, BidSet]] = [None] * len(requests)  # type: ignore[list-item]
+    for (buyer_location, p), indices in groups.items():
+        legs = _legs(cols, buyer_location, network, p)
+        terms = cols.terms_for(p)
+        for j in indices:
+            bids = _price_legs(cols, legs, requests[j][1], terms)
+            results[j] = (bids.winner, bids)
+    return results
@@ -0,0 +1,284 @@
+"""
+On-demand sampling profiler and slow-request capture.
+
+Both sample Python stacks from a background thread via sys._current_frames(),
+so nothing is instrumented and the cost is paid only while sampling. Stacks
+are reported in collapsed ("folded") form, one `root;...;leaf count` line
+per distinct stack, which flamegraph.pl, speedscope and most flame graph
+viewers read directly. Each stack is rooted at its thread's name.
+
+SlowRequestRecorder hooks into ServerTimingMiddleware: while a request is in
+flight past the latency threshold it samples the busy threads, and when the
+request completes over the threshold it keeps the request's stage timings
+and stack samples in a bounded ring buffer.
+"""
+from __future__ import annotations
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import os
+import sys
+import threading
+import time
+
+
+DEFAULT_INTERVAL_MS = 5.0
+MAX_STACK_DEPTH = 128
+
+# Leaf frames of threads parked waiting for work; left out unless include_idle.
+# Under uvloop the event loop itself is C, so an idle loop thread's leaf is
+# asyncio.runners' run.
+_IDLE_LEAVES = {
+    ("runners.py", "run"),
+    ("profiling.py", "_watch"),
+    ("profiling.py", "run"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES
+
+
+def sample_stacks(include_idle: bool = False, skip: Tuple[int, ...] = ()) -> List[str]:
+    """One collapsed stack per live thread (except thread ids in `skip`)."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        if ident in skip or (not include_idle and _is_idle(frame)):
+            continue
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.append(names.get(ident, f"thread-{ident}"))
+        stacks.append(";".join(reversed(labels)))
+    return stacks
+
+
+def format_collapsed(stacks: Dict[str, int]) -> str:
+    """Collapsed-stack text, heaviest stacks first."""
+    return "".join(f"{stack} {n}\n" for stack, n in sorted(stacks.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+# ---------- ON-DEMAND PROFILER ----------
+
+@dataclass
+class Profile:
+    stacks: Dict[str, int]          # collapsed stack -> samples
+    samples: int                    # sampling rounds taken
+    duration_s: float
+    interval_ms: float
+
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval; one profile at a time."""
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float, interval_ms: float = DEFAULT_INTERVAL_MS, include_idle: bool = False) -> Profile:
+        """
+        Profile for `seconds` (blocking the calling thread, which is left out
+        of the samples). Raises RuntimeError if a profile is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            me = threading.get_ident()
+            stacks: Counter = Counter()
+            interval = interval_ms / 1000.0
+            started = time.perf_counter()
+            deadline = started + seconds
+            rounds = 0
+            next_at = started
+            while True:
+                stacks.update(sample_stacks(include_idle, skip=(me,)))
+                rounds += 1
+                next_at += interval
+                now = time.perf_counter()
+                if next_at >= deadline:
+                    break
+                if next_at > now:
+                    time.sleep(next_at - now)
+                else:
+                    next_at = now   # fell behind: don't try to catch up in a burst
+            return Profile(
+                stacks=dict(stacks),
+                samples=rounds,
+                duration_s=time.perf_counter() - started,
+                interval_ms=interval_ms,
+            )
+        finally:
+            self._lock.release()
+
+
+# ---------- SLOW REQUEST CAPTURE ----------
+
+@dataclass
+class SlowRequest:
+    request_id: int
+    method: str
+    path: str
+    query: str
+    status: int
+    started_at: float               # unix time
+    duration_ms: float              # until the response started
+    stages: List[Tuple[str, float]] # Server-Timing stages in ms, in order
+    samples: int                    # stack sampling rounds while the request was slow
+    stacks: Dict[str, int]          # collapsed stack -> samples
+
+
+@dataclass
+class _InFlight:
+    request_id: int
+    method: str
+    path: str
+    query: str
+    started_at: float
+    started: float                  # perf_counter
+    samples: int = 0
+    stacks: Counter = field(default_factory=Counter)
+
+
+class SlowRequestRecorder:
+    """
+    Keeps the last `capacity` requests slower than `threshold_ms`, with their
+    stage timings and stack samples taken while they were over the threshold.
+    A threshold of None disables capture (the middleware hooks then cost one
+    attribute check per request).
+
+    Samples cover every busy thread, not only the request's own work: in an
+    event-loop server a slow request is as often stuck behind another
+    request's CPU work as slow itself, and that is what the stacks show.
+    """
+    def __init__(
+        self,
+        threshold_ms: Optional[float] = None,
+        capacity: int = 256,
+        sample_interval_ms: float = 10.0,
+        max_samples: int = 500,
+        ignore_prefixes: Tuple[str, ...] = (),
+    ):
+        self.threshold_ms = threshold_ms
+        self.sample_interval_ms = sample_interval_ms
+        self.max_samples = max_samples
+        self.ignore_prefixes = ignore_prefixes     # paths never captured (e.g. the profiler itself)
+        self._log: Deque[SlowRequest] = deque(maxlen=capacity)
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._ids = count(1)
+        self._lock = threading.Lock()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @property
+    def capacity(self) -> int:
+        return self._log.maxlen or 0
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+    # ----- MIDDLEWARE HOOKS -----
+
+    def request_started(self, scope: Dict[str, Any]) -> Optional[int]:
+        if self.threshold_ms is None or scope.get("path", "").startswith(self.ignore_prefixes):
+            return None
+        self._ensure_watchdog()
+        request = _InFlight(
+            request_id=next(self._ids),
+            method=scope.get("method", ""),
+            path=scope.get("path", ""),
+            query=scope.get("query_string", b"").decode("latin-1"),
+            started_at=time.time(),
+            started=time.perf_counter(),
+        )
+        with self._lock:
+            self._in_flight[request.request_id] = request
+        return request.request_id
+
+    def request_finished(self, token: Optional[int], status: int, stages: List[Tuple[str, float]],
+                         duration_ms: float) -> None:
+        if token is None:
+            return
+        with self._lock:
+            request = self._in_flight.pop(token, None)
+            threshold = self.threshold_ms
+            if request is None or threshold is None or duration_ms < threshold:
+                return
+            stacks = dict(request.stacks)
+        self._log.append(SlowRequest(
+            request_id=request.request_id,
+            method=request.method,
+            path=request.path,
+            query=request.query,
+            status=status,
+            started_at=request.started_at,
+            duration_ms=duration_ms,
+            stages=list(stages),
+            samples=request.samples,
+            stacks=stacks,
+        ))
+
+    # ----- QUERIES -----
+
+    def recent(self, limit: int = 50, min_ms: float = 0.0, path: Optional[str] = None) -> List[SlowRequest]:
+        """Captured requests, newest first."""
+        out = []
+        for request in reversed(self._log):
+            if request.duration_ms >= min_ms and (path is None or request.path == path):
+                out.append(request)
+                if len(out) >= limit:
+                    break
+        return out
+
+    def get(self, request_id: int) -> Optional[SlowRequest]:
+        return next((r for r in self._log if r.request_id == request_id), None)
+
+    def clear(self) -> None:
+        self._log.clear()
+
+    # ----- SAMPLING -----
+
+    def _ensure_watchdog(self) -> None:
+        if self._watchdog is None:
+            with self._lock:
+                if self._watchdog is None:
+                    self._watchdog = threading.Thread(
+                        target=self._watch, name="hot-iron-slow-requests", daemon=True,
+                    )
+                    self._watchdog.start()
+
+    def _watch(self) -> None:
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.sample_interval_ms / 1000.0)
+            threshold = self.threshold_ms
+            if threshold is None:
+                continue
+            cutoff = time.perf_counter() - threshold / 1000.0
+            with self._lock:
+                slow = [
+                    r for r in self._in_flight.values()
+                    if r.started <= cutoff and r.samples < self.max_samples
+                ]
+            if not slow:
+                continue
+            # One sample of every busy thread, shared by all requests that are slow right now
+            stacks = sample_stacks(skip=(me,))
+            with self._lock:
+                for request in slow:
+                    request.samples += 1
+                    request.stacks.update(stacks)
@@ -0,0 +1,247 @@
+"""
+Filtered, sorted and paginated bid queries.
+
+Sellers are pre-partitioned by attribute (EAF / non-EAF, name) so that a
+query only prices the sellers it can return, and top-k pages use partial
+selection (heapq) rather than sorting every bid.
+"""
+from __future__ import annotations
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+import heapq
+import time
+
+from .models import Seller, SellerRows, Point, Bid, BidSet, TransportMode, TRANSPORT_MODES
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, distances_km, price_columns, price_columns_anytime
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+# Bid attributes a query may sort by; prefix with "-" for descending
+SORT_KEYS = {
+    "net_price_per_ton": lambda b: b.net_price_per_ton,
+    "net_total": lambda b: b.net_total,
+    "offer_price_per_ton": lambda b: b.offer_price_per_ton,
+    "distance_km": lambda b: b.distance_km,
+    "seller_name": lambda b: b.seller.name,
+}
+
+
+@dataclass
+class BidQuery:
+    is_eaf: Optional[bool] = None
+    transport_mode: Optional[TransportMode] = None
+    max_distance_km: Optional[float] = None
+    seller_names: Optional[Sequence[str]] = None
+    sort: Optional[str] = None
+    offset: int = 0
+    limit: Optional[int] = None
+
+    def __post_init__(self):
+        if self.sort is not None and self.sort.lstrip("-") not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key {self.sort!r}. Valid keys: {sorted(SORT_KEYS)}")
+        if self.offset < 0:
+            raise ValueError("offset must be non-negative")
+        if self.limit is not None and self.limit < 0:
+            raise ValueError("limit must be non-negative")
+
+    @property
+    def has_filters(self) -> bool:
+        return (
+            self.is_eaf is not None
+            or self.transport_mode is not None
+            or self.max_distance_km is not None
+            or self.seller_names is not None
+        )
+
+
+@dataclass
+class BidQueryResult:
+    winner: Optional[Bid]           # lowest net price among matching bids
+    bids: Sequence[Bid]             # requested page
+    total: int                      # number of matching bids
+    exact: bool = True              # False if a deadline cut evaluation short
+    max_gap_per_ton: float = 0.0
+
+
+class SellerPartitions:
+    """
+    Seller columns split by attribute, built once per seller book and
+    patched row by row on seller updates. The attribute splits are built on
+    first use, so prebuilt columns (e.g. from a snapshot) are ready to price
+    immediately.
+    """
+    def __init__(self, sellers: Union[Sequence[Seller], SellerColumns]):
+        self.all = sellers if isinstance(sellers, SellerColumns) else SellerColumns.from_sellers(sellers)
+        self._by_eaf: Dict[bool, SellerColumns] = {}
+        self._eaf_indices: Dict[bool, List[int]] = {}
+        self._by_name: Optional[Dict[str, List[int]]] = None
+
+    def by_eaf(self, is_eaf: bool) -> SellerColumns:
+        if is_eaf not in self._by_eaf:
+            indices = [i for i, flag in enumerate(self.all.is_eaf) if bool(flag) == is_eaf]
+            self._eaf_indices[is_eaf] = indices
+            self._by_eaf[is_eaf] = self.all.subset(indices)
+        return self._by_eaf[is_eaf]
+
+    def indices_of(self, name: str) -> List[int]:
+        if self._by_name is None:
+            sellers = self.all.sellers
+            names = sellers.names if isinstance(sellers, SellerRows) else [s.name for s in sellers]
+            by_name: Dict[str, List[int]] = {}
+            for i, n in enumerate(names):
+                by_name.setdefault(n, []).append(i)
+            self._by_name = by_name
+        return self._by_name.get(name, [])
+
+    def discard_terms(self, policy: CompiledPolicy) -> None:
+        """Drop a policy's cached terms from the columns and the splits built so far."""
+        self.all.discard_terms(policy)
+        for part in self._by_eaf.values():
+            part.discard_terms(policy)
+
+    def update(self, index: int, seller: Seller) -> None:
+        """Replace seller `index` in place: its row in the columns and in whichever splits are built."""
+        sellers = self.all.sellers
+        old_name = sellers.names[index] if isinstance(sellers, SellerRows) else sellers[index].name
+        old_eaf = bool(self.all.is_eaf[index])
+        self.all.set_row(index, seller)
+
+        if bool(seller.is_eaf) == old_eaf:
+            part = self._by_eaf.get(old_eaf)
+            if part is not None:
+                part.set_row(bisect_left(self._eaf_indices[old_eaf], index), seller)
+        else:
+            # The seller moves between splits; rare enough to rebuild them on next use
+            self._by_eaf.clear()
+            self._eaf_indices.clear()
+
+        if self._by_name is not None and seller.name != old_name:
+            old = self._by_name[old_name]
+            old.remove(index)
+            if not old:
+                del self._by_name[old_name]
+            insort(self._by_name.setdefault(seller.name, []), index)
+
+    def candidates(
+        self,
+        is_eaf: Optional[bool] = None,
+        seller_names: Optional[Sequence[str]] = None,
+    ) -> SellerColumns:
+        """Columns for the sellers that pass the attribute filters."""
+        if seller_names is None:
+            return self.all if is_eaf is None else self.by_eaf(is_eaf)
+        indices = sorted({i for name in seller_names for i in self.indices_of(name)})
+        if is_eaf is not None:
+            indices = [i for i in indices if bool(self.all.is_eaf[i]) == is_eaf]
+        return self.all.subset(indices)
+
+
+def page_bids(bids: Union[BidSet, Sequence[Bid]], query: BidQuery) -> Sequence[Bid]:
+    """
+    Apply a query's sort / offset / limit. A limit without a sort key
+    returns the cheapest bids first. BidSets are paged on their arrays,
+    so only the returned bids are materialized.
+    """
+    sort = query.sort
+    if sort is None and query.limit is not None:
+        sort = "net_price_per_ton"
+    if sort is None:
+        return bids[query.offset:]
+
+    key_name = sort.lstrip("-")
+    descending = sort.startswith("-")
+    end = None if query.limit is None else query.offset + query.limit
+    if isinstance(bids, BidSet):
+        if query.limit is None:
+            order = bids.argsort(key_name, descending)
+        else:
+            order = bids.top_k_indices(query.offset + query.limit, key_name, descending)
+        return bids.take(order[query.offset:end])
+
+    key = SORT_KEYS[key_name]
+    if query.limit is None:
+        ordered = sorted(bids, key=key, reverse=descending)
+    else:
+        k = query.offset + query.limit
+        select = heapq.nlargest if descending else heapq.nsmallest
+        ordered = select(k, bids, key=key)
+    return ordered[query.offset:end]
+
+
+def run_bid_query(
+    partitions: SellerPartitions,
+    buyer_location: Point,
+    quantity_tons: float,
+    query: BidQuery,
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    deadline_ms: Optional[float] = None,
+) -> BidQueryResult:
+    """
+    Price only the sellers a query can return, then page the results.
+
+    Attribute filters pick a pre-built partition; distance and transport-mode
+    filters are applied on great-circle distance before pricing (after
+    pricing when logistics are routed, since the route decides the mode).
+
+    Args:
+        partitions: SellerPartitions for the current seller book
+        buyer_location: Point representing buyer's location
+        quantity_tons: Quantity of steel to purchase in tons
+        query: Filters, sort and pagination
+        network: Optional TransportNetwork for routed logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+        deadline_ms: Optional latency budget (see pricing.price_columns_anytime),
+            counted from the call, so candidate selection and filtering use it too
+
+    Returns:
+        BidQueryResult with the winner among matching bids and the requested page
+    """
+    start = time.perf_counter()
+    cols = partitions.candidates(query.is_eaf, query.seller_names)
+
+    if network is None and (query.max_distance_km is not None or query.transport_mode is not None):
+        keep = []
+        for i, d in enumerate(distances_km(cols, buyer_location)):
+            if query.max_distance_km is not None and d > query.max_distance_km:
+                continue
+            if query.transport_mode is not None and policy.transport_mode(d) != query.transport_mode:
+                continue
+            keep.append(i)
+        if len(keep) < len(cols):
+            cols = cols.subset(keep)
+
+    post_filter = network is not None and (
+        query.max_distance_km is not None or query.transport_mode is not None
+    )
+    # A deadline stops at the best bid over the candidates, so it cannot be
+    # combined with filters that are only known after pricing
+    if deadline_ms is None or post_filter:
+        bids = price_columns(cols, buyer_location, quantity_tons, network, cols.terms_for(policy))
+    else:
+        terms = cols.terms_for(policy)
+        remaining_ms = deadline_ms - (time.perf_counter() - start) * 1000.0
+        bids = price_columns_anytime(
+            cols, buyer_location, quantity_tons, max(remaining_ms, 0.0), network, terms,
+        )
+
+    if post_filter:
+        max_km = query.max_distance_km if query.max_distance_km is not None else float("inf")
+        code = TRANSPORT_MODES.index(query.transport_mode) if query.transport_mode else None
+        bids = bids.where([
+            d <= max_km and (code is None or m == code)
+            for d, m in zip(bids.distance_km, bids.mode_codes)
+        ])
+
+    winner = bids.winner if len(bids) else None
+    return BidQueryResult(
+        winner=winner,
+        bids=page_bids(bids, query),
+        total=len(bids),
+        exact=bids.exact,
+        max_gap_per_ton=bids.max_gap_per_ton,
+    )
@@ -0,0 +1,369 @@
+"""
+Backtesting: replay stored auction requests against a candidate seller book
+or pricing policy.
+
+For a fixed buyer location every seller's net price per ton factors as
+
+    net = offer_per_ton * (1 - eaf_factor) * (1 - volume_pct)
+
+and the volume discount is shared by all sellers, so the winner depends only
+on the location. History is therefore grouped by distinct buyer location:
+each location is priced once per seller book (at 1 t, with the batch kernel)
+and every request at that location is a lookup plus a scale by quantity.
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass, field
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+import json
+import os
+import queue
+import threading
+import time
+
+from .models import Seller, Point, Geocoder
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+# ---------- HISTORY ----------
+
+@dataclass
+class AuctionHistory:
+    """
+    Stored auction requests as columns (location, quantity and the tenant
+    whose policy priced them), keeping the newest `max_records`
+    (unbounded if None; trimmed in chunks, so up to a quarter more are held
+    between trims). With `path` set, recorded requests are also appended
+    to that JSONL file by a background writer thread, in batches, so
+    recording never does file I/O on the caller's thread.
+    """
+    timestamp: "array[float]" = field(default_factory=lambda: array("d"))     # epoch seconds
+    lat: "array[float]" = field(default_factory=lambda: array("d"))
+    lon: "array[float]" = field(default_factory=lambda: array("d"))
+    quantity_tons: "array[float]" = field(default_factory=lambda: array("d"))
+    tenant: List[Optional[str]] = field(default_factory=list)                  # None: default policy
+    path: Optional[str] = None
+    max_records: Optional[int] = None
+    write_errors: int = 0           # batches the writer failed to append to `path`
+    _pending: "queue.Queue[str]" = field(default_factory=queue.Queue, repr=False, compare=False)
+    _writer: Optional[threading.Thread] = field(default=None, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.quantity_tons)
+
+    @classmethod
+    def open(
+        cls, path: str, geocoder: Optional[Geocoder] = None, max_records: Optional[int] = None,
+    ) -> "AuctionHistory":
+        """
+        Load a JSONL history file (if it exists) and append new records to it.
+        Lines are {"ts", "lat", "lon", "quantity_tons"} plus "tenant" when
+        one was given (lines without it are default-tenant requests); lines with an
+        "address" instead of lat/lon need a geocoder and are skipped if it
+        cannot resolve them.
+        """
+        history = cls(max_records=max_records)
+        if os.path.exists(path):
+            with open(path) as f:
+                history.extend_records((json.loads(line) for line in f if line.strip()), geocoder)
+        history.path = path
+        return history
+
+    def extend_records(self, records: Iterable[Dict], geocoder: Optional[Geocoder] = None) -> None:
+        for r in records:
+            if r.get("lat") is None or r.get("lon") is None:
+                if geocoder is None or not r.get("address"):
+                    continue
+                try:
+                    location = geocoder.geocode(r["address"])
+                except KeyError:
+                    continue
+                lat, lon = location.lat, location.lon
+            else:
+                lat, lon = float(r["lat"]), float(r["lon"])
+            self._append(float(r.get("ts", 0.0)), lat, lon, float(r["quantity_tons"]), r.get("tenant"))
+        self._trim(self.max_records)
+
+    def record(
+        self, buyer_location: Point, quantity_tons: float, tenant: Optional[str] = None,
+        ts: Optional[float] = None,
+    ) -> None:
+        """
+        Store one unfiltered auction request. Requests restricted by bid
+        filters (EAF only, named sellers, transport mode, distance) are not
+        recorded: replay prices every seller.
+        """
+        ts = time.time() if ts is None else ts
+        self._append(ts, buyer_location.lat, buyer_location.lon, quantity_tons, tenant)
+        if self.path is not None:
+            line = {"ts": ts, "lat": buyer_location.lat, "lon": buyer_location.lon, "quantity_tons": quantity_tons}
+            if tenant is not None:
+                line["tenant"] = tenant
+            self._ensure_writer()
+            self._pending.put(json.dumps(line) + "\n")
+
+    def flush(self) -> None:
+        """Block until every recorded request has been handed to the file."""
+        if self._writer is not None:
+            self._pending.join()
+
+    def _append(self, ts: float, lat: float, lon: float, quantity_tons: float, tenant: Optional[str]) -> None:
+        self.timestamp.append(ts)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.quantity_tons.append(quantity_tons)
+        self.tenant.append(tenant)
+        # Trim in chunks of a quarter of the cap, so appends stay O(1) amortized
+        if self.max_records is not None and len(self) > self.max_records + max(1, self.max_records // 4):
+            self._trim(self.max_records)
+
+    def _trim(self, keep: Optional[int]) -> None:
+        drop = len(self) - keep if keep is not None else 0
+        if drop > 0:
+            for column in (self.timestamp, self.lat, self.lon, self.quantity_tons, self.tenant):
+                del column[:drop]
+
+    # ----- FILE WRITER -----
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_forever, name="hot-iron-auction-history", daemon=True,
+            )
+            self._writer.start()
+
+    def _write_forever(self, max_batch: int = 4096) -> None:
+        # Whatever accumulated while the previous batch was written goes out in one write
+        while True:
+            lines = [self._pending.get()]
+            while len(lines) < max_batch:
+                try:
+                    lines.append(self._pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open(self.path, "a") as f:    # type: ignore[arg-type]
+                    f.write("".join(lines))
+            except OSError:
+                self.write_errors += 1
+            finally:
+                for _ in lines:
+                    self._pending.task_done()
+
+    def window(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        tenants: Optional[AbstractSet[Optional[str]]] = None,
+    ) -> "AuctionHistory":
+        """
+        In-memory copy of the requests with since <= timestamp < until
+        (unbounded when None), only for `tenants` if given (None in the set
+        is the default tenant).
+        """
+        if since is None and until is None and tenants is None:
+            return AuctionHistory(
+                timestamp=self.timestamp[:], lat=self.lat[:], lon=self.lon[:],
+                quantity_tons=self.quantity_tons[:], tenant=self.tenant[:],
+            )
+        lo = -float("inf") if since is None else since
+        hi = float("inf") if until is None else until
+        keep = [
+            i for i, (ts, tenant) in enumerate(zip(self.timestamp, self.tenant))
+            if lo <= ts < hi and (tenants is None or tenant in tenants)
+        ]
+        return AuctionHistory(
+            timestamp=array("d", (self.timestamp[i] for i in keep)),
+            lat=array("d", (self.lat[i] for i in keep)),
+            lon=array("d", (self.lon[i] for i in keep)),
+            quantity_tons=array("d", (self.quantity_tons[i] for i in keep)),
+            tenant=[self.tenant[i] for i in keep],
+        )
+
+
+# ---------- REPLAY ----------
+
+@dataclass
+class SellerShareChange:
+    seller_name: str
+    baseline_wins: int
+    candidate_wins: int
+    baseline_tons: float
+    candidate_tons: float
+    baseline_share: float           # share of replayed tonnage won
+    candidate_share: float
+
+
+@dataclass
+class WinnerFlip:
+    index: int                      # position in the replayed history
+    timestamp: float
+    lat: float
+    lon: float
+    quantity_tons: float
+    baseline_winner: str
+    candidate_winner: str
+    baseline_net_price_per_ton: float
+    candidate_net_price_per_ton: float
+
+
+@dataclass
+class ReplayReport:
+    auctions: int
+    locations: int                  # distinct buyer locations priced
+    winner_flips: int
+    baseline_spend: float           # sum of winning net totals
+    candidate_spend: float
+    mean_price_delta_per_ton: float  # tonnage-weighted, candidate - baseline
+    max_price_increase_per_ton: float
+    max_price_decrease_per_ton: float
+    sellers: List[SellerShareChange]
+    flips: List[WinnerFlip]         # first `max_flips` flips, in history order
+    elapsed_ms: float
+
+
+def _winners_by_location(
+    cols: SellerColumns,
+    locations: Sequence[Tuple[float, float]],
+    network: Optional["TransportNetwork"],
+    policy: CompiledPolicy,
+) -> Tuple[List[int], "array[float]"]:
+    """Winning seller and its net price per ton before volume discount, per location."""
+    terms = cols.terms_for(policy)
+    eaf = terms.eaf_factor
+    winners: List[int] = []
+    prices = array("d")
+    for lat, lon in locations:
+        offer = price_columns(cols, Point(lat, lon), 1.0, network, terms).offer_price_per_ton
+        effective = [o * (1.0 - e) for o, e in zip(offer, eaf)]
+        w = min(range(len(effective)), key=effective.__getitem__)
+        winners.append(w)
+        prices.append(effective[w])
+    return winners, prices
+
+
+def replay_auctions(
+    history: AuctionHistory,
+    baseline_sellers: Sequence[Seller],
+    candidate_sellers: Optional[Sequence[Seller]] = None,
+    network: Optional["TransportNetwork"] = None,
+    baseline_policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    candidate_policy: Optional[CompiledPolicy] = None,
+    max_flips: int = 100,
+) -> ReplayReport:
+    """
+    Re-run every stored auction under the baseline and the candidate seller
+    book / policy and compare the outcomes.
+
+    Args:
+        history: Stored auction requests
+        baseline_sellers: Seller book the history is compared against
+        candidate_sellers: Candidate seller book (defaults to the baseline)
+        network: Optional TransportNetwork for routed logistics
+        baseline_policy: Compiled pricing policy of the baseline
+        candidate_policy: Candidate policy (defaults to the baseline policy)
+        max_flips: Maximum number of winner flips to list in the report
+
+    Returns:
+        ReplayReport with winner flips, spend and price deltas and per-seller share changes
+    """
+    started = time.perf_counter()
+    if not baseline_sellers:
+        raise ValueError("Cannot run an auction with no sellers")
+    candidate_sellers = baseline_sellers if candidate_sellers is None else candidate_sellers
+    if not candidate_sellers:
+        raise ValueError("Cannot run an auction with no sellers")
+    candidate_policy = baseline_policy if candidate_policy is None else candidate_policy
+
+    # Distinct buyer locations, and each request's location index
+    location_index: Dict[Tuple[float, float], int] = {}
+    loc_of = array("l")
+    for lat, lon in zip(history.lat, history.lon):
+        loc_of.append(location_index.setdefault((lat, lon), len(location_index)))
+    locations = list(location_index)
+
+    base_cols = SellerColumns.from_sellers(baseline_sellers)
+    base_w, base_p = _winners_by_location(base_cols, locations, network, baseline_policy)
+    if candidate_sellers is baseline_sellers and candidate_policy is baseline_policy:
+        cand_cols, cand_w, cand_p = base_cols, base_w, base_p
+    else:
+        cand_cols = SellerColumns.from_sellers(candidate_sellers)
+        cand_w, cand_p = _winners_by_location(cand_cols, locations, network, candidate_policy)
+
+    base_names = [s.name for s in base_cols.sellers]
+    cand_names = [s.name for s in cand_cols.sellers]
+    wins: Dict[str, List[float]] = {}   # name -> [baseline wins, candidate wins, baseline tons, candidate tons]
+    for name in base_names + cand_names:
+        wins.setdefault(name, [0, 0, 0.0, 0.0])
+
+    base_volume = baseline_policy.volume_discount_pct
+    cand_volume = candidate_policy.volume_discount_pct
+    flips: List[WinnerFlip] = []
+    n_flips = 0
+    base_spend = cand_spend = delta_weighted = total_tons = 0.0
+    max_up = max_down = 0.0
+    for i, (loc, q) in enumerate(zip(loc_of, history.quantity_tons)):
+        base_name, cand_name = base_names[base_w[loc]], cand_names[cand_w[loc]]
+        base_net = base_p[loc] * (1.0 - base_volume(q))
+        cand_net = cand_p[loc] * (1.0 - cand_volume(q))
+
+        base_spend += base_net * q
+        cand_spend += cand_net * q
+        total_tons += q
+        delta = cand_net - base_net
+        delta_weighted += delta * q
+        max_up, max_down = max(max_up, delta), min(max_down, delta)
+
+        w = wins[base_name]
+        w[0] += 1
+        w[2] += q
+        w = wins[cand_name]
+        w[1] += 1
+        w[3] += q
+
+        if base_name != cand_name:
+            n_flips += 1
+            if len(flips) < max_flips:
+                flips.append(WinnerFlip(
+                    index=i,
+                    timestamp=history.timestamp[i],
+                    lat=history.lat[i],
+                    lon=history.lon[i],
+                    quantity_tons=q,
+                    baseline_winner=base_name,
+                    candidate_winner=cand_name,
+                    baseline_net_price_per_ton=base_net,
+                    candidate_net_price_per_ton=cand_net,
+                ))
+
+    sellers = [
+        SellerShareChange(
+            seller_name=name,
+            baseline_wins=int(bw),
+            candidate_wins=int(cw),
+            baseline_tons=bt,
+            candidate_tons=ct,
+            baseline_share=bt / total_tons if total_tons else 0.0,
+            candidate_share=ct / total_tons if total_tons else 0.0,
+        )
+        for name, (bw, cw, bt, ct) in wins.items()
+    ]
+    sellers.sort(key=lambda s: abs(s.candidate_share - s.baseline_share), reverse=True)
+
+    return ReplayReport(
+        auctions=len(history),
+        locations=len(locations),
+        winner_flips=n_flips,
+        baseline_spend=base_spend,
+        candidate_spend=cand_spend,
+        mean_price_delta_per_ton=delta_weighted / total_tons if total_tons else 0.0,
+        max_price_increase_per_ton=max_up,
+        max_price_decrease_per_ton=max_down,
+        sellers=sellers,
+        flips=flips,
+        elapsed_ms=(time.perf_counter() - started) * 1000.0,
+    )
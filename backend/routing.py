@@ -0,0 +1,397 @@
+"""
+Multimodal transport network and least-cost routing.
+
+The network holds mills, ports, rail hubs and warehouses, joined by truck,
+rail and ocean edges with a per-ton cost. A shortest-path tree is computed
+once per seller origin and cached, so pricing a buyer request is a lookup
+into that tree plus a last-mile truck leg, not a fresh graph search.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+import heapq
+
+from .models import Point, TransportMode
+
+
+NodeKind = Literal["mill", "port", "rail_hub", "warehouse"]
+
+# USD per ton per 1000 km. Calibrated to the distance-based model in
+# Seller.logistics_cost_per_ton for a ~$800/t base_cost (1% / 0.5% / 0.2%).
+DEFAULT_RATE_PER_1000KM: Dict[str, float] = {
+    "truck": 8.0,
+    "rail": 4.0,
+    "ocean": 1.6,
+}
+
+# Land routes are longer than the great circle between their endpoints
+DEFAULT_DETOUR_FACTOR: Dict[str, float] = {
+    "truck": 1.20,
+    "rail": 1.25,
+    "ocean": 1.00,
+}
+
+
+@dataclass(frozen=True)
+class NetworkNode:
+    name: str
+    location: Point
+    kind: NodeKind
+
+
+@dataclass(frozen=True)
+class NetworkEdge:
+    src: int                        # node index
+    dst: int                        # node index
+    mode: TransportMode
+    distance_km: float
+    cost_per_ton: float             # [$/t], including any fixed handling cost
+
+
+@dataclass(frozen=True)
+class RouteLeg:
+    origin: str
+    destination: str
+    mode: TransportMode
+    distance_km: float
+    cost_per_ton: float
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Least-cost route from a seller origin to a buyer location.
+    """
+    cost_per_ton: float
+    distance_km: float
+    legs: Tuple[RouteLeg, ...]
+
+    @property
+    def mode(self) -> TransportMode:
+        """
+        Line-haul mode: the mode that carries the steel the furthest.
+        """
+        by_mode: Dict[str, float] = {}
+        for leg in self.legs:
+            by_mode[leg.mode] = by_mode.get(leg.mode, 0.0) + leg.distance_km
+        return max(by_mode, key=by_mode.get)  # type: ignore[return-value]
+
+
+@dataclass
+class ShortestPathTree:
+    """
+    Single-source least-cost tree over the network from one origin point.
+
+    cost/distance are indexed by node; pred holds the edge used to reach
+    each node (-1 for first-mile legs from the origin, None if unreachable).
+    """
+    origin: Point
+    cost: List[float]
+    distance: List[float]
+    pred: List[Optional[int]]
+
+
+@dataclass
+class TransportNetwork:
+    """
+    Graph of logistics nodes with per-ton edge costs.
+
+    first_mile_km / last_mile_km bound the truck legs used to connect an
+    arbitrary seller or buyer location onto the network.
+    """
+    first_mile_km: float = 500.0
+    last_mile_km: float = 500.0
+    rate_per_1000km: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_RATE_PER_1000KM))
+    nodes: List[NetworkNode] = field(default_factory=list)
+    edges: List[NetworkEdge] = field(default_factory=list)
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+    _adjacency: List[List[int]] = field(default_factory=list, repr=False)
+    _trees: Dict[Point, ShortestPathTree] = field(default_factory=dict, repr=False)
+
+    # ----- CONSTRUCTION -----
+
+    def add_node(self, name: str, location: Point, kind: NodeKind) -> int:
+        if name in self._index:
+            raise ValueError(f"Duplicate network node: {name!r}")
+        self._index[name] = len(self.nodes)
+        self.nodes.append(NetworkNode(name=name, location=location, kind=kind))
+        self._adjacency.append([])
+        self._trees.clear()
+        return self._index[name]
+
+    def add_edge(
+        self,
+        a: str,
+        b: str,
+        mode: TransportMode,
+        distance_km: Optional[float] = None,
+        cost_per_ton: Optional[float] = None,
+        handling_cost_per_ton: float = 0.0,
+        bidirectional: bool = True,
+    ) -> None:
+        """
+        Connect two nodes. Distance defaults to the great-circle distance times
+        the mode's detour factor; cost defaults to the mode's per-1000 km rate.
+        """
+        src, dst = self._index[a], self._index[b]
+        if distance_km is None:
+            distance_km = (
+                self.nodes[src].location.distance_km_to(self.nodes[dst].location)
+                * DEFAULT_DETOUR_FACTOR[mode]
+            )
+        if cost_per_ton is None:
+            cost_per_ton = self.leg_cost(mode, distance_km)
+        cost_per_ton += handling_cost_per_ton
+
+        pairs = [(src, dst), (dst, src)] if bidirectional else [(src, dst)]
+        for u, v in pairs:
+            self._adjacency[u].append(len(self.edges))
+            self.edges.append(NetworkEdge(u, v, mode, distance_km, cost_per_ton))
+        self._trees.clear()
+
+    def leg_cost(self, mode: TransportMode, distance_km: float) -> float:
+        return self.rate_per_1000km[mode] * (distance_km / 1000.0)
+
+    # ----- SHORTEST-PATH TREES -----
+
+    def _connectors(self, location: Point, radius_km: float) -> List[Tuple[int, float]]:
+        """
+        Nodes reachable from `location` by a direct truck leg: everything within
+        radius_km, or the single nearest node if nothing is that close.
+        """
+        dists = [(i, n.location.distance_km_to(location)) for i, n in enumerate(self.nodes)]
+        near = [(i, d * DEFAULT_DETOUR_FACTOR["truck"]) for i, d in dists if d <= radius_km]
+        if not near and dists:
+            i, d = min(dists, key=lambda x: x[1])
+            near = [(i, d * DEFAULT_DETOUR_FACTOR["truck"])]
+        return near
+
+    def shortest_path_tree(self, origin: Point) -> ShortestPathTree:
+        """
+        Dijkstra from `origin` (joined to the network by first-mile truck legs).
+        Trees are cached per origin until the network is modified.
+        """
+        tree = self._trees.get(origin)
+        if tree is not None:
+            return tree
+
+        n = len(self.nodes)
+        inf = float("inf")
+        cost = [inf] * n
+        distance = [inf] * n
+        pred: List[Optional[int]] = [None] * n
+        heap: List[Tuple[float, int]] = []
+
+        for i, d in self._connectors(origin, self.first_mile_km):
+            c = self.leg_cost("truck", d)
+            if c < cost[i]:
+                cost[i], distance[i], pred[i] = c, d, -1
+                heapq.heappush(heap, (c, i))
+
+        while heap:
+            c, u = heapq.heappop(heap)
+            if c > cost[u]:
+                continue
+            for e in self._adjacency[u]:
+                edge = self.edges[e]
+                nc = c + edge.cost_per_ton
+                if nc < cost[edge.dst]:
+                    cost[edge.dst] = nc
+                    distance[edge.dst] = distance[u] + edge.distance_km
+                    pred[edge.dst] = e
+                    heapq.heappush(heap, (nc, edge.dst))
+
+        tree = ShortestPathTree(origin=origin, cost=cost, distance=distance, pred=pred)
+        self._trees[origin] = tree
+        return tree
+
+    # ----- QUOTES -----
+
+    def _legs_to(self, tree: ShortestPathTree, node: int) -> List[RouteLeg]:
+        legs: List[RouteLeg] = []
+        while True:
+            e = tree.pred[node]
+            if e == -1:
+                legs.append(RouteLeg(
+                    "origin", self.nodes[node].name, "truck",
+                    tree.distance[node], tree.cost[node],
+                ))
+                break
+            edge = self.edges[e]
+            legs.append(RouteLeg(
+                self.nodes[edge.src].name, self.nodes[edge.dst].name, edge.mode,
+                edge.distance_km, edge.cost_per_ton,
+            ))
+            node = edge.src
+        legs.reverse()
+        return legs
+
+    def routes_to(self, origins: Sequence[Point], destination: Point) -> List[Optional[Route]]:
+        """
+        Least-cost route from each origin to one destination.
+
+        The last-mile drop candidates are found once for the destination and
+        shared by every origin; each origin then costs one tree lookup per
+        candidate. Returns None for origins that cannot reach the destination.
+        """
+        drops = self._connectors(destination, self.last_mile_km)
+        drops = [(i, d, self.leg_cost("truck", d)) for i, d in drops]
+
+        routes: List[Optional[Route]] = []
+        for origin in origins:
+            tree = self.shortest_path_tree(origin)
+            best: Optional[Tuple[float, int, float, float]] = None
+            for i, d, last_mile in drops:
+                c = tree.cost[i] + last_mile
+                if best is None or c < best[0]:
+                    best = (c, i, d, last_mile)
+
+            direct_km = origin.distance_km_to(destination) * DEFAULT_DETOUR_FACTOR["truck"]
+            direct_cost = self.leg_cost("truck", direct_km)
+            if direct_km <= self.first_mile_km and (best is None or direct_cost <= best[0]):
+                leg = RouteLeg("origin", "destination", "truck", direct_km, direct_cost)
+                routes.append(Route(direct_cost, direct_km, (leg,)))
+            elif best is None or best[0] == float("inf"):
+                routes.append(None)
+            else:
+                c, i, d, last_mile = best
+                legs = self._legs_to(tree, i)
+                legs.append(RouteLeg(self.nodes[i].name, "destination", "truck", d, last_mile))
+                routes.append(Route(c, tree.distance[i] + d, tuple(legs)))
+        return routes
+
+    def route(self, origin: Point, destination: Point) -> Optional[Route]:
+        return self.routes_to([origin], destination)[0]
+
+
+# ---------- DEFAULT NETWORK ----------
+
+def make_default_network() -> TransportNetwork:
+    """
+    Hand-built network covering the default sellers' mills and the main
+    ports and rail corridors between them and US/European buyers.
+
+    Ocean lane distances are approximate sailing distances (via Suez or
+    Panama where relevant), not great circles.
+    """
+    net = TransportNetwork()
+
+    nodes = [
+        # ----- MILLS (default sellers) -----
+        ("mill:nucor", Point(35.2271, -80.8431), "mill"),
+        ("mill:us steel", Point(40.4406, -79.9959), "mill"),
+        ("mill:arcelormittal", Point(49.6117, 6.1319), "mill"),
+        ("mill:nippon steel", Point(35.6762, 139.6503), "mill"),
+        ("mill:posco", Point(36.0190, 129.3435), "mill"),
+        ("mill:baosteel", Point(31.2304, 121.4737), "mill"),
+        ("mill:tata steel", Point(22.8046, 86.2029), "mill"),
+        ("mill:thyssenkrupp", Point(51.4352, 6.7627), "mill"),
+        ("mill:cleveland-cliffs", Point(41.4993, -81.6944), "mill"),
+        ("mill:jsw steel", Point(15.3490, 74.1230), "mill"),
+        ("mill:china steel corp", Point(22.6400, 120.3000), "mill"),
+
+        # ----- PORTS -----
+        ("port:shanghai", Point(30.6300, 122.0700), "port"),
+        ("port:busan", Point(35.1028, 129.0403), "port"),
+        ("port:yokohama", Point(35.4437, 139.6380), "port"),
+        ("port:kaohsiung", Point(22.6163, 120.2747), "port"),
+        ("port:haldia", Point(22.0257, 88.0583), "port"),
+        ("port:mormugao", Point(15.4097, 73.7997), "port"),
+        ("port:mumbai", Point(18.9500, 72.9500), "port"),
+        ("port:rotterdam", Point(51.9496, 4.1453), "port"),
+        ("port:antwerp", Point(51.2637, 4.3997), "port"),
+        ("port:los angeles", Point(33.7405, -118.2720), "port"),
+        ("port:seattle", Point(47.5800, -122.3500), "port"),
+        ("port:houston", Point(29.7305, -95.2667), "port"),
+        ("port:new york", Point(40.6681, -74.0451), "port"),
+        ("port:baltimore", Point(39.2667, -76.5800), "port"),
+        ("port:savannah", Point(32.0835, -81.0998), "port"),
+
+        # ----- RAIL HUBS -----
+        ("rail:chicago", Point(41.8500, -87.6500), "rail_hub"),
+        ("rail:cleveland", Point(41.4800, -81.7000), "rail_hub"),
+        ("rail:pittsburgh", Point(40.4400, -80.0000), "rail_hub"),
+        ("rail:charlotte", Point(35.2300, -80.8400), "rail_hub"),
+        ("rail:atlanta", Point(33.7490, -84.3880), "rail_hub"),
+        ("rail:kansas city", Point(39.0997, -94.5786), "rail_hub"),
+        ("rail:dallas", Point(32.7767, -96.7970), "rail_hub"),
+        ("rail:los angeles", Point(34.0200, -118.2300), "rail_hub"),
+        ("rail:seattle", Point(47.6000, -122.3300), "rail_hub"),
+        ("rail:duisburg", Point(51.4344, 6.7623), "rail_hub"),
+        ("rail:luxembourg", Point(49.6000, 6.1300), "rail_hub"),
+
+        # ----- WAREHOUSES -----
+        ("warehouse:central us", Point(41.8781, -87.6298), "warehouse"),
+    ]
+    for name, location, kind in nodes:
+        net.add_node(name, location, kind)
+
+    # ----- FIRST MILE: mills onto the network -----
+    for mill, hub, mode in [
+        ("mill:nucor", "rail:charlotte", "truck"),
+        ("mill:us steel", "rail:pittsburgh", "truck"),
+        ("mill:cleveland-cliffs", "rail:cleveland", "truck"),
+        ("mill:arcelormittal", "rail:luxembourg", "truck"),
+        ("mill:thyssenkrupp", "rail:duisburg", "truck"),
+        ("mill:nippon steel", "port:yokohama", "truck"),
+        ("mill:posco", "port:busan", "truck"),
+        ("mill:baosteel", "port:shanghai", "truck"),
+        ("mill:china steel corp", "port:kaohsiung", "truck"),
+        ("mill:tata steel", "port:haldia", "rail"),
+        ("mill:jsw steel", "port:mormugao", "rail"),
+    ]:
+        net.add_edge(mill, hub, mode)
+
+    # ----- RAIL CORRIDORS -----
+    for a, b in [
+        ("rail:chicago", "rail:cleveland"),
+        ("rail:cleveland", "rail:pittsburgh"),
+        ("rail:pittsburgh", "port:baltimore"),
+        ("rail:pittsburgh", "port:new york"),
+        ("rail:chicago", "rail:kansas city"),
+        ("rail:kansas city", "rail:dallas"),
+        ("rail:dallas", "port:houston"),
+        ("rail:kansas city", "rail:los angeles"),
+        ("rail:dallas", "rail:los angeles"),
+        ("rail:chicago", "rail:seattle"),
+        ("rail:chicago", "rail:atlanta"),
+        ("rail:atlanta", "rail:charlotte"),
+        ("rail:charlotte", "port:savannah"),
+        ("rail:atlanta", "port:savannah"),
+        ("rail:charlotte", "port:baltimore"),
+        ("rail:los angeles", "port:los angeles"),
+        ("rail:seattle", "port:seattle"),
+        ("rail:chicago", "warehouse:central us"),
+        ("rail:duisburg", "port:rotterdam"),
+        ("rail:luxembourg", "port:antwerp"),
+        ("rail:duisburg", "rail:luxembourg"),
+        ("port:antwerp", "port:rotterdam"),
+        ("port:mormugao", "port:mumbai"),
+    ]:
+        net.add_edge(a, b, "rail")
+
+    # ----- OCEAN LANES (approx. sailing km, $8/t port handling) -----
+    for a, b, km in [
+        ("port:shanghai", "port:los angeles", 10_500),
+        ("port:shanghai", "port:seattle", 9_200),
+        ("port:yokohama", "port:los angeles", 8_900),
+        ("port:yokohama", "port:seattle", 7_700),
+        ("port:busan", "port:los angeles", 9_700),
+        ("port:busan", "port:seattle", 8_400),
+        ("port:kaohsiung", "port:los angeles", 11_400),
+        ("port:shanghai", "port:busan", 900),
+        ("port:shanghai", "port:kaohsiung", 1_100),
+        ("port:busan", "port:yokohama", 1_200),
+        ("port:shanghai", "port:houston", 19_000),
+        ("port:shanghai", "port:rotterdam", 19_500),
+        ("port:haldia", "port:mumbai", 3_900),
+        ("port:mumbai", "port:rotterdam", 11_600),
+        ("port:mumbai", "port:new york", 15_600),
+        ("port:rotterdam", "port:new york", 6_300),
+        ("port:rotterdam", "port:baltimore", 6_900),
+        ("port:rotterdam", "port:savannah", 7_400),
+        ("port:rotterdam", "port:houston", 9_300),
+    ]:
+        net.add_edge(a, b, "ocean", distance_km=float(km), handling_cost_per_ton=8.0)
+
+    return net
@@ -0,0 +1,177 @@
+"""
+Versioned seller book for conditional GETs and delta sync.
+
+Every change to the seller list bumps the book version and is appended to
+a bounded change log. The serialized (and gzip-compressed) seller list is
+cached per version, so pollers that are up to date get a 304 and everyone
+else gets pre-built bytes, and /sellers/changes only sends rows that
+changed since the caller's version.
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+import gzip
+import json
+import uuid
+
+from .models import Seller, SellerRows
+
+
+def seller_to_dict(seller: Seller) -> Dict[str, Any]:
+    """JSON form of a seller, same fields as SellerResponse."""
+    return {
+        "name": seller.name,
+        "location": {"lat": seller.location.lat, "lon": seller.location.lon},
+        "msrp": seller.msrp,
+        "base_cost": seller.base_cost,
+        "risk_aversion": seller.risk_aversion,
+        "is_eaf": seller.is_eaf,
+    }
+
+
+@dataclass(frozen=True)
+class SerializedSellers:
+    version: int
+    etag: str
+    body: bytes                     # JSON
+    gzipped: bytes                  # gzip-compressed JSON
+
+
+@dataclass
+class SellerChanges:
+    book_id: str
+    version: int
+    changed: List[Seller]           # rows added or changed since the caller's version
+    removed: List[str]              # names removed since the caller's version
+    reset: bool = False             # True if `changed` is the full book (caller too far behind)
+
+
+class SellerBook:
+    """
+    Seller list plus a monotonically increasing version and a change log of
+    the last `max_changes` changes. Mutate sellers only through this class.
+    """
+    def __init__(
+        self,
+        sellers: Sequence[Seller],
+        max_changes: int = 4096,
+        book_id: Optional[str] = None,
+        serialized: Optional[Tuple[bytes, bytes]] = None,
+    ):
+        """
+        A lazy SellerRows (e.g. over a snapshot) stays columnar through
+        updates and is copied into a list only when a seller is added or
+        removed. A SiteRegistry built on the book reads this same list rather
+        than keeping a copy. `book_id` and `serialized` (JSON, gzipped JSON of version 1)
+        let every worker started from the same snapshot share ETags and serve
+        GET /sellers without serializing.
+        """
+        self.sellers: Sequence[Seller] = sellers if isinstance(sellers, SellerRows) else list(sellers)
+        self.book_id = book_id or uuid.uuid4().hex[:12]    # distinguishes versions across restarts
+        self.version = 1
+        self._log: Deque[Tuple[int, str, bool]] = deque(maxlen=max_changes)  # (version, name, removed)
+        self._index: Optional[Dict[str, int]] = None      # name -> first index, built on first lookup
+        self._serialized: Optional[SerializedSellers] = None
+        if serialized is not None:
+            self._serialized = SerializedSellers(self.version, self.etag, *serialized)
+
+    def __len__(self) -> int:
+        return len(self.sellers)
+
+    def index_of(self, name: str) -> Optional[int]:
+        if self._index is None:
+            index: Dict[str, int] = {}
+            for i, n in enumerate(self._names()):
+                index.setdefault(n, i)
+            self._index = index
+        return self._index.get(name)
+
+    def _names(self) -> Sequence[str]:
+        if isinstance(self.sellers, SellerRows):
+            return self.sellers.names
+        return [s.name for s in self.sellers]
+
+    def _writable(self) -> List[Seller]:
+        """The seller list as a list, for changes that add or remove rows."""
+        if not isinstance(self.sellers, list):
+            self.sellers = list(self.sellers)
+        self._index = None
+        return self.sellers
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.book_id}-{self.version}"'
+
+    # ----- MUTATIONS -----
+
+    def _record(self, name: str, removed: bool) -> int:
+        self.version += 1
+        self._log.append((self.version, name, removed))
+        self._serialized = None
+        return self.version
+
+    def update(self, index: int, seller: Seller) -> int:
+        """Replace one row in place (a SellerRows stays columnar, see SellerRows.__setitem__)."""
+        sellers = self.sellers
+        old_name = sellers.names[index] if isinstance(sellers, SellerRows) else sellers[index].name
+        sellers[index] = seller   # type: ignore[index]
+        if old_name != seller.name:
+            self._index = None
+            self._record(old_name, True)
+        return self._record(seller.name, False)
+
+    def add(self, seller: Seller) -> int:
+        self._writable().append(seller)
+        return self._record(seller.name, False)
+
+    def remove(self, index: int) -> int:
+        seller = self._writable().pop(index)
+        return self._record(seller.name, True)
+
+    # ----- READS -----
+
+    def serialized(self) -> SerializedSellers:
+        """The full seller list as JSON bytes, built once per version."""
+        if self._serialized is None or self._serialized.version != self.version:
+            body = json.dumps([seller_to_dict(s) for s in self.sellers], separators=(",", ":")).encode()
+            self._serialized = SerializedSellers(
+                version=self.version,
+                etag=self.etag,
+                body=body,
+                gzipped=gzip.compress(body, compresslevel=6),
+            )
+        return self._serialized
+
+    def changes_since(self, version: int, book_id: Optional[str] = None) -> SellerChanges:
+        """
+        Rows changed or removed after `version`. If the change log no longer
+        reaches back that far (or the version is from another book), returns
+        the full book with reset=True.
+        """
+        oldest = self._log[0][0] if self._log else self.version + 1
+        stale = (
+            (book_id is not None and book_id != self.book_id)
+            or version > self.version
+            or (version < self.version and version + 1 < oldest)
+        )
+        if stale:
+            return SellerChanges(self.book_id, self.version, list(self.sellers), [], reset=True)
+        if version == self.version:
+            return SellerChanges(self.book_id, self.version, [], [])
+
+        # Last event per name wins; only logged names are looked up, never the whole book
+        latest: Dict[str, bool] = {}
+        for v, name, removed in reversed(self._log):
+            if v <= version:
+                break
+            latest.setdefault(name, removed)
+        changed_at: List[int] = []
+        removed: List[str] = []
+        for name, gone in latest.items():
+            index = self.index_of(name)
+            if index is None:
+                removed.append(name)
+            elif not gone:
+                changed_at.append(index)
+        return SellerChanges(self.book_id, self.version, [self.sellers[i] for i in sorted(changed_at)], removed)
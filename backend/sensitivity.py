@@ -0,0 +1,229 @@
+"""
+Closed-form breakeven and sensitivity analysis for auction participants.
+
+For fixed buyer location and quantity, a seller's net price per ton is
+
+    net = offer * (1 - volume_pct) * (1 - eaf_factor)
+    offer = base_cost * (1 + L) + R + w * (risk_aversion - 1) * max(msrp - base_cost, 0)
+
+where L is the per-ton logistics fraction (f[mode] * distance / 1000) and R is a
+routed logistics cost that does not scale with base_cost. Every term is
+piecewise linear (quadratic in risk_aversion for EAF sellers), so the
+breakeven value of each input can be solved exactly for all sellers in one
+pass instead of re-running the auction in a search loop.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, TYPE_CHECKING
+import math
+
+from .models import Seller, Point, Bid, RISK_AVERSION_RANGE
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+@dataclass
+class SellerSensitivity:
+    """
+    Breakeven values are the input value at which the seller's net price per
+    ton equals `target_net_price_per_ton` (the best competing bid), holding
+    everything else fixed. None means no value of that input reaches the
+    target (for risk_aversion: none within RISK_AVERSION_RANGE).
+    """
+    seller_name: str
+    is_winner: bool
+    net_price_per_ton: float
+    target_net_price_per_ton: Optional[float]
+    gap_per_ton: Optional[float]            # net - target; > 0 means losing by that much
+    breakeven_base_cost: Optional[float]
+    breakeven_msrp: Optional[float]
+    breakeven_risk_aversion: Optional[float]
+    d_net_price_d_distance_km: Optional[float]  # None for routed logistics
+    km_to_next_mode: Optional[float]            # None when already in the last mode
+    tons_to_next_tier: Optional[float]          # None when already in the top tier
+    next_tier_net_price_delta: Optional[float]  # change in net/t at the next tier
+
+
+def _solve_base_cost(
+    target_offer: float, L: float, R: float, buffer_w: float, msrp: float,
+) -> Optional[float]:
+    # Region base_cost < msrp: buffer shrinks as base_cost rises
+    slope = 1.0 + L - buffer_w
+    if slope > 0:
+        b = (target_offer - R - buffer_w * msrp) / slope
+        if b < msrp:
+            return b
+    # Region base_cost >= msrp: no buffer
+    b = (target_offer - R) / (1.0 + L)
+    if b >= msrp:
+        return b
+    return None
+
+
+def _solve_msrp(
+    target_offer: float, cost_per_ton: float, buffer_w: float, base_cost: float,
+) -> Optional[float]:
+    # offer = cost + buffer_w * max(msrp - base_cost, 0); below base_cost msrp has no effect
+    if buffer_w <= 0:
+        return None
+    excess = target_offer - cost_per_ton
+    if excess < 0:
+        return None
+    return base_cost + excess / buffer_w
+
+
+def _solve_risk_aversion(
+    target_net: float,
+    current: float,
+    cost_per_ton: float,
+    buffer_weight: float,
+    margin: float,
+    volume_multiplier: float,
+    eaf_coef: float,
+) -> Optional[float]:
+    # net = (A + B r) * volume_multiplier * (1 - k r)
+    A = cost_per_ton - buffer_weight * margin
+    B = buffer_weight * margin
+    k = eaf_coef
+    t = target_net / volume_multiplier
+
+    roots: List[float] = []
+    if k == 0:
+        if B != 0:
+            roots.append((t - A) / B)
+    elif B == 0:
+        if A != 0:
+            roots.append((1.0 - t / A) / k)
+    else:
+        # -B k r^2 + (B - A k) r + (A - t) = 0
+        a, b, c = -B * k, B - A * k, A - t
+        disc = b * b - 4 * a * c
+        if disc >= 0:
+            sq = math.sqrt(disc)
+            roots.extend(((-b + sq) / (2 * a), (-b - sq) / (2 * a)))
+
+    # Only values a seller can actually be given count (rounding at the edges is clamped)
+    lo, hi = RISK_AVERSION_RANGE
+    eps = 1e-9
+    in_range = [min(max(r, lo), hi) for r in roots if lo - eps <= r <= hi + eps]
+    return min(in_range, key=lambda r: abs(r - current), default=None)
+
+
+def analyze_bids(
+    bids: Sequence[Bid],
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+) -> List[SellerSensitivity]:
+    """
+    Sensitivity for every bid of one auction, in one O(n) pass.
+
+    Losing sellers are measured against the winning price; the winner is
+    measured against the runner-up (how far it could move and still win).
+    """
+    if not bids:
+        return []
+
+    # Best and second-best net price, for "best competing bid" targets
+    best_i, best, second = -1, math.inf, math.inf
+    for i, b in enumerate(bids):
+        p = b.net_price_per_ton
+        if p < best:
+            best_i, best, second = i, p, best
+        elif p < second:
+            second = p
+
+    quantity = bids[0].quantity_tons
+    v = policy.volume_discount_pct(quantity)
+    tier = bisect_left(policy.volume_bounds, quantity)
+    if tier + 1 < len(policy.volume_bounds):
+        tons_to_next_tier: Optional[float] = policy.volume_bounds[tier] - quantity
+        v_next: Optional[float] = policy.volume_pcts[tier + 1]
+    else:
+        tons_to_next_tier, v_next = None, None
+
+    w = policy.risk_buffer_weight
+    out: List[SellerSensitivity] = []
+    for i, bid in enumerate(bids):
+        s: Seller = bid.seller
+        target = second if i == best_i else best
+        target = None if math.isinf(target) else target
+
+        eaf_factor = s.risk_aversion * policy.eaf_per_risk_aversion if s.is_eaf else 0.0
+        multiplier = (1.0 - v) * (1.0 - eaf_factor)
+
+        # Split logistics into a base_cost-proportional part (L) and a fixed part (R)
+        mode_i = bisect_left(policy.mode_bounds, bid.distance_km)
+        L = policy.fraction_per_1000km[bid.transport_mode] * (bid.distance_km / 1000.0)
+        distance_model = math.isclose(bid.cost_per_ton, s.base_cost * (1.0 + L), rel_tol=1e-12)
+        if distance_model:
+            R = 0.0
+            d_dist = s.base_cost * policy.fraction_per_1000km[bid.transport_mode] / 1000.0 * multiplier
+            km_to_next = (
+                policy.mode_bounds[mode_i] - bid.distance_km
+                if mode_i + 1 < len(policy.mode_bounds) else None
+            )
+        else:
+            L, R = 0.0, bid.cost_per_ton - s.base_cost
+            d_dist, km_to_next = None, None
+
+        buffer_w = w * (s.risk_aversion - 1.0)
+        margin = max(s.msrp - s.base_cost, 0)
+
+        if target is None or multiplier <= 0:
+            be_base = be_msrp = be_ra = None
+        else:
+            target_offer = target / multiplier
+            be_base = _solve_base_cost(target_offer, L, R, buffer_w, s.msrp)
+            be_msrp = _solve_msrp(target_offer, bid.cost_per_ton, buffer_w, s.base_cost)
+            be_ra = _solve_risk_aversion(
+                target, s.risk_aversion, bid.cost_per_ton, w, margin, 1.0 - v,
+                policy.eaf_per_risk_aversion if s.is_eaf else 0.0,
+            )
+
+        next_delta = None
+        if v_next is not None:
+            next_delta = bid.offer_price_per_ton * (v - v_next) * (1.0 - eaf_factor)
+
+        out.append(SellerSensitivity(
+            seller_name=s.name,
+            is_winner=(i == best_i),
+            net_price_per_ton=bid.net_price_per_ton,
+            target_net_price_per_ton=target,
+            gap_per_ton=None if target is None else bid.net_price_per_ton - target,
+            breakeven_base_cost=be_base,
+            breakeven_msrp=be_msrp,
+            breakeven_risk_aversion=be_ra,
+            d_net_price_d_distance_km=d_dist,
+            km_to_next_mode=km_to_next,
+            tons_to_next_tier=tons_to_next_tier,
+            next_tier_net_price_delta=next_delta,
+        ))
+    return out
+
+
+def analyze_auction(
+    sellers: Sequence[Seller],
+    buyer_location: Point,
+    quantity_tons: float,
+    network: Optional["TransportNetwork"] = None,
+    policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+) -> List[SellerSensitivity]:
+    """
+    Price one auction with the batch kernel and return every seller's sensitivity.
+
+    Args:
+        sellers: List of Seller objects
+        buyer_location: Point representing buyer's location
+        quantity_tons: Quantity of steel to purchase in tons
+        network: Optional TransportNetwork for routed logistics
+        policy: Compiled pricing policy (defaults to the standard formula)
+
+    Returns:
+        List of SellerSensitivity, in seller order
+    """
+    cols = SellerColumns.from_sellers(sellers)
+    bids = price_columns(cols, buyer_location, quantity_tons, network, cols.terms_for(policy))
+    return analyze_bids(bids, policy)
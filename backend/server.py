@@ -1,15 +1,64 @@
 """
 FastAPI server for the auction backend.
 """
-from fastapi import FastAPI, HTTPException, Query
+import asyncio
+import dataclasses
+import hmac
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional, List, Dict, Any
-from .models import Point, StaticGeocoder, Seller, Bid
-from .auction import run_reverse_auction, run_reverse_auction_for_address
+from typing import Optional, List, Dict, Any, Callable, Tuple, Union
+from .models import Point, StaticGeocoder, SiteMatch, Seller, Bid, BidSet, TransportMode, RISK_AVERSION_RANGE
 from .models import make_default_sellers
+from .policy import CompiledPolicy, PolicyRegistry, PricingPolicy
+from .profiling import SamplingProfiler, SlowRequest, SlowRequestRecorder, format_collapsed
+from .pricing import SellerColumns, price_batch
+from .financing import DEFAULT_LENDERS, LenderOffer, amortization_schedule, quote_financing
+from .jobs import Job, JobManager, JOB_KINDS
+from .joint import JointSite, run_joint_auction
+from .orders import Order, OrderStore, ORDER_STATUSES
+from .replay import AuctionHistory, replay_auctions
+from .query import BidQuery, SellerPartitions, SORT_KEYS, page_bids, run_bid_query
+from .routing import TransportNetwork, make_default_network
+from .sensitivity import analyze_auction
+from .seller_book import SellerBook
+from .sites import SiteRegistry
+from .snapshot import Snapshot
+from .timing import ServerTimingMiddleware, stage
+from .watchlist import PriceAlert, Watch, WatchList, WatchStatus
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Open the order store and start warming up in each worker process; on
+    shutdown close the store and stop background jobs. Nothing touches disk
+    or starts threads at import.
+    """
+    global order_store
+    if os.getenv("HOT_IRON_ORDERS_DB"):
+        order_store = OrderStore(os.environ["HOT_IRON_ORDERS_DB"])
+        # Schema creation is SQLite I/O; keep it off the event loop
+        await asyncio.to_thread(order_store.start)
+    threading.Thread(target=warm_up, name="hot-iron-warmup", daemon=True).start()
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(job_manager.close)
+        if order_store is not None:
+            store, order_store = order_store, None
+            await asyncio.to_thread(store.close)
 
-app = FastAPI(title="Hot Iron Auction API", version="1.0.0")
+
+app = FastAPI(title="Hot Iron Auction API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware to allow frontend to connect
 app.add_middleware(
@@ -18,11 +67,268 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
+)
+# Opt-in diagnostics (see profiling.py). Admin endpoints exist only when
+# HOT_IRON_ADMIN_TOKEN is set and require it in the X-Admin-Token header.
+# Requests slower than HOT_IRON_SLOW_REQUEST_MS are captured with their stage
+# timings and stack samples (off unless set; adjustable at runtime).
+ADMIN_TOKEN = os.getenv("HOT_IRON_ADMIN_TOKEN")
+slow_requests = SlowRequestRecorder(
+    threshold_ms=float(os.environ["HOT_IRON_SLOW_REQUEST_MS"]) if os.getenv("HOT_IRON_SLOW_REQUEST_MS") else None,
+    capacity=int(os.getenv("HOT_IRON_SLOW_REQUEST_CAPACITY", "256")),
+    ignore_prefixes=("/admin/",),
+)
+profiler = SamplingProfiler()
+
+# Stage timings of every response in a Server-Timing header (see timing.py)
+app.add_middleware(ServerTimingMiddleware, observer=slow_requests)
+
+# Initialize geocoder and sellers: from a precompiled snapshot if
+# HOT_IRON_SNAPSHOT names one (memory-mapped, see snapshot.py), else from the
+# built-in defaults. Mutate sellers only through seller_book.
+snapshot: Optional[Snapshot] = Snapshot.open(os.environ["HOT_IRON_SNAPSHOT"]) if os.getenv("HOT_IRON_SNAPSHOT") else None
+if snapshot is not None:
+    geocoder = snapshot.geocoder()
+    seller_book = SellerBook(snapshot.seller_rows(), book_id=snapshot.snapshot_id, serialized=snapshot.sellers_json())
+    # Its own row view over the same mapped columns: seller updates patch the
+    # book's rows and the pricing columns separately
+    seller_partitions = SellerPartitions(snapshot.seller_columns())
+else:
+    geocoder = StaticGeocoder()
+    seller_book = SellerBook(make_default_sellers())
+    seller_partitions = SellerPartitions(seller_book.sellers)
+# lat/lon requests within this distance of an address-book site are priced at
+# that site's coordinates (0 disables snapping)
+SNAP_RADIUS_KM = float(os.getenv("HOT_IRON_SNAP_RADIUS_KM", "1.0"))
+
+# Multimodal routed logistics are opt-in; by default logistics follow the
+# great-circle distance model in Seller.logistics_cost_per_ton.
+transport_network: Optional[TransportNetwork] = (
+    make_default_network() if os.getenv("HOT_IRON_ROUTED_LOGISTICS") == "1" else None
+)
+
+# Pricing policies per tenant, optionally loaded from a JSON file of
+# {"tenant": <policy>} (see PricingPolicy.from_dict). Unknown tenants get the default.
+pricing_policies = PolicyRegistry()
+# Replaced or removed policies are never priced again; drop their cached terms
+pricing_policies.on_discard.append(seller_partitions.discard_terms)
+if os.getenv("HOT_IRON_PRICING_POLICIES"):
+    pricing_policies.load_json(os.environ["HOT_IRON_PRICING_POLICIES"])
+
+# Successful auction requests, for backtesting (see replay.py). Off unless
+# HOT_IRON_RECORD_AUCTIONS=1 (memory only) or HOT_IRON_AUCTION_HISTORY names a
+# JSONL file to load from and append to. Only the newest
+# HOT_IRON_AUCTION_HISTORY_MAX requests are kept in memory.
+AUCTION_HISTORY_MAX = int(os.getenv("HOT_IRON_AUCTION_HISTORY_MAX", "1000000"))
+auction_history: Optional[AuctionHistory] = None
+if os.getenv("HOT_IRON_AUCTION_HISTORY"):
+    auction_history = AuctionHistory.open(os.environ["HOT_IRON_AUCTION_HISTORY"], geocoder, AUCTION_HISTORY_MAX)
+elif os.getenv("HOT_IRON_RECORD_AUCTIONS") == "1":
+    auction_history = AuctionHistory(max_records=AUCTION_HISTORY_MAX)
+
+
+# ---------- MICRO-BATCHING ----------
+
+# Requests arriving within BATCH_WINDOW_MS of each other are priced together,
+# up to BATCH_MAX_SIZE requests per batch.
+BATCH_WINDOW_MS = float(os.getenv("HOT_IRON_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("HOT_IRON_BATCH_MAX_SIZE", "256"))
+
+
+class AuctionBatcher:
+    """
+    Collects concurrent auction requests and prices them as one batch.
+
+    Each caller awaits its own (winning_bid, all_bids) result. A batch is
+    flushed when `max_batch_size` requests are pending or `window_ms` has
+    passed since the first request of the batch arrived, whichever is first.
+    """
+    def __init__(
+        self,
+        get_sellers: Callable[[], Union[List[Seller], SellerColumns]],
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+        network: Optional[TransportNetwork] = None,
+    ):
+        self._get_sellers = get_sellers
+        self.network = network
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: List[Tuple[Point, float, CompiledPolicy, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Handle] = None
+
+    async def submit(
+        self,
+        buyer_location: Point,
+        quantity_tons: float,
+        policy: Optional[CompiledPolicy] = None,
+    ) -> Tuple[Bid, BidSet]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((buyer_location, quantity_tons, policy or pricing_policies.default, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            if self.window_ms > 0:
+                self._timer = loop.call_later(self.window_ms / 1000.0, self._flush)
+            else:
+                self._timer = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Price on an executor thread so the event loop keeps serving requests
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, self._price, loop, self._get_sellers(), batch)
+
+    def _price(self, loop: asyncio.AbstractEventLoop, sellers, batch) -> None:
+        """Runs on an executor thread; futures are resolved back on the loop."""
+        try:
+            results = price_batch(
+                sellers,
+                [(location, quantity) for location, quantity, _, _ in batch],
+                self.network,
+                policies=[policy for _, _, policy, _ in batch],
+            )
+        except Exception as e:
+            loop.call_soon_threadsafe(self._resolve, batch, None, e)
+            return
+        loop.call_soon_threadsafe(self._resolve, batch, results, None)
+
+    @staticmethod
+    def _resolve(batch, results: Optional[List[Tuple[Bid, BidSet]]], error: Optional[Exception]) -> None:
+        for i, (*_, future) in enumerate(batch):
+            # Callers that disconnected leave a cancelled future behind
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+
+auction_batcher = AuctionBatcher(lambda: seller_partitions.all, network=transport_network)
+
+# Registered buyer sites, with per-seller quote tables kept up to date on seller changes
+site_registry = SiteRegistry(seller_book, network=transport_network)
+
+# Price-alert watches on registered sites, re-evaluated incrementally on seller changes
+watch_list = WatchList(site_registry, max_alerts=int(os.getenv("HOT_IRON_MAX_ALERTS", "65536")))
+
+# Alerts are pushed to stream subscribers in batches: at most one batch per
+# ALERT_BATCH_MS, or sooner once ALERT_BATCH_MAX alerts are pending.
+ALERT_BATCH_MS = float(os.getenv("HOT_IRON_ALERT_BATCH_MS", "250"))
+ALERT_BATCH_MAX = int(os.getenv("HOT_IRON_ALERT_BATCH_MAX", "1000"))
+
+
+class AlertBroadcaster:
+    """
+    Fans batches of price alerts out to /alerts/stream subscribers.
+
+    A subscriber whose queue fills up is disconnected rather than slowing
+    everyone else down; it reconnects with Last-Event-ID and catches up from
+    the alert feed.
+    """
+    def __init__(self, window_ms: float = ALERT_BATCH_MS, max_batch_size: int = ALERT_BATCH_MAX,
+                 max_queued_batches: int = 64):
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_queued_batches = max_queued_batches
+        self._pending: List[PriceAlert] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued_batches)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, alerts: List[PriceAlert]) -> None:
+        if not alerts or not self._subscribers:
+            return
+        self._pending.extend(alerts)
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window_ms / 1000.0, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)      # tells the stream to close
+
+
+alert_broadcaster = AlertBroadcaster()
+
+
+# Background jobs (grid sweeps, Monte Carlo) run in their own low-priority
+# process pool so they do not compete with interactive auctions for the GIL.
+# The pool, runner threads and spool directory are created by the first job.
+job_manager = JobManager(
+    spool_dir=os.getenv("HOT_IRON_JOB_DIR", os.path.join(tempfile.gettempdir(), "hot-iron-jobs")),
+    workers=int(os.getenv("HOT_IRON_JOB_WORKERS", "1")),
 )
 
-# Initialize geocoder and sellers
-geocoder = StaticGeocoder()
-default_sellers = make_default_sellers()
+# Orders placed from winning bids (SQLite in WAL mode, see orders.py). Opened
+# by the lifespan handler when HOT_IRON_ORDERS_DB names the database file.
+order_store: Optional[OrderStore] = None
+
+
+def require_orders() -> OrderStore:
+    if order_store is None:
+        raise HTTPException(status_code=409, detail="Orders are not stored; set HOT_IRON_ORDERS_DB")
+    return order_store
+
+
+# ---------- READINESS ----------
+
+@dataclasses.dataclass
+class Readiness:
+    ready: bool = False
+    error: Optional[str] = None
+    warmup_ms: float = 0.0
+
+
+readiness = Readiness()
+
+
+def warm_up() -> None:
+    """
+    Fault the snapshot into memory, bind the default policy's per-seller
+    terms and build the GET /sellers body, so the first requests do not pay
+    for them.
+    """
+    started = time.perf_counter()
+    try:
+        if snapshot is not None:
+            snapshot.warm()
+        seller_partitions.all.terms_for(pricing_policies.default)
+        seller_book.serialized()
+        readiness.ready = True
+    except Exception as e:
+        readiness.error = f"{type(e).__name__}: {e}"
+    readiness.warmup_ms = (time.perf_counter() - started) * 1000.0
 
 
 # Request/Response models
@@ -31,6 +337,43 @@ class AuctionRunRequest(BaseModel):
     lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude")
     lon: Optional[float] = Field(None, ge=-180, le=180, description="Longitude")
     quantity_tons: float = Field(..., gt=0, description="Quantity in tons")
+    tenant: Optional[str] = Field(None, description="Tenant whose pricing policy applies")
+    snap_radius_km: Optional[float] = Field(
+        None, ge=0, description="Snap lat/lon to a known site within this distance (default: server setting)",
+    )
+
+    # Bid filters: excluded sellers are never priced
+    is_eaf: Optional[bool] = Field(None, description="Only EAF (true) or only non-EAF (false) sellers")
+    transport_mode: Optional[TransportMode] = Field(None, description="Only bids shipped by this mode")
+    max_distance_km: Optional[float] = Field(None, gt=0, description="Only sellers within this distance")
+    sellers: Optional[List[str]] = Field(None, description="Only these seller names")
+
+    # Bid ordering and pagination
+    sort: Optional[str] = Field(None, description="Sort key, e.g. net_price_per_ton or -distance_km")
+    offset: int = Field(0, ge=0, description="Number of bids to skip")
+    limit: Optional[int] = Field(None, ge=0, description="Maximum number of bids to return")
+
+    deadline_ms: Optional[float] = Field(
+        None, gt=0, description="Latency budget; may return a provisional winner with an optimality bound",
+    )
+
+    @field_validator('sort')
+    @classmethod
+    def validate_sort(cls, v):
+        if v is not None and v.lstrip('-') not in SORT_KEYS:
+            raise ValueError(f'sort must be one of {sorted(SORT_KEYS)}, optionally prefixed with "-"')
+        return v
+
+    def bid_query(self) -> BidQuery:
+        return BidQuery(
+            is_eaf=self.is_eaf,
+            transport_mode=self.transport_mode,
+            max_distance_km=self.max_distance_km,
+            seller_names=self.sellers,
+            sort=self.sort,
+            offset=self.offset,
+            limit=self.limit,
+        )
 
     @field_validator('quantity_tons')
     @classmethod
@@ -58,6 +401,42 @@ class SellerResponse(BaseModel):
     is_eaf: bool
 
 
+class SellerChangesResponse(BaseModel):
+    book_id: str
+    version: int
+    changed: List[SellerResponse]
+    removed: List[str]
+    reset: bool
+
+
+class SellerUpdateRequest(BaseModel):
+    msrp: Optional[float] = Field(None, gt=0)
+    base_cost: Optional[float] = Field(None, gt=0)
+    risk_aversion: Optional[float] = Field(None, ge=RISK_AVERSION_RANGE[0], le=RISK_AVERSION_RANGE[1])
+    is_eaf: Optional[bool] = None
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lon: Optional[float] = Field(None, ge=-180, le=180)
+
+
+class SiteRegisterRequest(BaseModel):
+    site_id: str = Field(..., min_length=1, description="Caller-chosen site identifier")
+    buyer_address: Optional[str] = Field(None, description="Site address (geocoded once)")
+    lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude")
+    lon: Optional[float] = Field(None, ge=-180, le=180, description="Longitude")
+
+    @model_validator(mode='after')
+    def validate_location(self):
+        if not self.buyer_address and (self.lat is None or self.lon is None):
+            raise ValueError('Must provide either buyer_address or both lat and lon')
+        return self
+
+
+class SiteResponse(BaseModel):
+    site_id: str
+    address: Optional[str]
+    location: Dict[str, float]
+
+
 class BidResponse(BaseModel):
     seller_name: str
     distance_km: float
@@ -76,10 +455,357 @@ class BidResponse(BaseModel):
     quantity_tons: float
 
 
+class MatchedSiteResponse(BaseModel):
+    address: str
+    location: Dict[str, float]
+    distance_km: float
+
+
 class AuctionRunResponse(BaseModel):
     winner: BidResponse
     bids: List[BidResponse]
     buyer_location: Dict[str, float]
+    matched_site: Optional[MatchedSiteResponse] = None  # known site lat/lon was snapped to
+    total_bids: Optional[int] = None    # matching bids before offset/limit
+    exact: bool = True                  # False if deadline_ms cut evaluation short
+    max_gap_per_ton: float = 0.0        # true winner is at most this much cheaper per ton
+
+
+class BacktestRequest(BaseModel):
+    seller_overrides: Dict[str, SellerUpdateRequest] = Field(
+        default_factory=dict, description="Candidate changes by seller name",
+    )
+    policy: Optional[Dict[str, Any]] = Field(None, description="Candidate pricing policy (default: baseline policy)")
+    tenant: Optional[str] = Field(None, description="Tenant whose auctions are replayed; its pricing policy is the baseline")
+    since: Optional[float] = Field(None, description="Only auctions at or after this epoch time")
+    until: Optional[float] = Field(None, description="Only auctions before this epoch time")
+    max_flips: int = Field(100, ge=0, le=10000, description="Maximum winner flips to list")
+
+
+class SellerShareChangeResponse(BaseModel):
+    seller_name: str
+    baseline_wins: int
+    candidate_wins: int
+    baseline_tons: float
+    candidate_tons: float
+    baseline_share: float
+    candidate_share: float
+
+
+class WinnerFlipResponse(BaseModel):
+    index: int
+    timestamp: float
+    lat: float
+    lon: float
+    quantity_tons: float
+    baseline_winner: str
+    candidate_winner: str
+    baseline_net_price_per_ton: float
+    candidate_net_price_per_ton: float
+
+
+class BacktestResponse(BaseModel):
+    auctions: int
+    locations: int
+    winner_flips: int
+    baseline_spend: float
+    candidate_spend: float
+    mean_price_delta_per_ton: float
+    max_price_increase_per_ton: float
+    max_price_decrease_per_ton: float
+    sellers: List[SellerShareChangeResponse]
+    flips: List[WinnerFlipResponse]
+    elapsed_ms: float
+
+
+class JobCreateRequest(BaseModel):
+    kind: str = Field(..., description=f"Job kind, one of {sorted(JOB_KINDS)}")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Kind-specific parameters")
+    priority: int = Field(5, ge=0, le=9, description="Lower runs first")
+    tenant: Optional[str] = Field(None, description="Tenant whose pricing policy applies")
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    priority: int
+    progress: float
+    chunks_done: int
+    chunks_total: int
+    rows_total: int
+    rows_written: int
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    error: Optional[str]
+
+
+class JobResultsResponse(BaseModel):
+    job_id: str
+    status: str
+    offset: int
+    rows: List[Dict[str, Any]]
+    rows_written: int
+
+
+class OrderCreateRequest(BaseModel):
+    buyer: str = Field(..., min_length=1, description="Buyer account placing the order")
+    buyer_address: Optional[str] = Field(None, description="Delivery address")
+    lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude")
+    lon: Optional[float] = Field(None, ge=-180, le=180, description="Longitude")
+    quantity_tons: float = Field(..., gt=0, le=100000, description="Quantity in tons")
+    tenant: Optional[str] = Field(None, description="Tenant whose pricing policy applies")
+    max_net_price_per_ton: Optional[float] = Field(
+        None, gt=0, description="Reject (409) if the winning bid is now above this price",
+    )
+
+    @model_validator(mode='after')
+    def validate_location(self):
+        if not self.buyer_address and (self.lat is None or self.lon is None):
+            raise ValueError('Must provide either buyer_address or both lat and lon')
+        return self
+
+
+class OrderStatusUpdateRequest(BaseModel):
+    status: str = Field(..., description=f"One of {list(ORDER_STATUSES)}")
+
+
+class OrderResponse(BaseModel):
+    order_id: str
+    buyer: str
+    seller: str
+    status: str
+    created_at: datetime
+    quantity_tons: float
+    net_price_per_ton: float
+    net_total: float
+    transport_mode: str
+    distance_km: float
+    is_eaf: bool
+    location: Dict[str, float]
+
+
+class OrderListResponse(BaseModel):
+    orders: List[OrderResponse]
+    next_cursor: Optional[str]      # pass as `cursor` for the next page
+
+
+class LenderOfferRequest(BaseModel):
+    lender_name: str
+    annual_rate_pct: float = Field(..., ge=0, le=100, description="APR in percent")
+    tenors_months: List[int] = Field(..., min_length=1, description="Tenor options in months")
+    max_amount: float = Field(..., gt=0)
+    min_amount: float = Field(0.0, ge=0)
+    origination_fee_pct: float = Field(0.0, ge=0, le=100)
+    lender_rating: str = ""
+
+    @field_validator('tenors_months')
+    @classmethod
+    def validate_tenors(cls, v):
+        if any(n <= 0 or n > 600 for n in v):
+            raise ValueError('tenors_months must be between 1 and 600')
+        return v
+
+
+class FinancingRequest(BaseModel):
+    buyer_address: Optional[str] = Field(None, description="Buyer warehouse address")
+    lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude")
+    lon: Optional[float] = Field(None, ge=-180, le=180, description="Longitude")
+    quantity_tons: float = Field(..., gt=0, le=100000, description="Quantity in tons")
+    tenant: Optional[str] = Field(None, description="Tenant whose pricing policy applies")
+    bids: int = Field(1, ge=1, le=100, description="Finance the N cheapest bids (1 = winner only)")
+    lenders: Optional[List[LenderOfferRequest]] = Field(None, description="Lender panel (default: built-in test lenders)")
+    financed_fraction: float = Field(1.0, gt=0, le=1, description="Share of the steel cost that is borrowed")
+    top: int = Field(20, ge=1, le=10000, description="Number of ranked quotes to return")
+    include_schedule: bool = Field(False, description="Include the amortization schedule of the best quote")
+
+    @model_validator(mode='after')
+    def validate_location(self):
+        if not self.buyer_address and (self.lat is None or self.lon is None):
+            raise ValueError('Must provide either buyer_address or both lat and lon')
+        return self
+
+
+class FinancingQuoteResponse(BaseModel):
+    seller_name: str
+    lender_name: str
+    lender_rating: str
+    annual_rate_pct: float
+    tenor_months: int
+    steel_net_total: float
+    principal: float
+    monthly_payment: float
+    total_interest: float
+    fees: float
+    total_financing_cost: float
+    total_landed_cost: float
+    landed_cost_per_ton: float
+
+
+class AmortizationRow(BaseModel):
+    month: int
+    principal: float
+    interest: float
+    total: float
+    remaining_balance: float
+
+
+class FinancingResponse(BaseModel):
+    winner: BidResponse
+    quotes: List[FinancingQuoteResponse]    # cheapest total landed cost first
+    schedule: Optional[List[AmortizationRow]] = None
+    buyer_location: Dict[str, float]
+
+
+class JointSiteRequest(BaseModel):
+    site_id: str = Field(..., min_length=1, description="Caller-chosen site identifier")
+    buyer_address: Optional[str] = Field(None, description="Site address")
+    lat: Optional[float] = Field(None, ge=-90, le=90, description="Latitude")
+    lon: Optional[float] = Field(None, ge=-180, le=180, description="Longitude")
+    quantity_tons: float = Field(..., gt=0, le=100000, description="Quantity in tons")
+
+    @model_validator(mode='after')
+    def validate_location(self):
+        if not self.buyer_address and (self.lat is None or self.lon is None):
+            raise ValueError('Must provide either buyer_address or both lat and lon')
+        return self
+
+
+class JointAuctionRequest(BaseModel):
+    sites: List[JointSiteRequest] = Field(..., min_length=1, max_length=200, description="Buyer sites to source")
+    tenant: Optional[str] = Field(None, description="Tenant whose pricing policy applies")
+    deadline_ms: float = Field(500.0, gt=0, le=60000, description="Search budget for the assignment")
+    gap_tolerance: float = Field(
+        0.001, ge=0, lt=1, description="Accept an assignment proven within this fraction of the optimum",
+    )
+
+    @field_validator('sites')
+    @classmethod
+    def validate_site_ids(cls, v):
+        if len({s.site_id for s in v}) != len(v):
+            raise ValueError('site_id must be unique')
+        return v
+
+
+class JointSiteBidResponse(BaseModel):
+    site_id: str
+    bid: BidResponse
+    buyer_location: Dict[str, float]
+
+
+class SellerAllocationResponse(BaseModel):
+    seller_name: str
+    sites: List[str]
+    quantity_tons: float
+    volume_discount_pct: float
+    net_total: float
+
+
+class JointAuctionResponse(BaseModel):
+    sites: List[JointSiteBidResponse]       # in request order
+    sellers: List[SellerAllocationResponse] # largest aggregated volume first
+    net_total: float
+    independent_net_total: float            # each site auctioned on its own
+    savings: float
+    lower_bound: float                      # no assignment costs less than this
+    gap: float                              # net_total - lower_bound
+    exact: bool                             # True if the assignment is proven optimal
+    nodes: int
+    elapsed_ms: float
+
+
+class WatchCreateRequest(BaseModel):
+    watch_id: Optional[str] = Field(None, min_length=1, description="Caller-chosen id (default: generated)")
+    site_id: str = Field(..., description="Registered site to watch")
+    quantity_tons: float = Field(..., gt=0, le=100000, description="Quantity in tons")
+    threshold_per_ton: float = Field(..., gt=0, description="Alert when the net price per ton drops below this")
+    eaf_only: bool = Field(False, description="Only consider EAF sellers")
+    owner: Optional[str] = Field(None, description="Who the alerts are for")
+
+
+class WatchBatchRequest(BaseModel):
+    watches: List[WatchCreateRequest] = Field(..., min_length=1, max_length=10000)
+
+
+class WatchResponse(BaseModel):
+    watch_id: str
+    site_id: str
+    quantity_tons: float
+    threshold_per_ton: float
+    eaf_only: bool
+    owner: Optional[str]
+    triggered: bool
+    net_price_per_ton: Optional[float]  # current winner's, None if no seller qualifies
+    seller_name: Optional[str]
+
+
+class PriceAlertResponse(BaseModel):
+    seq: int
+    kind: str
+    watch_id: str
+    site_id: str
+    owner: Optional[str]
+    quantity_tons: float
+    threshold_per_ton: float
+    net_price_per_ton: Optional[float]
+    seller_name: Optional[str]
+    created_at: float
+
+
+class PriceAlertListResponse(BaseModel):
+    alerts: List[PriceAlertResponse]
+    last_seq: int                       # pass as `since` to poll for newer alerts
+    missed: bool                        # alerts after `since` were dropped from the bounded log
+
+
+class SlowRequestResponse(BaseModel):
+    request_id: int
+    method: str
+    path: str
+    query: str
+    status: int
+    started_at: float
+    duration_ms: float
+    stages: Dict[str, float]                # Server-Timing stages in ms
+    samples: int                            # stack sampling rounds while over the threshold
+    stacks: Optional[Dict[str, int]] = None # collapsed stack -> samples
+
+
+class SlowRequestConfig(BaseModel):
+    threshold_ms: Optional[float] = Field(None, gt=0, description="Capture threshold; null disables capture")
+
+
+class SlowRequestConfigResponse(BaseModel):
+    threshold_ms: Optional[float]
+    capacity: int
+    captured: int
+
+
+class SiteQuoteResponse(BaseModel):
+    site_id: str
+    winner: BidResponse
+    buyer_location: Dict[str, float]
+
+
+class SellerSensitivityResponse(BaseModel):
+    seller_name: str
+    is_winner: bool
+    net_price_per_ton: float
+    target_net_price_per_ton: Optional[float]
+    gap_per_ton: Optional[float]
+    breakeven_base_cost: Optional[float]
+    breakeven_msrp: Optional[float]
+    breakeven_risk_aversion: Optional[float]
+    d_net_price_d_distance_km: Optional[float]
+    km_to_next_mode: Optional[float]
+    tons_to_next_tier: Optional[float]
+    next_tier_net_price_delta: Optional[float]
+
+
+class SensitivityResponse(BaseModel):
+    sellers: List[SellerSensitivityResponse]
+    buyer_location: Dict[str, float]
 
 
 def bid_to_response(bid: Bid) -> BidResponse:
@@ -103,26 +829,233 @@ def bid_to_response(bid: Bid) -> BidResponse:
     )
 
 
+def seller_to_response(seller: Seller) -> SellerResponse:
+    """Convert Seller to SellerResponse."""
+    return SellerResponse(
+        name=seller.name,
+        location={"lat": seller.location.lat, "lon": seller.location.lon},
+        msrp=seller.msrp,
+        base_cost=seller.base_cost,
+        risk_aversion=seller.risk_aversion,
+        is_eaf=seller.is_eaf,
+    )
+
+
+def job_to_response(job: Job) -> JobResponse:
+    """Convert Job to JobResponse."""
+    return JobResponse(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        priority=job.priority,
+        progress=job.progress,
+        chunks_done=job.chunks_done,
+        chunks_total=job.chunks_total,
+        rows_total=job.plan.rows,
+        rows_written=job.rows_written,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+    )
+
+
+def order_to_response(order: Order) -> OrderResponse:
+    """Convert Order to OrderResponse."""
+    return OrderResponse(
+        order_id=order.order_id,
+        buyer=order.buyer,
+        seller=order.seller,
+        status=order.status,
+        created_at=datetime.fromtimestamp(order.created_at, tz=timezone.utc),
+        quantity_tons=order.quantity_tons,
+        net_price_per_ton=order.net_price_per_ton,
+        net_total=order.net_total,
+        transport_mode=order.transport_mode,
+        distance_km=order.distance_km,
+        is_eaf=order.is_eaf,
+        location={"lat": order.lat, "lon": order.lon},
+    )
+
+
+def watch_to_response(status: WatchStatus) -> WatchResponse:
+    return WatchResponse(
+        **vars(status.watch),
+        triggered=status.triggered,
+        net_price_per_ton=status.net_price_per_ton,
+        seller_name=status.seller_name,
+    )
+
+
+def watch_to_dict(status: WatchStatus) -> Dict[str, Any]:
+    """JSON form of a watch status, same fields as WatchResponse."""
+    return {
+        **vars(status.watch),
+        "triggered": status.triggered,
+        "net_price_per_ton": status.net_price_per_ton,
+        "seller_name": status.seller_name,
+    }
+
+
+def slow_request_to_response(request: SlowRequest, include_stacks: bool) -> SlowRequestResponse:
+    stages: Dict[str, float] = {}
+    for name, ms in request.stages:
+        stages[name] = stages.get(name, 0.0) + ms
+    return SlowRequestResponse(
+        **{**vars(request), "stages": stages, "stacks": request.stacks if include_stacks else None},
+    )
+
+
+def require_admin(request: Request) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match check with weak comparison (RFC 9110: W/ prefixes are ignored)."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = lambda tag: tag[2:] if tag.startswith("W/") else tag
+    return opaque(etag) in [opaque(tag.strip()) for tag in if_none_match.split(",")]
+
+
+def apply_seller_update(seller: Seller, update: SellerUpdateRequest) -> Seller:
+    """Copy of `seller` with the fields set in `update` changed."""
+    changes = update.model_dump(exclude_none=True)
+    lat, lon = changes.pop("lat", seller.location.lat), changes.pop("lon", seller.location.lon)
+    return dataclasses.replace(seller, location=Point(lat=lat, lon=lon), **changes)
+
+
+def resolve_buyer_site(
+    request: Union[AuctionRunRequest, SiteRegisterRequest, OrderCreateRequest, FinancingRequest, JointSiteRequest],
+    snap_radius_km: Optional[float] = None,
+) -> Tuple[Point, Optional[SiteMatch]]:
+    """
+    Buyer location from lat/lon if given, else from the geocoded address.
+    Coordinates within the snap radius of an address-book site resolve to
+    that site, which is returned as the match.
+    """
+    if request.lat is not None and request.lon is not None:
+        if snap_radius_km is None:
+            snap_radius_km = getattr(request, "snap_radius_km", None)
+        radius = SNAP_RADIUS_KM if snap_radius_km is None else snap_radius_km
+        match = geocoder.reverse_geocode(request.lat, request.lon, radius) if radius > 0 else None
+        if match is not None:
+            return match.location, match
+        return Point(lat=request.lat, lon=request.lon), None
+    elif request.buyer_address:
+        try:
+            return geocoder.geocode(request.buyer_address), None
+        except KeyError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Address not found: {str(e)}. Known addresses: central us warehouse, chicago il, pittsburgh pa"
+            )
+    else:
+        raise HTTPException(
+            status_code=400,
+            detail="Must provide either buyer_address or both lat and lon"
+        )
+
+
+def resolve_buyer_location(
+    request: Union[AuctionRunRequest, SiteRegisterRequest, OrderCreateRequest, FinancingRequest],
+    snap_radius_km: Optional[float] = None,
+) -> Point:
+    """Buyer location of a request, snapped to a known site if one is close enough."""
+    return resolve_buyer_site(request, snap_radius_km)[0]
+
+
+def site_match_to_response(match: Optional[SiteMatch]) -> Optional[MatchedSiteResponse]:
+    if match is None:
+        return None
+    return MatchedSiteResponse(
+        address=match.address,
+        location={"lat": match.location.lat, "lon": match.location.lon},
+        distance_km=match.distance_km,
+    )
+
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready():
+    """
+    Readiness check: 503 until the seller book (and snapshot, if any) is
+    mapped and warm, then 200.
+    """
+    body = {
+        "status": "ready" if readiness.ready else ("failed" if readiness.error else "warming"),
+        "snapshot_id": snapshot.snapshot_id if snapshot is not None else None,
+        "sellers": len(seller_book),
+        "warmup_ms": readiness.warmup_ms,
+    }
+    if readiness.error:
+        body["error"] = readiness.error
+    return JSONResponse(body, status_code=200 if readiness.ready else 503)
+
+
 @app.get("/sellers", response_model=List[SellerResponse])
-async def get_sellers():
-    """Get list of available sellers."""
-    return [
-        SellerResponse(
-            name=seller.name,
-            location={"lat": seller.location.lat, "lon": seller.location.lon},
-            msrp=seller.msrp,
-            base_cost=seller.base_cost,
-            risk_aversion=seller.risk_aversion,
-            is_eaf=seller.is_eaf,
-        )
-        for seller in default_sellers
-    ]
+async def get_sellers(request: Request):
+    """
+    Get list of available sellers.
+
+    Served from bytes pre-built per seller book version. Supports
+    If-None-Match (304 when unchanged) and gzip.
+    """
+    with stage("serialize"):
+        snapshot = seller_book.serialized()
+    headers = {"ETag": snapshot.etag, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match", ""), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzipped, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@app.get("/sellers/changes", response_model=SellerChangesResponse)
+async def get_seller_changes(
+    since: int = Query(..., ge=0, description="Seller book version the caller already has"),
+    book_id: Optional[str] = Query(None, description="book_id from a previous response"),
+):
+    """
+    Sellers added, changed or removed since `since`. If the change log does
+    not reach back that far, `reset` is true and `changed` is the full list.
+    """
+    changes = seller_book.changes_since(since, book_id)
+    return SellerChangesResponse(
+        book_id=changes.book_id,
+        version=changes.version,
+        changed=[seller_to_response(s) for s in changes.changed],
+        removed=changes.removed,
+        reset=changes.reset,
+    )
+
+
+@app.put("/sellers/{name}", response_model=SellerResponse)
+async def update_seller(name: str, update: SellerUpdateRequest, request: Request):
+    """
+    Update one seller's parameters (admin only). Only this seller's row is
+    recomputed, in the pricing columns and in registered site quote tables.
+    """
+    require_admin(request)
+    index = seller_book.index_of(name)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Unknown seller: {name!r}")
+
+    seller = apply_seller_update(seller_book.sellers[index], update)
+    seller_book.update(index, seller)
+    seller_partitions.update(index, seller)
+    site_registry.update_seller(index)
+    alert_broadcaster.publish(watch_list.seller_updated(index))
+    return seller_to_response(seller)
 
 
 @app.post("/auction/run", response_model=AuctionRunResponse)
@@ -130,38 +1063,49 @@ async def run_auction(request: AuctionRunRequest):
     """
     Run a reverse auction.
     
-    Requires either buyer_address or both lat/lon coordinates.
+    Requires either buyer_address or both lat/lon coordinates. Coordinates
+    within snap_radius_km of an address-book site are priced at that site,
+    reported as matched_site.
     """
     try:
-        # Determine buyer location
-        if request.lat is not None and request.lon is not None:
-            buyer_location = Point(lat=request.lat, lon=request.lon)
-        elif request.buyer_address:
-            try:
-                buyer_location = geocoder.geocode(request.buyer_address)
-            except KeyError as e:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Address not found: {str(e)}. Known addresses: central us warehouse, chicago il, pittsburgh pa"
+        with stage("resolve"):
+            buyer_location, matched_site = resolve_buyer_site(request)
+            policy = pricing_policies.get(request.tenant)
+            query = request.bid_query()
+
+        if query.has_filters or request.deadline_ms is not None:
+            # Filtered and deadline-bound queries run on their own, outside the batcher
+            with stage("price"):
+                result = run_bid_query(
+                    seller_partitions, buyer_location, request.quantity_tons, query,
+                    network=transport_network, policy=policy, deadline_ms=request.deadline_ms,
                 )
+            if result.winner is None:
+                raise HTTPException(status_code=404, detail="No sellers match the bid filters")
+            winner, page, total = result.winner, result.bids, result.total
+            exact, max_gap = result.exact, result.max_gap_per_ton
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="Must provide either buyer_address or both lat and lon"
-            )
-
-        # Run auction
-        winner, bids = run_reverse_auction(
-            sellers=default_sellers,
-            buyer_location=buyer_location,
-            quantity_tons=request.quantity_tons,
-        )
+            # Run auction (priced together with any concurrent requests)
+            with stage("batch"):
+                winner, bids = await auction_batcher.submit(buyer_location, request.quantity_tons, policy)
+            page, total = page_bids(bids, query), len(bids)
+            exact, max_gap = True, 0.0
+        if auction_history is not None and not query.has_filters:
+            # Replay prices every seller, so filtered requests are not recorded
+            auction_history.record(buyer_location, request.quantity_tons, request.tenant)
 
-        return AuctionRunResponse(
-            winner=bid_to_response(winner),
-            bids=[bid_to_response(bid) for bid in bids],
-            buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
-        )
+        with stage("respond"):
+            return AuctionRunResponse(
+                winner=bid_to_response(winner),
+                bids=[bid_to_response(bid) for bid in page],
+                buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
+                matched_site=site_match_to_response(matched_site),
+                total_bids=total,
+                exact=exact,
+                max_gap_per_ton=max_gap,
+            )
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -172,6 +1116,7 @@ async def run_auction(request: AuctionRunRequest):
 async def run_auction_by_address(
     buyer_address: str = Query(..., description="Buyer warehouse address"),
     quantity_tons: float = Query(..., gt=0, description="Quantity in tons"),
+    tenant: Optional[str] = Query(None, description="Tenant whose pricing policy applies"),
 ):
     """
     Run auction using address string (convenience endpoint).
@@ -182,20 +1127,21 @@ async def run_auction_by_address(
         if quantity_tons > 100000:
             raise HTTPException(status_code=400, detail="quantity_tons cannot exceed 100,000")
 
-        winner, bids = run_reverse_auction_for_address(
-            sellers=default_sellers,
-            buyer_address=buyer_address,
-            geocoder=geocoder,
-            quantity_tons=quantity_tons,
-        )
-
-        buyer_location = geocoder.geocode(buyer_address)
+        with stage("resolve"):
+            buyer_location = geocoder.geocode(buyer_address)
+        with stage("batch"):
+            winner, bids = await auction_batcher.submit(
+                buyer_location, quantity_tons, pricing_policies.get(tenant),
+            )
+        if auction_history is not None:
+            auction_history.record(buyer_location, quantity_tons, tenant)
 
-        return AuctionRunResponse(
-            winner=bid_to_response(winner),
-            bids=[bid_to_response(bid) for bid in bids],
-            buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
-        )
+        with stage("respond"):
+            return AuctionRunResponse(
+                winner=bid_to_response(winner),
+                bids=[bid_to_response(bid) for bid in bids],
+                buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
+            )
     except KeyError as e:
         raise HTTPException(
             status_code=400,
@@ -204,3 +1150,586 @@ async def run_auction_by_address(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+
+@app.post("/auction/joint", response_model=JointAuctionResponse)
+async def joint_auction(request: JointAuctionRequest):
+    """
+    Source several buyer sites at once, each from one seller, at the lowest
+    total cost: volume tiers apply to each seller's aggregated tonnage, so
+    consolidating sites on fewer sellers can beat per-site winners.
+    """
+    try:
+        with stage("resolve"):
+            locations = [resolve_buyer_location(site) for site in request.sites]
+            policy = pricing_policies.get(request.tenant)
+            sites = [
+                JointSite(site_id=site.site_id, location=location, quantity_tons=site.quantity_tons)
+                for site, location in zip(request.sites, locations)
+            ]
+        with stage("joint"):
+            result = await asyncio.to_thread(
+                run_joint_auction, seller_partitions.all, sites, transport_network, policy,
+                request.deadline_ms, request.gap_tolerance,
+            )
+        with stage("respond"):
+            return JointAuctionResponse(
+                sites=[
+                    JointSiteBidResponse(
+                        site_id=site_id,
+                        bid=bid_to_response(bid),
+                        buyer_location={"lat": location.lat, "lon": location.lon},
+                    )
+                    for (site_id, bid), location in zip(result.bids, locations)
+                ],
+                sellers=[SellerAllocationResponse(**vars(a)) for a in result.sellers],
+                net_total=result.net_total,
+                independent_net_total=result.independent_net_total,
+                savings=result.savings,
+                lower_bound=result.lower_bound,
+                gap=result.gap,
+                exact=result.exact,
+                nodes=result.nodes,
+                elapsed_ms=result.elapsed_ms,
+            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.post("/auction/sensitivity", response_model=SensitivityResponse)
+async def auction_sensitivity(request: AuctionRunRequest):
+    """
+    Breakeven base_cost / msrp / risk_aversion for every seller against the
+    best competing bid, plus price sensitivity to distance and volume tier.
+    """
+    try:
+        buyer_location = resolve_buyer_location(request)
+        results = analyze_auction(
+            seller_book.sellers,
+            buyer_location,
+            request.quantity_tons,
+            network=transport_network,
+            policy=pricing_policies.get(request.tenant),
+        )
+        return SensitivityResponse(
+            sellers=[SellerSensitivityResponse(**vars(r)) for r in results],
+            buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.post("/auction/backtest", response_model=BacktestResponse)
+async def auction_backtest(request: BacktestRequest):
+    """
+    Replay the stored auctions of `tenant` against the current seller book
+    with `seller_overrides` and/or a candidate pricing policy applied, and report
+    winner flips, spend and price deltas and per-seller share changes.
+    """
+    if auction_history is None:
+        raise HTTPException(
+            status_code=409,
+            detail="Auction history is not recorded; set HOT_IRON_RECORD_AUCTIONS=1 or HOT_IRON_AUCTION_HISTORY",
+        )
+    unknown = [name for name in request.seller_overrides if seller_book.index_of(name) is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown sellers: {unknown}")
+    baseline_policy = pricing_policies.get(request.tenant)
+    try:
+        candidate_policy = (
+            PricingPolicy.from_dict(request.policy).compile() if request.policy is not None else None
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pricing policy: {e}")
+
+    baseline = list(seller_book.sellers)
+    candidate = [
+        apply_seller_update(s, request.seller_overrides[s.name]) if s.name in request.seller_overrides else s
+        for s in baseline
+    ]
+    # Only this tenant's auctions were priced with the baseline policy
+    history = auction_history.window(request.since, request.until, tenants={request.tenant})
+    # A year of history takes a while to replay; keep the event loop free
+    report = await asyncio.to_thread(
+        replay_auctions, history, baseline, candidate, transport_network,
+        baseline_policy, candidate_policy, request.max_flips,
+    )
+    return BacktestResponse(
+        **{k: v for k, v in vars(report).items() if k not in ("sellers", "flips")},
+        sellers=[SellerShareChangeResponse(**vars(s)) for s in report.sellers],
+        flips=[WinnerFlipResponse(**vars(f)) for f in report.flips],
+    )
+
+
+@app.post("/jobs", response_model=JobResponse)
+async def create_job(request: JobCreateRequest):
+    """
+    Queue a background job against a snapshot of the current seller book.
+
+    Kinds: `grid` (locations or a lat/lon box with step_deg, x quantities)
+    and `monte_carlo` (lat, lon, quantity_tons, trials, jitter_pct, seed).
+    """
+    try:
+        job = job_manager.submit(
+            request.kind,
+            request.params,
+            seller_book.sellers,
+            network=transport_network,
+            policy=pricing_policies.get(request.tenant),
+            priority=request.priority,
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid job: {e}")
+    return job_to_response(job)
+
+
+@app.get("/jobs", response_model=List[JobResponse])
+async def list_jobs():
+    """List background jobs, oldest first."""
+    return [job_to_response(job) for job in job_manager.jobs()]
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Status and progress of a background job."""
+    try:
+        return job_to_response(job_manager.get(job_id))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id!r}")
+
+
+@app.get("/jobs/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="First row to return"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum rows to return"),
+):
+    """A page of a job's spooled result rows; available while the job runs."""
+    try:
+        job = job_manager.get(job_id)
+        rows = await asyncio.to_thread(job_manager.results, job_id, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id!r}")
+    return JobResultsResponse(
+        job_id=job_id, status=job.status, offset=offset, rows=rows, rows_written=job.rows_written,
+    )
+
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Cancel a background job and delete its results."""
+    try:
+        job_manager.delete(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id!r}")
+    return {"status": "ok"}
+
+
+@app.post("/orders", response_model=OrderResponse)
+async def create_order(request: OrderCreateRequest):
+    """
+    Run the auction for this delivery and persist the winning bid as a
+    Pending order. Returns once the order is committed.
+    """
+    store = require_orders()
+    buyer_location = resolve_buyer_location(request)
+    try:
+        winner, _ = await auction_batcher.submit(
+            buyer_location, request.quantity_tons, pricing_policies.get(request.tenant),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.max_net_price_per_ton is not None and winner.net_price_per_ton > request.max_net_price_per_ton:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Winning bid is now {winner.net_price_per_ton:.2f}/t, above {request.max_net_price_per_ton:.2f}/t",
+        )
+    order = Order.from_bid(winner, request.buyer, buyer_location.lat, buyer_location.lon)
+    await asyncio.wrap_future(store.create(order))
+    return order_to_response(order)
+
+
+@app.get("/orders", response_model=OrderListResponse)
+async def list_orders(
+    buyer: Optional[str] = Query(None),
+    seller: Optional[str] = Query(None),
+    status: Optional[str] = Query(None, description=f"One of {list(ORDER_STATUSES)}"),
+    created_from: Optional[datetime] = Query(None, description="Created at or after (ISO 8601)"),
+    created_to: Optional[datetime] = Query(None, description="Created before (ISO 8601)"),
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+):
+    """Orders newest first, filtered and paginated by keyset cursor."""
+    try:
+        orders, next_cursor = await asyncio.to_thread(
+            require_orders().list,
+            buyer=buyer,
+            seller=seller,
+            status=status,
+            created_from=created_from.timestamp() if created_from else None,
+            created_to=created_to.timestamp() if created_to else None,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OrderListResponse(orders=[order_to_response(o) for o in orders], next_cursor=next_cursor)
+
+
+@app.get("/orders/{order_id}", response_model=OrderResponse)
+async def get_order(order_id: str):
+    """Get one order."""
+    order = await asyncio.to_thread(require_orders().get, order_id)
+    if order is None:
+        raise HTTPException(status_code=404, detail=f"Unknown order: {order_id!r}")
+    return order_to_response(order)
+
+
+@app.patch("/orders/{order_id}", response_model=OrderResponse)
+async def update_order_status(order_id: str, update: OrderStatusUpdateRequest):
+    """Move an order to another status."""
+    store = require_orders()
+    try:
+        found = await asyncio.wrap_future(store.set_status(order_id, update.status))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not found:
+        raise HTTPException(status_code=404, detail=f"Unknown order: {order_id!r}")
+    return order_to_response(await asyncio.to_thread(store.get, order_id))
+
+
+@app.post("/financing/offers", response_model=FinancingResponse)
+async def financing_offers(request: FinancingRequest):
+    """
+    Run the auction, then price every lender x tenor option for the winning
+    bid (or the N cheapest bids) and rank them by total landed cost.
+    """
+    buyer_location = resolve_buyer_location(request)
+    lenders = (
+        [LenderOffer(**{**l.model_dump(), "tenors_months": tuple(l.tenors_months)}) for l in request.lenders]
+        if request.lenders is not None else DEFAULT_LENDERS
+    )
+    try:
+        winner, bids = await auction_batcher.submit(
+            buyer_location, request.quantity_tons, pricing_policies.get(request.tenant),
+        )
+        quotes = quote_financing(
+            bids.top_k(request.bids), lenders, financed_fraction=request.financed_fraction, top=request.top,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    schedule = None
+    if request.include_schedule and quotes:
+        best = quotes[0]
+        schedule = [
+            AmortizationRow(**row)
+            for row in amortization_schedule(best.principal, best.annual_rate_pct, best.tenor_months)
+        ]
+    return FinancingResponse(
+        winner=bid_to_response(winner),
+        quotes=[FinancingQuoteResponse(**vars(q)) for q in quotes],
+        schedule=schedule,
+        buyer_location={"lat": buyer_location.lat, "lon": buyer_location.lon},
+    )
+
+
+@app.post("/sites", response_model=SiteResponse)
+async def register_site(request: SiteRegisterRequest):
+    """Register a buyer site: geocode it once and materialize its seller quotes."""
+    location = resolve_buyer_location(request, snap_radius_km=0)
+    site = site_registry.register(request.site_id, location, address=request.buyer_address)
+    alert_broadcaster.publish(watch_list.site_refreshed(site.site_id))
+    return SiteResponse(
+        site_id=site.site_id,
+        address=site.address,
+        location={"lat": location.lat, "lon": location.lon},
+    )
+
+
+@app.get("/sites", response_model=List[SiteResponse])
+async def list_sites():
+    """List registered buyer sites."""
+    return [
+        SiteResponse(
+            site_id=site.site_id,
+            address=site.address,
+            location={"lat": site.location.lat, "lon": site.location.lon},
+        )
+        for site in site_registry.sites()
+    ]
+
+
+@app.delete("/sites/{site_id}")
+async def unregister_site(site_id: str):
+    """Remove a registered buyer site and its price watches."""
+    if site_id not in site_registry:
+        raise HTTPException(status_code=404, detail=f"Unknown site: {site_id!r}")
+    site_registry.unregister(site_id)
+    watch_list.site_removed(site_id)
+    return {"status": "ok"}
+
+
+@app.get("/sites/{site_id}/quote", response_model=SiteQuoteResponse)
+async def quote_site(
+    site_id: str,
+    quantity_tons: float = Query(..., gt=0, le=100000, description="Quantity in tons"),
+):
+    """Winning bid for a registered site (default pricing policy), from its materialized table."""
+    if site_id not in site_registry:
+        raise HTTPException(status_code=404, detail=f"Unknown site: {site_id!r}")
+    try:
+        winner = site_registry.quote(site_id, quantity_tons)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    location = site_registry.get(site_id).location
+    return SiteQuoteResponse(
+        site_id=site_id,
+        winner=bid_to_response(winner),
+        buyer_location={"lat": location.lat, "lon": location.lon},
+    )
+
+
+def watch_from_request(request: WatchCreateRequest) -> Watch:
+    return Watch(**{**request.model_dump(), "watch_id": request.watch_id or uuid.uuid4().hex[:12]})
+
+
+def add_watch(request: WatchCreateRequest) -> WatchResponse:
+    watch = watch_from_request(request)
+    try:
+        return watch_to_response(watch_list.add(watch))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown site: {request.site_id!r}")
+
+
+@app.post("/watches", response_model=WatchResponse)
+async def create_watch(request: WatchCreateRequest):
+    """
+    Watch a registered site's winning net price per ton (default pricing
+    policy) and raise an alert when it drops below the threshold, and again
+    when it rises back. Re-using a watch_id replaces that watch.
+    """
+    return add_watch(request)
+
+
+@app.post("/watches/batch", response_model=List[WatchResponse])
+async def create_watches(request: WatchBatchRequest):
+    """
+    Add up to 10,000 watches in one call. Watches are only changed on the
+    event loop, so just the index merge (WatchList.add_many) runs there;
+    building the watches and the response body runs in a worker thread.
+    """
+    watches = await asyncio.to_thread(list, map(watch_from_request, request.watches))
+    unknown = sorted({w.site_id for w in watches if w.site_id not in site_registry})
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown sites: {unknown}")
+    statuses = watch_list.add_many(watches)
+    return JSONResponse(await asyncio.to_thread(list, map(watch_to_dict, statuses)))
+
+
+@app.get("/watches", response_model=List[WatchResponse])
+async def list_watches(
+    site_id: Optional[str] = Query(None, description="Only watches on this site"),
+    owner: Optional[str] = Query(None, description="Only this owner's watches"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """List watches with their current state."""
+    statuses = watch_list.watches(site_id=site_id, owner=owner)
+    return [watch_to_response(s) for s in statuses[offset:offset + limit]]
+
+
+@app.get("/watches/{watch_id}", response_model=WatchResponse)
+async def get_watch(watch_id: str):
+    if watch_id not in watch_list:
+        raise HTTPException(status_code=404, detail=f"Unknown watch: {watch_id!r}")
+    return watch_to_response(watch_list.get(watch_id))
+
+
+@app.delete("/watches/{watch_id}")
+async def delete_watch(watch_id: str):
+    if watch_id not in watch_list:
+        raise HTTPException(status_code=404, detail=f"Unknown watch: {watch_id!r}")
+    watch_list.remove(watch_id)
+    return {"status": "ok"}
+
+
+@app.get("/alerts", response_model=PriceAlertListResponse)
+async def list_alerts(
+    since: int = Query(0, ge=0, description="Only alerts after this sequence number"),
+    owner: Optional[str] = Query(None, description="Only this owner's alerts"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """Poll for price alerts raised after `since`, oldest first."""
+    alerts, missed = watch_list.feed.since(since, owner=owner, limit=limit)
+    return PriceAlertListResponse(
+        alerts=[PriceAlertResponse(**vars(a)) for a in alerts],
+        last_seq=alerts[-1].seq if alerts else max(since, watch_list.feed.last_seq),
+        missed=missed,
+    )
+
+
+@app.get("/alerts/stream")
+async def stream_alerts(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Replay alerts after this sequence number first"),
+    owner: Optional[str] = Query(None, description="Only this owner's alerts"),
+):
+    """
+    Server-sent events: one `alerts` event per batch, carrying a JSON list of
+    alerts; the event id is the batch's last sequence number, so a client
+    reconnecting with Last-Event-ID resumes without gaps.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    def event(alerts: List[PriceAlert]) -> bytes:
+        body = json.dumps([PriceAlertResponse(**vars(a)).model_dump() for a in alerts])
+        return f"id: {alerts[-1].seq}\nevent: alerts\ndata: {body}\n\n".encode()
+
+    # Subscribe before reading the backlog, so nothing falls in between
+    queue = alert_broadcaster.subscribe()
+    backlog: List[PriceAlert] = []
+    if since is not None:
+        backlog, _ = watch_list.feed.since(since, owner=owner)
+    last_seq = backlog[-1].seq if backlog else (since or 0)
+
+    async def events():
+        nonlocal last_seq
+        try:
+            for start in range(0, len(backlog), ALERT_BATCH_MAX):
+                yield event(backlog[start:start + ALERT_BATCH_MAX])
+            while True:
+                try:
+                    batch = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if batch is None:
+                    return
+                alerts = [a for a in batch if a.seq > last_seq and (owner is None or a.owner == owner)]
+                if alerts:
+                    last_seq = alerts[-1].seq
+                    yield event(alerts)
+        finally:
+            alert_broadcaster.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+# ---------- DIAGNOSTICS ----------
+
+@app.get("/admin/profile", response_class=PlainTextResponse)
+async def admin_profile(
+    request: Request,
+    seconds: float = Query(10.0, gt=0, le=120, description="How long to sample"),
+    interval_ms: float = Query(5.0, ge=1, le=1000, description="Sampling interval"),
+    include_idle: bool = Query(False, description="Keep threads parked waiting for work"),
+):
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    (one `thread;frame;...;frame count` line per stack) for flame graph tools.
+    The event loop keeps serving while the profile runs.
+    """
+    require_admin(request)
+    try:
+        profile = await asyncio.to_thread(profiler.run, seconds, interval_ms, include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return PlainTextResponse(
+        format_collapsed(profile.stacks),
+        headers={
+            "Content-Disposition": f'attachment; filename="hot-iron-{stamp}.folded"',
+            "X-Profile-Samples": str(profile.samples),
+            "X-Profile-Duration-S": f"{profile.duration_s:.3f}",
+        },
+    )
+
+
+@app.get("/admin/slow-requests", response_model=List[SlowRequestResponse])
+async def list_slow_requests(
+    request: Request,
+    limit: int = Query(50, ge=1, le=1000),
+    min_ms: float = Query(0.0, ge=0, description="Only requests at least this slow"),
+    path: Optional[str] = Query(None, description="Only this path, e.g. /auction/run"),
+    include_stacks: bool = Query(False, description="Include the stack samples"),
+):
+    """Captured slow requests, newest first."""
+    require_admin(request)
+    return [
+        slow_request_to_response(r, include_stacks)
+        for r in slow_requests.recent(limit=limit, min_ms=min_ms, path=path)
+    ]
+
+
+@app.get("/admin/slow-requests/config", response_model=SlowRequestConfigResponse)
+async def get_slow_request_config(request: Request):
+    require_admin(request)
+    return SlowRequestConfigResponse(
+        threshold_ms=slow_requests.threshold_ms,
+        capacity=slow_requests.capacity,
+        captured=len(slow_requests),
+    )
+
+
+@app.put("/admin/slow-requests/config", response_model=SlowRequestConfigResponse)
+async def put_slow_request_config(request: Request, config: SlowRequestConfig):
+    """Change the capture threshold at runtime (null turns capture off)."""
+    require_admin(request)
+    slow_requests.threshold_ms = config.threshold_ms
+    return await get_slow_request_config(request)
+
+
+@app.get("/admin/slow-requests/{request_id}", response_model=SlowRequestResponse)
+async def get_slow_request(
+    request: Request,
+    request_id: int,
+    format: str = Query("json", pattern="^(json|collapsed)$", description="json, or collapsed stacks"),
+):
+    """One captured request with its stack samples."""
+    require_admin(request)
+    captured = slow_requests.get(request_id)
+    if captured is None:
+        raise HTTPException(status_code=404, detail=f"No captured request {request_id}")
+    if format == "collapsed":
+        return PlainTextResponse(format_collapsed(captured.stacks))
+    return slow_request_to_response(captured, include_stacks=True)
+
+
+@app.delete("/admin/slow-requests")
+async def clear_slow_requests(request: Request):
+    require_admin(request)
+    slow_requests.clear()
+    return {"status": "ok"}
+
+
+@app.get("/pricing-policies/{tenant}")
+async def get_pricing_policy(tenant: str):
+    """Get the pricing policy that applies to a tenant."""
+    return pricing_policies.get(tenant).source.to_dict()
+
+
+@app.put("/pricing-policies/{tenant}")
+async def put_pricing_policy(tenant: str, policy: Dict[str, Any], request: Request):
+    """Compile and install a pricing policy for a tenant (admin only)."""
+    require_admin(request)
+    try:
+        compiled = pricing_policies.set(tenant, PricingPolicy.from_dict(policy))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid pricing policy: {e}")
+    return compiled.source.to_dict()
+
+
+@app.delete("/pricing-policies/{tenant}")
+async def delete_pricing_policy(tenant: str, request: Request):
+    """Revert a tenant to the default pricing policy (admin only)."""
+    require_admin(request)
+    pricing_policies.remove(tenant)
+    return {"status": "ok"}
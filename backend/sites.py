@@ -0,0 +1,253 @@
+"""
+Registered buyer sites with materialized per-seller quote tables.
+
+A site is geocoded once at registration. For each site we keep every
+seller's quantity-independent quote components (distance, mode, cost and
+offer per ton, EAF factor) and the winning seller per volume tier. A quote
+for a registered site is then a tier lookup plus a scale by quantity, and a
+seller change only recomputes that seller's row in each site's table.
+"""
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union, TYPE_CHECKING
+
+from .models import Seller, SellerRows, Point, Bid, BidSet, TRANSPORT_MODES
+from .policy import CompiledPolicy, DEFAULT_COMPILED_POLICY
+from .pricing import SellerColumns, price_columns
+from .seller_book import SellerBook
+
+if TYPE_CHECKING:
+    from .routing import TransportNetwork
+
+
+@dataclass(frozen=True)
+class BuyerSite:
+    site_id: str
+    location: Point
+    address: Optional[str] = None
+
+
+@dataclass
+class SiteQuoteTable:
+    """
+    Quantity-independent quote components of every seller for one site.
+
+    effective_price is offer_price_per_ton * (1 - eaf_factor): the net price
+    per ton before the volume discount, which is shared by all sellers.
+    """
+    site: BuyerSite
+    distance_km: "array[float]" = field(default_factory=lambda: array("d"))
+    mode_codes: "array[int]" = field(default_factory=lambda: array("b"))
+    cost_per_ton: "array[float]" = field(default_factory=lambda: array("d"))
+    offer_price_per_ton: "array[float]" = field(default_factory=lambda: array("d"))
+    eaf_factor: "array[float]" = field(default_factory=lambda: array("d"))
+    is_eaf: "array[int]" = field(default_factory=lambda: array("b"))
+    effective_price: "array[float]" = field(default_factory=lambda: array("d"))
+    tier_winners: List[int] = field(default_factory=list)   # seller index per volume tier
+
+
+class SiteRegistry:
+    """
+    Registered sites and their materialized quote tables over the sellers of
+    one SellerBook. The registry reads the book's seller list rather than
+    keeping its own copy: change sellers through the book, then call
+    update_seller / add_seller / remove_seller to bring the tables up to date.
+    """
+    def __init__(
+        self,
+        sellers: Union[SellerBook, Sequence[Seller]],
+        network: Optional["TransportNetwork"] = None,
+        policy: CompiledPolicy = DEFAULT_COMPILED_POLICY,
+    ):
+        self.book = sellers if isinstance(sellers, SellerBook) else SellerBook(sellers)
+        self.network = network
+        self.policy = policy
+        self._tables: Dict[str, SiteQuoteTable] = {}
+
+    @property
+    def sellers(self) -> Sequence[Seller]:
+        return self.book.sellers
+
+    # ----- SITES -----
+
+    def register(self, site_id: str, location: Point, address: Optional[str] = None) -> BuyerSite:
+        """Register (or re-register) a site and materialize its quote table."""
+        site = BuyerSite(site_id=site_id, location=location, address=address)
+        table = SiteQuoteTable(site=site)
+        if self.sellers:
+            if isinstance(self.sellers, SellerRows):
+                cols = SellerColumns.from_rows(self.sellers)
+            else:
+                cols = SellerColumns.from_sellers(self.sellers)
+            self._fill_rows(table, cols)
+        self._reselect_winners(table)
+        self._tables[site_id] = table
+        return site
+
+    def unregister(self, site_id: str) -> None:
+        del self._tables[site_id]
+
+    def get(self, site_id: str) -> BuyerSite:
+        return self._tables[site_id].site
+
+    def table(self, site_id: str) -> SiteQuoteTable:
+        return self._tables[site_id]
+
+    def sites(self) -> List[BuyerSite]:
+        return [t.site for t in self._tables.values()]
+
+    def __contains__(self, site_id: str) -> bool:
+        return site_id in self._tables
+
+    # ----- QUOTES -----
+
+    def quote(self, site_id: str, quantity_tons: float) -> Bid:
+        """Winning bid for a registered site: tier lookup plus a scale by quantity."""
+        table = self._tables[site_id]
+        if not self.sellers:
+            raise ValueError("Cannot run an auction with no sellers")
+        tier = bisect_left(self.policy.volume_bounds, quantity_tons)
+        return self._bid(table, table.tier_winners[tier], quantity_tons)
+
+    def bids(self, site_id: str, quantity_tons: float) -> BidSet:
+        """All bids for a registered site, computed from the table (no geometry)."""
+        table = self._tables[site_id]
+        policy = self.policy
+        volume_pct = policy.volume_discount_pct(quantity_tons)
+        out = BidSet.empty(quantity_tons, volume_pct)
+        out.sellers = list(self.sellers)
+        out.mode_codes.extend(table.mode_codes)
+        out.distance_km.extend(table.distance_km)
+        out.cost_per_ton.extend(table.cost_per_ton)
+        out.offer_price_per_ton.extend(table.offer_price_per_ton)
+        for i, seller in enumerate(self.sellers):
+            parts = self._totals(table, i, quantity_tons, volume_pct)
+            out.risk_buffer_per_ton.append(seller.risk_buffer())
+            out.gross_total_undiscounted.append(parts[0])
+            out.volume_discount_total.append(parts[1])
+            out.gross_total.append(parts[2])
+            out.eaf_discount_total.append(parts[3])
+            out.net_price_per_ton.append(parts[4] / quantity_tons)
+            out.net_total.append(parts[4])
+        return out
+
+    def _totals(self, table: SiteQuoteTable, i: int, quantity_tons: float, volume_pct: float):
+        # Same order of operations as pricing.price_columns
+        gross0 = table.offer_price_per_ton[i] * quantity_tons
+        e = table.eaf_factor[i]
+        if self.policy.eaf_before_volume:
+            eaf = e * gross0
+            volume = (gross0 - eaf) * volume_pct
+            gross = gross0 - volume
+        else:
+            volume = gross0 * volume_pct
+            gross = gross0 - volume
+            eaf = e * gross if self.sellers[i].is_eaf else 0.0
+        return gross0, volume, gross, eaf, gross - eaf
+
+    def _bid(self, table: SiteQuoteTable, i: int, quantity_tons: float) -> Bid:
+        seller = self.sellers[i]
+        volume_pct = self.policy.volume_discount_pct(quantity_tons)
+        gross0, volume, gross, eaf, net = self._totals(table, i, quantity_tons, volume_pct)
+        return Bid(
+            seller=seller,
+            distance_km=table.distance_km[i],
+            transport_mode=TRANSPORT_MODES[table.mode_codes[i]],
+            cost_per_ton=table.cost_per_ton[i],
+            risk_buffer_per_ton=seller.risk_buffer(),
+            offer_price_per_ton=table.offer_price_per_ton[i],
+            gross_total_undiscounted=gross0,
+            volume_discount_pct=volume_pct,
+            volume_discount_total=volume,
+            gross_total=gross,
+            is_eaf=seller.is_eaf,
+            eaf_discount_total=eaf,
+            net_price_per_ton=net / quantity_tons,
+            net_total=net,
+            quantity_tons=quantity_tons,
+        )
+
+    # ----- INCREMENTAL MAINTENANCE -----
+
+    def update_seller(self, index: int) -> None:
+        """Recompute only seller `index`'s row in every site table, after SellerBook.update."""
+        cols = SellerColumns.from_sellers([self.sellers[index]])
+        for table in self._tables.values():
+            old = table.effective_price[index]
+            self._write_row(table, index, cols)
+            if index in table.tier_winners and table.effective_price[index] > old:
+                # A winner got more expensive: someone else may now win
+                self._reselect_winners(table)
+            else:
+                self._take_winner(table, index)
+
+    def add_seller(self) -> None:
+        """Append the last seller's row to every site table, after SellerBook.add."""
+        index = len(self.sellers) - 1
+        cols = SellerColumns.from_sellers([self.sellers[index]])
+        for table in self._tables.values():
+            self._append_row(table, cols)
+            self._take_winner(table, index)
+
+    def remove_seller(self, index: int) -> None:
+        """Drop seller `index`'s row from every site table, after SellerBook.remove."""
+        for table in self._tables.values():
+            for col in (
+                table.distance_km, table.mode_codes, table.cost_per_ton,
+                table.offer_price_per_ton, table.eaf_factor, table.is_eaf, table.effective_price,
+            ):
+                del col[index]
+            self._reselect_winners(table)
+
+    def _take_winner(self, table: SiteQuoteTable, index: int) -> None:
+        """Let seller `index` take every tier it now beats (ties go to the lower index)."""
+        price = table.effective_price
+        for t, w in enumerate(table.tier_winners):
+            if price[index] < price[w] or (price[index] == price[w] and index < w):
+                table.tier_winners[t] = index
+        if not table.tier_winners:
+            self._reselect_winners(table)
+
+    def _reselect_winners(self, table: SiteQuoteTable) -> None:
+        """Full rescan, only needed when a tier winner got more expensive or was removed."""
+        if not len(table.effective_price):
+            table.tier_winners = []
+            return
+        multipliers = [1.0 - pct for pct in self.policy.volume_pcts]
+        price = table.effective_price
+        table.tier_winners = [
+            min(range(len(price)), key=lambda i: price[i] * m) for m in multipliers
+        ]
+
+    def _fill_rows(self, table: SiteQuoteTable, cols: SellerColumns) -> None:
+        for col in (
+            table.distance_km, table.mode_codes, table.cost_per_ton,
+            table.offer_price_per_ton, table.eaf_factor, table.is_eaf, table.effective_price,
+        ):
+            del col[:]
+        self._append_row(table, cols)
+
+    def _append_row(self, table: SiteQuoteTable, cols: SellerColumns) -> None:
+        # Quantity 1 t: offer and cost per ton do not depend on quantity
+        priced = price_columns(cols, table.site.location, 1.0, self.network, cols.terms_for(self.policy))
+        eaf = cols.terms_for(self.policy).eaf_factor
+        table.distance_km.extend(priced.distance_km)
+        table.mode_codes.extend(priced.mode_codes)
+        table.cost_per_ton.extend(priced.cost_per_ton)
+        table.offer_price_per_ton.extend(priced.offer_price_per_ton)
+        table.eaf_factor.extend(eaf)
+        table.is_eaf.extend(bool(flag) for flag in cols.is_eaf)
+        table.effective_price.extend(o * (1.0 - e) for o, e in zip(priced.offer_price_per_ton, eaf))
+
+    def _write_row(self, table: SiteQuoteTable, index: int, cols: SellerColumns) -> None:
+        priced = price_columns(cols, table.site.location, 1.0, self.network, cols.terms_for(self.policy))
+        e = cols.terms_for(self.policy).eaf_factor[0]
+        table.distance_km[index] = priced.distance_km[0]
+        table.mode_codes[index] = priced.mode_codes[0]
+        table.cost_per_ton[index] = priced.cost_per_ton[0]
+        table.offer_price_per_ton[index] = priced.offer_price_per_ton[0]
+        table.eaf_factor[index] = e
+        table.is_eaf[index] = bool(cols.is_eaf[0])
+        table.effective_price[index] = priced.offer_price_per_ton[0] * (1.0 - e)
@@ -0,0 +1,413 @@
+"""
+Precompiled, memory-mapped snapshot of the seller book and address book.
+
+A snapshot file holds every column a worker needs at startup, already in
+binary form: seller fields plus the buyer-independent pricing columns of
+SellerColumns, the address book sorted by normalized address, the
+reverse-geocoding KD-tree over its distinct locations, and the GET /sellers
+body (plain and gzipped). Opening one is an mmap plus a header read. Columns
+are memoryviews over the mapping, names and addresses are decoded on access,
+and Seller / Point objects are only created for the rows a request touches.
+All workers opening the same file share its pages through the OS page cache.
+
+Layout: a header (magic, format version, byte order, row counts, snapshot
+id), a table of (offset, length) per section, then the sections in SECTIONS
+order, each 8-byte aligned. Numbers are in the compiling host's byte order;
+opening on a host with the other byte order is refused.
+"""
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .geoindex import PointIndex
+from .models import Point, Seller, SellerRows, SiteMatch
+from .pricing import SellerColumns
+from .seller_book import seller_to_dict
+
+
+MAGIC = b"HOTIRON\0"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sHcxQQ12s")     # magic, version, byte order, sellers, addresses, id
+_SECTION = struct.Struct("<QQ")             # offset, length in bytes
+PAGE_SIZE = mmap.PAGESIZE
+
+# (name, array typecode); "B" sections are raw bytes
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    # Sellers
+    ("seller_name_offsets", "q"),
+    ("seller_names", "B"),
+    ("lat", "d"),
+    ("lon", "d"),
+    ("msrp", "d"),
+    ("base_cost", "d"),
+    ("risk_aversion", "d"),
+    ("is_eaf", "b"),
+    ("lat_rad", "d"),
+    ("lon_rad", "d"),
+    ("cos_lat", "d"),
+    ("risk_buffer", "d"),
+    # Address book, sorted by normalized address
+    ("address_offsets", "q"),
+    ("addresses", "B"),
+    ("address_lat", "d"),
+    ("address_lon", "d"),
+    # Distinct address locations and their KD-tree (see geoindex.PointIndex)
+    ("site_address", "q"),          # index of each location's first address
+    ("site_lat", "d"),
+    ("site_lon", "d"),
+    ("site_x", "d"),
+    ("site_y", "d"),
+    ("site_z", "d"),
+    ("site_order", "q"),
+    ("site_axis", "b"),
+    # Pre-serialized GET /sellers body
+    ("sellers_json", "B"),
+    ("sellers_json_gz", "B"),
+)
+
+
+def normalize_address(address: str) -> str:
+    """Lookup key of an address, as in StaticGeocoder.geocode."""
+    return address.strip().lower()
+
+
+class StringTable(Sequence[str]):
+    """
+    UTF-8 strings stored back to back, with n + 1 offsets; decoded on access.
+    Assigned entries are kept aside, so the (possibly mapped) blob is never
+    copied to change a few strings.
+    """
+    def __init__(self, offsets: Sequence[int], blob: Union[bytes, memoryview]):
+        self.offsets = offsets
+        self.blob = blob
+        self._replaced: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        if self._replaced and i in self._replaced:
+            return self._replaced[i]
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def copy(self) -> "StringTable":
+        """Shares the offsets and blob; only the replaced entries are copied."""
+        table = StringTable(self.offsets, self.blob)
+        table._replaced = dict(self._replaced)
+        return table
+
+    def __setitem__(self, i: int, value: str) -> None:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        self._replaced[i] = value
+
+    def __iter__(self) -> Iterator[str]:
+        # One copy of the blob and no per-item bounds checks: list(table) and
+        # full scans are several times faster than indexing one by one
+        blob, offsets, replaced = bytes(self.blob), self.offsets, self._replaced
+        for k in range(len(self)):
+            yield replaced[k] if k in replaced else str(blob[offsets[k]:offsets[k + 1]], "utf-8")
+
+
+class PointRows(Sequence[Point]):
+    """Points over lat / lon columns, created on access."""
+    def __init__(self, lat: Sequence[float], lon: Sequence[float]):
+        self.lat = lat
+        self.lon = lon
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __getitem__(self, i):  # type: ignore[override]
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return Point(self.lat[i], self.lon[i])
+
+
+def _string_table(strings: Iterable[str]) -> Tuple["array[int]", bytes]:
+    offsets, parts, end = array("q", [0]), [], 0
+    for s in strings:
+        encoded = s.encode("utf-8")
+        parts.append(encoded)
+        end += len(encoded)
+        offsets.append(end)
+    return offsets, b"".join(parts)
+
+
+# ---------- COMPILE ----------
+
+@dataclass
+class SnapshotInfo:
+    path: str
+    snapshot_id: str
+    sellers: int
+    addresses: int
+    bytes: int
+
+
+def write_snapshot(
+    path: str,
+    sellers: Union[Sequence[Seller], SellerRows],
+    addresses: Iterable[Tuple[str, Point]],
+) -> SnapshotInfo:
+    """
+    Compile a seller list and an address book into a snapshot file.
+
+    Args:
+        path: Output file; written to a temporary file and renamed into place
+        sellers: Seller list, or SellerRows (e.g. from read_sellers_jsonl)
+        addresses: (address, Point) pairs; later duplicates of an address are ignored
+
+    Returns:
+        SnapshotInfo with the snapshot id, row counts and file size
+    """
+    rows = sellers if isinstance(sellers, SellerRows) else SellerRows.from_sellers(list(sellers))
+    cols = SellerColumns.from_rows(rows)
+    name_offsets, names = _string_table(rows.names)
+
+    # Address book: first occurrence of each normalized address wins; each
+    # distinct location is named by the first address that has it
+    book: Dict[str, Point] = {}
+    for address, point in addresses:
+        book.setdefault(normalize_address(address), point)
+    first_at: Dict[Point, str] = {}
+    for key, point in book.items():
+        first_at.setdefault(point, key)
+    keys = sorted(book)
+    position = {key: i for i, key in enumerate(keys)}
+    address_offsets, address_blob = _string_table(keys)
+    sites = list(first_at)
+    index = PointIndex(sites)
+
+    body = json.dumps([seller_to_dict(s) for s in rows], separators=(",", ":")).encode()
+    columns: Dict[str, Union[bytes, array]] = {
+        "seller_name_offsets": name_offsets,
+        "seller_names": names,
+        "lat": array("d", rows.lat),
+        "lon": array("d", rows.lon),
+        "msrp": array("d", rows.msrp),
+        "base_cost": array("d", rows.base_cost),
+        "risk_aversion": array("d", rows.risk_aversion),
+        "is_eaf": array("b", (1 if e else 0 for e in rows.is_eaf)),
+        "lat_rad": array("d", cols.lat_rad),
+        "lon_rad": array("d", cols.lon_rad),
+        "cos_lat": array("d", cols.cos_lat),
+        "risk_buffer": array("d", cols.risk_buffer),
+        "address_offsets": address_offsets,
+        "addresses": address_blob,
+        "address_lat": array("d", (book[k].lat for k in keys)),
+        "address_lon": array("d", (book[k].lon for k in keys)),
+        "site_address": array("q", (position[first_at[p]] for p in sites)),
+        "site_lat": array("d", (p.lat for p in sites)),
+        "site_lon": array("d", (p.lon for p in sites)),
+        "site_x": array("d", index.coords[0]),
+        "site_y": array("d", index.coords[1]),
+        "site_z": array("d", index.coords[2]),
+        "site_order": array("q", index.order),
+        "site_axis": array("b", index.axis),
+        "sellers_json": body,
+        "sellers_json_gz": gzip.compress(body, compresslevel=6),
+    }
+    payloads = [c if isinstance(c, bytes) else c.tobytes() for c in (columns[name] for name, _ in SECTIONS)]
+    digest = hashlib.sha256()
+    for payload in payloads:
+        digest.update(struct.pack("<Q", len(payload)))
+        digest.update(payload)
+    snapshot_id = digest.hexdigest()[:12]
+
+    offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table = []
+    for payload in payloads:
+        offset += -offset % 8
+        table.append((offset, len(payload)))
+        offset += len(payload)
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, b"<" if sys.byteorder == "little" else b">",
+            len(rows), len(keys), snapshot_id.encode(),
+        ))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+        for (start, _), payload in zip(table, payloads):
+            f.write(b"\0" * (start - f.tell()))
+            f.write(payload)
+        size = f.tell()
+    os.replace(tmp, path)
+    return SnapshotInfo(path=path, snapshot_id=snapshot_id, sellers=len(rows), addresses=len(keys), bytes=size)
+
+
+# ---------- OPEN ----------
+
+class Snapshot:
+    """
+    A mapped snapshot file. Nothing is parsed or copied on open; accessors
+    return views over the mapping.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if len(view) < _HEADER.size:
+            raise ValueError(f"{path}: not a Hot Iron snapshot")
+        magic, version, byte_order, n_sellers, n_addresses, snapshot_id = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a Hot Iron snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path}: snapshot format {version}, expected {FORMAT_VERSION}; recompile it")
+        if byte_order != (b"<" if sys.byteorder == "little" else b">"):
+            raise ValueError(f"{path}: snapshot was compiled on a host with the other byte order; recompile it")
+        self.snapshot_id: str = snapshot_id.decode()
+        self.n_sellers: int = n_sellers
+        self.n_addresses: int = n_addresses
+        self._sections: Dict[str, memoryview] = {}
+        for k, (name, typecode) in enumerate(SECTIONS):
+            start, length = _SECTION.unpack_from(view, _HEADER.size + k * _SECTION.size)
+            if start + length > len(view):
+                raise ValueError(f"{path}: truncated snapshot (section {name})")
+            section = view[start:start + length]
+            self._sections[name] = section if typecode == "B" else section.cast(typecode)
+
+    @classmethod
+    def open(cls, path: str) -> "Snapshot":
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self._mm)
+
+    def section(self, name: str) -> memoryview:
+        return self._sections[name]
+
+    # ----- SELLERS -----
+
+    def seller_rows(self) -> SellerRows:
+        """Lazy Seller sequence over the mapped columns."""
+        s = self._sections
+        return SellerRows(
+            StringTable(s["seller_name_offsets"], s["seller_names"]),
+            s["lat"], s["lon"], s["msrp"], s["base_cost"], s["risk_aversion"], s["is_eaf"],
+        )
+
+    def seller_columns(self, rows: Optional[SellerRows] = None) -> SellerColumns:
+        """Pricing columns over the mapped, precomputed seller terms."""
+        s = self._sections
+        return SellerColumns(
+            sellers=rows if rows is not None else self.seller_rows(),
+            lat_rad=s["lat_rad"],
+            lon_rad=s["lon_rad"],
+            cos_lat=s["cos_lat"],
+            base_cost=s["base_cost"],
+            risk_buffer=s["risk_buffer"],
+            risk_aversion=s["risk_aversion"],
+            is_eaf=s["is_eaf"],
+        )
+
+    def sellers_json(self) -> Tuple[memoryview, memoryview]:
+        """GET /sellers body as compiled: (JSON, gzipped JSON)."""
+        return self._sections["sellers_json"], self._sections["sellers_json_gz"]
+
+    # ----- ADDRESSES -----
+
+    def geocoder(self) -> "SnapshotGeocoder":
+        return SnapshotGeocoder(self)
+
+    # ----- WARM-UP -----
+
+    def warm(self) -> int:
+        """Fault every page of the mapping into memory; returns bytes touched."""
+        mm = self._mm
+        if hasattr(mmap, "MADV_WILLNEED"):
+            try:
+                mm.madvise(mmap.MADV_WILLNEED)
+            except OSError:
+                pass
+        for offset in range(0, len(mm), PAGE_SIZE):
+            mm[offset]
+        return len(mm)
+
+
+class SnapshotGeocoder:
+    """
+    Geocoder over a snapshot's address book: binary search on the sorted
+    addresses, and the precompiled KD-tree for reverse geocoding.
+    """
+    def __init__(self, snapshot: Snapshot):
+        s = snapshot._sections
+        self._addresses = StringTable(s["address_offsets"], s["addresses"])
+        self._lat, self._lon = s["address_lat"], s["address_lon"]
+        self._site_address = s["site_address"]
+        self._site_index = PointIndex.prebuilt(
+            PointRows(s["site_lat"], s["site_lon"]),
+            (s["site_x"], s["site_y"], s["site_z"]),
+            s["site_order"],
+            s["site_axis"],
+        )
+
+    def __len__(self) -> int:
+        return len(self._addresses)
+
+    def _find(self, key: str) -> Optional[int]:
+        i = bisect_left(self._addresses, key)
+        if i < len(self._addresses) and self._addresses[i] == key:
+            return i
+        return None
+
+    def geocode(self, address: str) -> Point:
+        i = self._find(normalize_address(address))
+        if i is None:
+            raise KeyError(
+                f"Unknown address in snapshot: {address!r}. "
+                f"Known keys include: {self._addresses[:5]}"
+            )
+        return Point(self._lat[i], self._lon[i])
+
+    def geocode_many(self, addresses: Sequence[str]) -> Dict[str, Point]:
+        """{normalized address: Point} for the addresses in the book; unknown ones are left out."""
+        out = {}
+        for address in addresses:
+            key = normalize_address(address)
+            i = self._find(key)
+            if i is not None:
+                out[key] = Point(self._lat[i], self._lon[i])
+        return out
+
+    def geocode_from_coords(self, lat: float, lon: float) -> Point:
+        return Point(lat=lat, lon=lon)
+
+    def reverse_geocode(self, lat: float, lon: float, max_km: float) -> Optional[SiteMatch]:
+        """Nearest address-book site within `max_km` of (lat, lon), or None."""
+        found = self._site_index.nearest(Point(lat=lat, lon=lon), max_km)
+        if found is None:
+            return None
+        i, distance_km = found
+        return SiteMatch(self._addresses[self._site_address[i]], self._site_index.points[i], distance_km)
+
+
+def read_addresses_jsonl(f) -> List[Tuple[str, Point]]:
+    """(address, Point) pairs from JSONL lines with "address" (or "site_id"), "lat" and "lon"."""
+    out = []
+    for line in f:
+        if not line.strip():
+            continue
+        row = json.loads(line)
+        out.append((row.get("address") or row["site_id"], Point(float(row["lat"]), float(row["lon"]))))
+    return out
@@ -0,0 +1,203 @@
+"""
+Seeded synthetic seller and buyer-site universes for scale testing.
+
+Sellers are clustered around the steelmaking regions of the default seller
+book and buyer sites around demand hubs, with the EAF mix and parameter
+ranges of make_default_sellers. Rows are generated a fixed-size chunk at a
+time straight into typed arrays (no Seller objects), either collected into
+in-memory columns or streamed to JSONL files in the GET /sellers shape.
+The same seed always gives the same universe, in memory or on disk.
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Sequence, TextIO, Tuple
+import json
+import math
+import random
+
+from .models import SellerRows, IndexedNames
+from .pricing import SellerColumns
+
+
+CHUNK_ROWS = 65_536     # rows per seeded chunk; part of the seed contract, do not change
+
+# (lat, lon, weight): regions of the default sellers, weighted by rough capacity
+SELLER_REGIONS: Tuple[Tuple[float, float, float], ...] = (
+    (35.2271, -80.8431, 1.0),   # US Southeast
+    (40.4406, -79.9959, 1.0),   # US Rust Belt
+    (41.4993, -81.6944, 0.8),   # Great Lakes
+    (49.6117, 6.1319, 0.8),     # Benelux
+    (51.4352, 6.7627, 1.0),     # Ruhr
+    (35.6762, 139.6503, 1.2),   # Japan
+    (36.0190, 129.3435, 1.0),   # Korea
+    (31.2304, 121.4737, 3.0),   # Eastern China
+    (22.6400, 120.3000, 0.6),   # Taiwan
+    (22.8046, 86.2029, 1.2),    # Eastern India
+    (15.3490, 74.1230, 1.0),    # Southern India
+)
+
+# (lat, lon, weight): where steel buyers are
+DEMAND_HUBS: Tuple[Tuple[float, float, float], ...] = (
+    (41.8781, -87.6298, 2.0),   # Chicago
+    (40.4406, -79.9959, 1.0),   # Pittsburgh
+    (42.3314, -83.0458, 1.5),   # Detroit
+    (29.7604, -95.3698, 1.5),   # Houston
+    (34.0522, -118.2437, 1.2),  # Los Angeles
+    (40.7128, -74.0060, 1.0),   # New York
+    (33.7490, -84.3880, 0.8),   # Atlanta
+    (19.4326, -99.1332, 0.8),   # Mexico City
+    (51.9244, 4.4777, 1.0),     # Rotterdam
+    (48.1351, 11.5820, 0.8),    # Munich
+)
+
+SELLER_SPREAD_DEG = 2.0
+SITE_SPREAD_DEG = 1.0
+DEFAULT_EAF_SHARE = 6 / 11      # as in make_default_sellers
+
+
+@dataclass
+class SiteColumns:
+    """Buyer sites as columns; site ids are "<prefix><index>"."""
+    site_ids: Sequence[str]
+    lat: "array[float]"
+    lon: "array[float]"
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+
+def _chunk_rng(seed: int, stream: int, chunk: int) -> random.Random:
+    return random.Random(f"{seed}:{stream}:{chunk}")
+
+
+def _clustered(rng: random.Random, centers, n: int, spread_deg: float) -> Tuple[List[float], List[float]]:
+    picks = rng.choices(centers, weights=[w for _, _, w in centers], k=n)
+    u = rng.random
+    log, sqrt, sin, cos, radians = math.log, math.sqrt, math.sin, math.cos, math.radians
+    tau = 2.0 * math.pi
+    lats, lons = [], []
+    for clat, clon, _ in picks:
+        # Box-Muller: one pair of normal offsets (lat, lon) per row
+        r = spread_deg * sqrt(-2.0 * log(1.0 - u()))
+        a = tau * u()
+        lat = clat + r * cos(a)
+        if lat > 89.0:
+            lat = 89.0
+        elif lat < -89.0:
+            lat = -89.0
+        c = cos(radians(lat))
+        lon = clon + r * sin(a) / (c if c > 0.1 else 0.1)
+        lats.append(lat)
+        lons.append((lon + 180.0) % 360.0 - 180.0)
+    return lats, lons
+
+
+def _seller_chunks(
+    n: int, seed: int, eaf_share: float,
+) -> Iterator[Tuple[List[float], List[float], List[float], List[float], List[float], List[int]]]:
+    """
+    (lat, lon, msrp, base_cost, risk_aversion, is_eaf) per chunk. Ranges follow
+    make_default_sellers: EAF sellers at msrp 1000 with base cost 770-810 and
+    risk aversion 1.18-1.32; others with base cost 660-780, a 35-60 $/t
+    margin and risk aversion 1.25-1.37.
+    """
+    for k, start in enumerate(range(0, n, CHUNK_ROWS)):
+        m = min(CHUNK_ROWS, n - start)
+        rng = _chunk_rng(seed, 0, k)
+        lats, lons = _clustered(rng, SELLER_REGIONS, m, SELLER_SPREAD_DEG)
+        u = rng.random
+        is_eaf = [1 if u() < eaf_share else 0 for _ in range(m)]
+        base_cost = [770.0 + 40.0 * u() if e else 660.0 + 120.0 * u() for e in is_eaf]
+        msrp = [1000.0 if e else b + 35.0 + 25.0 * u() for e, b in zip(is_eaf, base_cost)]
+        risk = [1.18 + 0.14 * u() if e else 1.25 + 0.12 * u() for e in is_eaf]
+        yield lats, lons, msrp, base_cost, risk, is_eaf
+
+
+def _site_chunks(m: int, seed: int) -> Iterator[Tuple[List[float], List[float]]]:
+    for k, start in enumerate(range(0, m, CHUNK_ROWS)):
+        rng = _chunk_rng(seed, 1, k)
+        yield _clustered(rng, DEMAND_HUBS, min(CHUNK_ROWS, m - start), SITE_SPREAD_DEG)
+
+
+# ---------- IN MEMORY ----------
+
+def generate_seller_rows(
+    n: int, seed: int = 0, eaf_share: float = DEFAULT_EAF_SHARE, name_prefix: str = "Mill-",
+) -> SellerRows:
+    """N synthetic sellers as a lazy SellerRows over typed arrays."""
+    lat, lon, msrp, base, risk = (array("d") for _ in range(5))
+    is_eaf = array("b")
+    for chunk in _seller_chunks(n, seed, eaf_share):
+        for col, values in zip((lat, lon, msrp, base, risk, is_eaf), chunk):
+            col.extend(values)
+    return SellerRows(IndexedNames(name_prefix, n), lat, lon, msrp, base, risk, is_eaf)
+
+
+def generate_sellers(
+    n: int, seed: int = 0, eaf_share: float = DEFAULT_EAF_SHARE, name_prefix: str = "Mill-",
+) -> SellerColumns:
+    """N synthetic sellers as pricing columns, ready for price_columns / price_batch."""
+    return SellerColumns.from_rows(generate_seller_rows(n, seed, eaf_share, name_prefix))
+
+
+def generate_sites(m: int, seed: int = 0, id_prefix: str = "site-") -> SiteColumns:
+    """M synthetic buyer sites clustered around DEMAND_HUBS."""
+    lat, lon = array("d"), array("d")
+    for lats, lons in _site_chunks(m, seed):
+        lat.extend(lats)
+        lon.extend(lons)
+    return SiteColumns(IndexedNames(id_prefix, m), lat, lon)
+
+
+# ---------- ON DISK ----------
+
+def write_sellers_jsonl(
+    f: TextIO, n: int, seed: int = 0, eaf_share: float = DEFAULT_EAF_SHARE, name_prefix: str = "Mill-",
+) -> int:
+    """Stream N synthetic sellers to `f` as JSONL (seller_book.seller_to_dict shape)."""
+    names = IndexedNames(name_prefix, n)
+    i = 0
+    for lats, lons, msrp, base, risk, is_eaf in _seller_chunks(n, seed, eaf_share):
+        lines = []
+        for lat, lon, m, b, r, e in zip(lats, lons, msrp, base, risk, is_eaf):
+            lines.append(
+                f'{{"name":{json.dumps(names[i])},"location":{{"lat":{lat!r},"lon":{lon!r}}},'
+                f'"msrp":{m!r},"base_cost":{b!r},"risk_aversion":{r!r},"is_eaf":{"true" if e else "false"}}}\n'
+            )
+            i += 1
+        f.writelines(lines)
+    return i
+
+
+def write_sites_jsonl(f: TextIO, m: int, seed: int = 0, id_prefix: str = "site-") -> int:
+    """Stream M synthetic buyer sites to `f` as JSONL ({"site_id", "lat", "lon"})."""
+    ids = IndexedNames(id_prefix, m)
+    i = 0
+    for lats, lons in _site_chunks(m, seed):
+        lines = []
+        for lat, lon in zip(lats, lons):
+            lines.append(f'{{"site_id":{json.dumps(ids[i])},"lat":{lat!r},"lon":{lon!r}}}\n')
+            i += 1
+        f.writelines(lines)
+    return i
+
+
+def read_sellers_jsonl(f: TextIO) -> SellerColumns:
+    """Load a seller JSONL file into pricing columns without creating Seller objects."""
+    names: List[str] = []
+    lat, lon, msrp, base, risk = (array("d") for _ in range(5))
+    is_eaf = array("b")
+    loads = json.loads
+    for line in f:
+        if not line.strip():
+            continue
+        row: Dict = loads(line)
+        names.append(row["name"])
+        lat.append(row["location"]["lat"])
+        lon.append(row["location"]["lon"])
+        msrp.append(row["msrp"])
+        base.append(row["base_cost"])
+        risk.append(row["risk_aversion"])
+        is_eaf.append(1 if row["is_eaf"] else 0)
+    return SellerColumns.from_rows(SellerRows(names, lat, lon, msrp, base, risk, is_eaf))
@@ -0,0 +1,43 @@
+"""
+Micro-batching: batched prices match one-at-a-time pricing, and batches are
+priced off the event loop.
+"""
+import asyncio
+import threading
+
+from backend import server
+from backend.models import Point, make_default_sellers
+from backend.policy import DEFAULT_COMPILED_POLICY
+from backend.pricing import SellerColumns, price_batch, price_columns
+
+CHICAGO = Point(41.88, -87.63)
+PITTSBURGH = Point(40.44, -79.99)
+
+
+def test_batch_with_repeated_locations_matches_single_requests():
+    cols = SellerColumns.from_sellers(make_default_sellers())
+    requests = [(CHICAGO, 500.0), (PITTSBURGH, 50.0), (CHICAGO, 5000.0), (CHICAGO, 500.0)]
+    for (location, quantity), (winner, bids) in zip(requests, price_batch(cols, requests)):
+        single = price_columns(cols, location, quantity, None, cols.terms_for(DEFAULT_COMPILED_POLICY))
+        assert list(bids.net_total) == list(single.net_total)
+        assert winner.seller.name == single.winner.seller.name
+
+
+def test_batcher_prices_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def recording_price_batch(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return price_batch(*args, **kwargs)
+
+    monkeypatch.setattr(server, "price_batch", recording_price_batch)
+    batcher = server.AuctionBatcher(make_default_sellers, window_ms=1)
+
+    async def main():
+        return threading.get_ident(), await asyncio.gather(
+            batcher.submit(CHICAGO, 500.0), batcher.submit(PITTSBURGH, 800.0),
+        )
+
+    loop_thread, results = asyncio.run(main())
+    assert len(threads) == 1 and threads[0] != loop_thread
+    assert [winner.quantity_tons for winner, _ in results] == [500.0, 800.0]
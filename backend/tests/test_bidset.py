@@ -0,0 +1,52 @@
+"""
+BidSet keeps the list interface run_reverse_auction returned before it.
+"""
+import pytest
+
+from backend.auction import run_reverse_auction
+from backend.models import Point, make_default_sellers
+from backend.pricing import SellerColumns, price_columns
+
+CHICAGO = Point(41.88, -87.63)
+
+
+def _auction(quantity_tons: float = 500.0):
+    return run_reverse_auction(make_default_sellers(), CHICAGO, quantity_tons)[1]
+
+
+@pytest.mark.parametrize("op", [
+    lambda bids, ref: bids.sort(key=lambda b: b.distance_km, reverse=True),
+    lambda bids, ref: bids.reverse(),
+    lambda bids, ref: bids.append(ref[0]),
+    lambda bids, ref: bids.insert(1, ref[2]),
+    lambda bids, ref: bids.pop(0),
+    lambda bids, ref: bids.remove(ref[3]),
+    lambda bids, ref: bids.__delitem__(slice(0, 2)),
+    lambda bids, ref: bids.__setitem__(0, ref[4]),
+    lambda bids, ref: bids.__setitem__(slice(1, 3), [ref[5]]),
+    lambda bids, ref: bids.extend(ref[:3]),
+])
+def test_list_methods_match_a_list(op):
+    bids = _auction()
+    ref = list(bids)
+    expected = list(ref)
+    op(bids, ref)
+    op(expected, ref)
+    assert bids == expected
+    assert bids.winner == min(expected, key=lambda b: b.net_price_per_ton)
+    assert bids + ref[:1] == expected + ref[:1]
+
+
+def test_changes_do_not_reach_the_priced_columns():
+    sellers = make_default_sellers()
+    cols = SellerColumns.from_sellers(sellers)
+    bids = price_columns(cols, CHICAGO, 500.0)
+    bids.sort(key=lambda b: b.seller.name)
+    del bids[0]
+    assert list(cols.sellers) == sellers
+
+
+def test_bids_for_another_quantity_are_rejected():
+    bids = _auction(500.0)
+    with pytest.raises(ValueError):
+        bids.append(_auction(5000.0)[0])
@@ -0,0 +1,45 @@
+"""
+Anytime auctions: time spent building columns counts against deadline_ms.
+"""
+import time
+
+from backend import auction, query
+from backend.models import Point, make_default_sellers
+from backend.pricing import SellerColumns
+
+CHICAGO = Point(41.88, -87.63)
+
+
+def _record_budgets(monkeypatch, module):
+    budgets = []
+    price_columns_anytime = module.price_columns_anytime
+
+    def recording(cols, buyer_location, quantity_tons, deadline_ms, *args, **kwargs):
+        budgets.append(deadline_ms)
+        return price_columns_anytime(cols, buyer_location, quantity_tons, deadline_ms, *args, **kwargs)
+
+    monkeypatch.setattr(module, "price_columns_anytime", recording)
+    return budgets
+
+
+def test_column_building_uses_up_the_auction_budget(monkeypatch):
+    budgets = _record_budgets(monkeypatch, auction)
+    from_sellers = SellerColumns.from_sellers.__func__
+
+    def slow_from_sellers(cls, sellers):
+        time.sleep(0.05)
+        return from_sellers(cls, sellers)
+
+    monkeypatch.setattr(SellerColumns, "from_sellers", classmethod(slow_from_sellers))
+    winner, bids = auction.run_reverse_auction(make_default_sellers(), CHICAGO, 500.0, deadline_ms=20.0)
+    assert budgets == [0.0]
+    # Out of budget still returns the best bid of the first chunk
+    assert winner == bids.winner
+
+
+def test_bid_query_passes_on_the_remaining_budget(monkeypatch):
+    budgets = _record_budgets(monkeypatch, query)
+    partitions = query.SellerPartitions(make_default_sellers())
+    result = query.run_bid_query(partitions, CHICAGO, 500.0, query.BidQuery(), deadline_ms=1000.0)
+    assert len(budgets) == 1 and 0.0 < budgets[0] < 1000.0
+    assert result.winner is not None
@@ -0,0 +1,80 @@
+"""
+JobManager lifecycle: nothing starts before the first job, and cancel /
+delete are consistent with the runner picking jobs up.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+from backend.jobs import JobManager
+from backend.models import make_default_sellers
+
+GRID = {"locations": [[41.88, -87.63], [40.44, -79.99]], "quantities": [500]}
+
+
+def _wait(job, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+class GatedExecutor(ThreadPoolExecutor):
+    """Holds every chunk until `gate` is set, so a job stays running."""
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        self.entered.set()
+        self.gate.wait(10)
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_nothing_starts_before_the_first_job(tmp_path):
+    spool = tmp_path / "jobs"
+    manager = JobManager(str(spool), executor=ThreadPoolExecutor(max_workers=1))
+    assert not spool.exists()
+    assert manager._runners == []
+
+    job = manager.submit("grid", GRID, make_default_sellers())
+    _wait(job)
+    manager.close()
+    assert spool.exists()
+    assert job.status == "done"
+    assert manager.results(job.job_id)[0]["winner"]
+
+
+def test_job_cancelled_while_queued_never_runs(tmp_path):
+    executor = GatedExecutor()
+    manager = JobManager(str(tmp_path), executor=executor)
+    running = manager.submit("grid", GRID, make_default_sellers())
+    assert executor.entered.wait(10)
+    queued = manager.submit("grid", GRID, make_default_sellers())
+
+    manager.cancel(queued.job_id)
+    executor.gate.set()
+    _wait(running)
+    manager.close()
+    assert running.status == "done"
+    assert running.rows_written == 2
+    assert queued.status == "cancelled"
+    assert queued.started_at is None
+
+
+def test_delete_while_running_removes_the_spool_when_done(tmp_path):
+    executor = GatedExecutor()
+    manager = JobManager(str(tmp_path), executor=executor)
+    job = manager.submit("grid", GRID, make_default_sellers())
+    assert executor.entered.wait(10)
+
+    manager.delete(job.job_id)
+    assert job.status == "running"
+    executor.gate.set()
+    _wait(job)
+    manager.close()
+    assert job.status == "cancelled"
+    assert job.error is None
+    assert not os.path.exists(job.spool_path)
+    assert os.listdir(tmp_path) == []
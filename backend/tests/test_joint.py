@@ -0,0 +1,83 @@
+"""
+run_joint_auction against brute force over every site -> seller assignment,
+on instances small enough (fewer than 6 sites) to enumerate.
+"""
+from itertools import product
+import random
+
+import pytest
+
+from backend.joint import JointSite, run_joint_auction
+from backend.models import Point, Seller
+from backend.policy import DEFAULT_COMPILED_POLICY
+from backend.pricing import SellerColumns, price_columns
+
+
+def _instance(seed: int, n_sellers: int = 6, n_sites: int = 5):
+    rng = random.Random(seed)
+    sellers = [
+        Seller(
+            name=f"seller-{i}",
+            location=Point(rng.uniform(30, 45), rng.uniform(-110, -75)),
+            msrp=rng.uniform(700, 900),
+            base_cost=rng.uniform(450, 650),
+            risk_aversion=rng.uniform(1.0, 1.3),
+            is_eaf=rng.random() < 0.4,
+        )
+        for i in range(n_sellers)
+    ]
+    # Quantities around the volume tier bounds, so consolidating sites pays off
+    sites = [
+        JointSite(
+            site_id=f"site-{j}",
+            location=Point(rng.uniform(30, 45), rng.uniform(-110, -75)),
+            quantity_tons=rng.choice((400.0, 900.0, 1500.0, 2600.0, 4200.0, 7000.0)),
+        )
+        for j in range(n_sites)
+    ]
+    return sellers, sites
+
+
+def _brute_force(sellers, sites, policy=DEFAULT_COMPILED_POLICY) -> float:
+    """Lowest net total over all assignments, each seller discounted at its aggregated tonnage."""
+    cols = SellerColumns.from_sellers(sellers)
+    terms = cols.terms_for(policy)
+    # Net per site and seller before the volume discount
+    base = []
+    for site in sites:
+        priced = price_columns(cols, site.location, site.quantity_tons, None, terms)
+        base.append([g * (1.0 - e) for g, e in zip(priced.gross_total_undiscounted, terms.eaf_factor)])
+    best = float("inf")
+    for assign in product(range(len(sellers)), repeat=len(sites)):
+        volume, cost = {}, {}
+        for j, i in enumerate(assign):
+            volume[i] = volume.get(i, 0.0) + sites[j].quantity_tons
+            cost[i] = cost.get(i, 0.0) + base[j][i]
+        total = sum(c * (1.0 - policy.volume_discount_pct(volume[i])) for i, c in cost.items())
+        best = min(best, total)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("n_sites", [1, 3, 5])
+def test_exact_search_matches_brute_force(seed, n_sites):
+    sellers, sites = _instance(seed, n_sites=n_sites)
+    result = run_joint_auction(sellers, sites, deadline_ms=None, gap_tolerance=0.0)
+    optimum = _brute_force(sellers, sites)
+    assert result.exact
+    assert result.net_total == pytest.approx(optimum, rel=1e-9)
+    assert result.lower_bound <= result.net_total + 1e-6
+    assert sum(a.net_total for a in result.sellers) == pytest.approx(result.net_total, rel=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_default_search_is_bounded_by_the_optimum(seed):
+    sellers, sites = _instance(seed)
+    result = run_joint_auction(sellers, sites)
+    optimum = _brute_force(sellers, sites)
+    assert result.lower_bound <= optimum + 1e-6
+    assert result.lower_bound <= result.net_total + 1e-6
+    assert result.net_total >= optimum - 1e-6
+    assert result.net_total <= result.independent_net_total + 1e-6
+    if result.exact:
+        assert result.net_total == pytest.approx(optimum, rel=1e-9)
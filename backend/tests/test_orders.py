@@ -0,0 +1,48 @@
+"""
+Order store and /orders endpoints, on a database under pytest's tmp_path.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import server
+from backend.models import Point, make_default_sellers
+from backend.orders import Order, OrderStore
+from backend.pricing import SellerColumns, price_columns
+from backend.policy import DEFAULT_COMPILED_POLICY
+
+
+def _order(buyer: str) -> Order:
+    cols = SellerColumns.from_sellers(make_default_sellers())
+    bids = price_columns(cols, Point(41.88, -87.63), 500.0, None, cols.terms_for(DEFAULT_COMPILED_POLICY))
+    return Order.from_bid(bids.winner, buyer, 41.88, -87.63)
+
+
+def test_store_commits_queued_writes_before_closing(tmp_path):
+    store = OrderStore(str(tmp_path / "orders.sqlite3"))
+    created = [store.create(_order(f"buyer-{i}")) for i in range(20)]
+    store.close()
+    assert all(f.done() for f in created)
+
+    reopened = OrderStore(str(tmp_path / "orders.sqlite3"))
+    orders, _ = reopened.list(limit=100)
+    assert len(orders) == 20
+    reopened.close()
+
+
+def test_orders_endpoints_use_the_configured_database(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOT_IRON_ORDERS_DB", str(tmp_path / "orders.sqlite3"))
+    with TestClient(server.app) as client:
+        created = client.post("/orders", json={"buyer": "acme", "lat": 41.88, "lon": -87.63, "quantity_tons": 500})
+        assert created.status_code == 200
+        order_id = created.json()["order_id"]
+        assert client.get(f"/orders/{order_id}").json()["buyer"] == "acme"
+        patched = client.patch(f"/orders/{order_id}", json={"status": "Settled"})
+        assert patched.json()["status"] == "Settled"
+    assert server.order_store is None
+    assert (tmp_path / "orders.sqlite3").exists()
+
+
+def test_orders_endpoints_need_a_database(monkeypatch):
+    monkeypatch.delenv("HOT_IRON_ORDERS_DB", raising=False)
+    with TestClient(server.app) as client:
+        assert client.get("/orders").status_code == 409
@@ -0,0 +1,23 @@
+"""
+PolicyRegistry: replaced and removed tenant policies leave no cached terms behind.
+"""
+from backend.models import make_default_sellers
+from backend.policy import DEFAULT_POLICY, PolicyRegistry
+from backend.query import SellerPartitions
+
+
+def test_replaced_and_removed_policies_drop_their_terms():
+    partitions = SellerPartitions(make_default_sellers())
+    registry = PolicyRegistry()
+    registry.on_discard.append(partitions.discard_terms)
+
+    for _ in range(5):
+        policy = registry.set("acme", DEFAULT_POLICY)
+        partitions.all.terms_for(policy)
+        partitions.by_eaf(True).terms_for(policy)
+    assert list(partitions.all._terms) == [policy]
+    assert list(partitions.by_eaf(True)._terms) == [policy]
+
+    registry.remove("acme")
+    assert partitions.all._terms == {}
+    assert partitions.by_eaf(True)._terms == {}
@@ -0,0 +1,40 @@
+"""
+Auction history: tenants survive the JSONL round trip and scope replays.
+"""
+from backend.models import Point, make_default_sellers
+from backend.replay import AuctionHistory, replay_auctions
+
+CHICAGO = Point(41.88, -87.63)
+
+
+def test_window_keeps_only_the_given_tenants():
+    history = AuctionHistory()
+    history.record(CHICAGO, 500.0, ts=1.0)
+    history.record(CHICAGO, 800.0, "acme", ts=2.0)
+    history.record(CHICAGO, 900.0, "acme", ts=3.0)
+
+    assert list(history.window(tenants={None}).quantity_tons) == [500.0]
+    assert list(history.window(tenants={"acme"}).quantity_tons) == [800.0, 900.0]
+    assert list(history.window(since=2.5, tenants={"acme"}).quantity_tons) == [900.0]
+    assert history.window().tenant == [None, "acme", "acme"]
+
+
+def test_tenant_round_trips_through_the_history_file(tmp_path):
+    path = str(tmp_path / "history.jsonl")
+    history = AuctionHistory.open(path)
+    history.record(CHICAGO, 500.0, ts=1.0)
+    history.record(CHICAGO, 800.0, "acme", ts=2.0)
+    history.flush()
+
+    reloaded = AuctionHistory.open(path)
+    assert reloaded.tenant == [None, "acme"]
+    assert list(reloaded.quantity_tons) == [500.0, 800.0]
+
+
+def test_replay_counts_only_the_windowed_tenant():
+    history = AuctionHistory()
+    history.record(CHICAGO, 500.0, ts=1.0)
+    history.record(CHICAGO, 800.0, "acme", ts=2.0)
+    report = replay_auctions(history.window(tenants={"acme"}), make_default_sellers())
+    assert report.auctions == 1
+    assert report.winner_flips == 0
@@ -0,0 +1,53 @@
+"""
+Breakeven values from analyze_auction, checked by re-pricing the seller at
+its breakeven.
+"""
+from dataclasses import replace
+
+import pytest
+
+from backend.models import Point, RISK_AVERSION_RANGE, Seller, make_default_sellers
+from backend.policy import DEFAULT_COMPILED_POLICY
+from backend.pricing import SellerColumns, price_columns
+from backend.sensitivity import analyze_auction
+
+BUYER = Point(41.88, -87.63)
+QUANTITY = 500.0
+
+
+def _seller(name: str, risk_aversion: float, is_eaf: bool = False, base_cost: float = 500.0) -> Seller:
+    return Seller(
+        name=name, location=Point(40.0, -85.0), msrp=800.0, base_cost=base_cost,
+        risk_aversion=risk_aversion, is_eaf=is_eaf,
+    )
+
+
+def _net_price(sellers, i: int) -> float:
+    cols = SellerColumns.from_sellers(sellers)
+    bids = price_columns(cols, BUYER, QUANTITY, None, cols.terms_for(DEFAULT_COMPILED_POLICY))
+    return bids.net_price_per_ton[i]
+
+
+@pytest.mark.parametrize("is_eaf", [False, True])
+def test_breakeven_risk_aversion_reprices_to_target(is_eaf):
+    sellers = [_seller("winner", 1.1), _seller("loser", 1.4, is_eaf=is_eaf)]
+    loser = analyze_auction(sellers, BUYER, QUANTITY)[1]
+    r = loser.breakeven_risk_aversion
+    assert r is not None
+    assert RISK_AVERSION_RANGE[0] <= r <= RISK_AVERSION_RANGE[1]
+    repriced = [sellers[0], replace(sellers[1], risk_aversion=r)]
+    assert _net_price(repriced, 1) == pytest.approx(loser.target_net_price_per_ton, rel=1e-9)
+
+
+def test_breakeven_risk_aversion_outside_range_is_none():
+    # Even at the lowest allowed risk aversion the loser's cost keeps it above the winner
+    sellers = [_seller("winner", 1.0), _seller("loser", 1.2, base_cost=560.0)]
+    loser = analyze_auction(sellers, BUYER, QUANTITY)[1]
+    assert not loser.is_winner
+    assert loser.breakeven_risk_aversion is None
+
+
+def test_default_sellers_report_only_reachable_risk_aversion():
+    lo, hi = RISK_AVERSION_RANGE
+    for s in analyze_auction(make_default_sellers(), BUYER, QUANTITY):
+        assert s.breakeven_risk_aversion is None or lo <= s.breakeven_risk_aversion <= hi
@@ -0,0 +1,97 @@
+"""
+Per-request stage timings, reported in a Server-Timing response header.
+
+Endpoints wrap their stages in `with stage("price"):`. The middleware adds the
+total time spent in the app, so a load generator (or browser dev tools) can
+split client latency into server stages and time spent outside the app.
+Plain ASGI middleware: endpoints run in the middleware's context, so stages
+land in that request's record without any locking.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+import time
+
+
+_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("server_timing_stages", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the current request (no-op outside a timed request)."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages.append((name, (time.perf_counter() - started) * 1000.0))
+
+
+def format_server_timing(stages: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={ms:.3f}" for name, ms in stages)
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """{stage: ms} from a Server-Timing header; repeated stages are summed."""
+    out: Dict[str, float] = {}
+    for entry in header.split(","):
+        name, *params = [p.strip() for p in entry.split(";")]
+        if not name:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key == "dur":
+                try:
+                    out[name] = out.get(name, 0.0) + float(value)
+                except ValueError:
+                    pass
+    return out
+
+
+class ServerTimingMiddleware:
+    """
+    Adds `Server-Timing: <stage>;dur=<ms>, ..., app;dur=<ms>` to HTTP responses.
+
+    An optional observer (e.g. profiling.SlowRequestRecorder) gets
+    request_started(scope) -> token when a request arrives and
+    request_finished(token, status, stages, app_ms) when its response starts,
+    or when the app fails without starting one (status 500).
+    """
+    def __init__(self, app, observer=None):
+        self.app = app
+        self.observer = observer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stages: List[Tuple[str, float]] = []
+        token = _stages.set(stages)
+        observer = self.observer
+        observed = observer.request_started(scope) if observer is not None else None
+        finished = False
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            nonlocal finished
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - started) * 1000.0
+                timings = stages + [("app", app_ms)]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", format_server_timing(timings).encode("latin-1")))
+                message = {**message, "headers": headers}
+                if observer is not None and not finished:
+                    finished = True
+                    observer.request_finished(observed, message["status"], list(stages), app_ms)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _stages.reset(token)
+            if observer is not None and not finished:
+                observer.request_finished(observed, 500, list(stages), (time.perf_counter() - started) * 1000.0)
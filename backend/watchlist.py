@@ -0,0 +1,346 @@
+"""
+Price-alert watchlists over registered buyer sites.
+
+A watch asks to hear when the winning net price per ton at a registered
+site, for a given quantity (optionally among EAF sellers only), drops below a
+threshold, and again when it rises back to or above it.
+
+The winner's net price per ton is best_effective * (1 - volume_pct(q)), where
+best_effective is the lowest effective price in the site's quote table. So
+every watch on one (site, eaf_only) pair is decided by a single number, and a
+watch reduces to the key threshold / (1 - volume_pct(q)): it is triggered iff
+best_effective < key. Keys are kept sorted per (site, eaf_only). A seller
+change that does not move a site's best effective price costs O(1) for that
+site; one that moves it from old to new only re-evaluates the watches whose
+keys lie between old and new, found by bisection.
+"""
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from operator import itemgetter
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
+import time
+
+from .sites import SiteQuoteTable, SiteRegistry
+
+
+ALERT_KINDS = ("triggered", "cleared")
+
+
+@dataclass(frozen=True)
+class Watch:
+    watch_id: str
+    site_id: str
+    quantity_tons: float
+    threshold_per_ton: float        # alert when the net price per ton drops below this
+    eaf_only: bool = False
+    owner: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class WatchStatus:
+    watch: Watch
+    triggered: bool
+    net_price_per_ton: Optional[float]     # current winner's, None if no seller qualifies
+    seller_name: Optional[str]
+
+
+@dataclass(frozen=True)
+class PriceAlert:
+    seq: int
+    kind: str                       # "triggered" or "cleared"
+    watch_id: str
+    site_id: str
+    owner: Optional[str]
+    quantity_tons: float
+    threshold_per_ton: float
+    net_price_per_ton: Optional[float]
+    seller_name: Optional[str]
+    created_at: float               # unix time
+
+
+class AlertFeed:
+    """
+    Bounded log of alerts with increasing sequence numbers, so pollers and
+    reconnecting streams can pick up where they left off.
+    """
+    def __init__(self, max_alerts: int = 65536):
+        self._log: Deque[PriceAlert] = deque(maxlen=max_alerts)
+        self.last_seq = 0
+
+    def append(self, kind: str, watch: Watch, net_price_per_ton: Optional[float],
+               seller_name: Optional[str]) -> PriceAlert:
+        self.last_seq += 1
+        alert = PriceAlert(
+            seq=self.last_seq,
+            kind=kind,
+            watch_id=watch.watch_id,
+            site_id=watch.site_id,
+            owner=watch.owner,
+            quantity_tons=watch.quantity_tons,
+            threshold_per_ton=watch.threshold_per_ton,
+            net_price_per_ton=net_price_per_ton,
+            seller_name=seller_name,
+            created_at=time.time(),
+        )
+        self._log.append(alert)
+        return alert
+
+    def since(self, seq: int, owner: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[PriceAlert], bool]:
+        """
+        Alerts after `seq` (optionally only `owner`'s), oldest first, and
+        whether alerts after `seq` have already been dropped from the log.
+        """
+        if not self._log:
+            return [], False
+        first = self._log[0].seq
+        missed = seq < first - 1
+        tail = islice(self._log, max(0, seq + 1 - first), None)
+        if owner is not None:
+            tail = (a for a in tail if a.owner == owner)
+        return list(islice(tail, limit)), missed
+
+
+@dataclass
+class _ThresholdIndex:
+    """Watches on one (site, eaf_only) pair sorted by key, plus that pair's best seller."""
+    keys: List[float] = field(default_factory=list)
+    watch_ids: List[str] = field(default_factory=list)
+    best_index: int = -1
+    best_price: float = float("inf")
+
+    def add(self, key: float, watch_id: str) -> None:
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.watch_ids.insert(pos, watch_id)
+
+    def add_many(self, entries: Sequence[Tuple[float, str]]) -> None:
+        """
+        Add a batch of (key, watch_id) in one merge pass (a bisection per new
+        key, existing runs copied as slices) instead of one list insert each.
+        Equal keys keep insertion order, as with add.
+        """
+        old_keys, old_ids = self.keys, self.watch_ids
+        keys: List[float] = []
+        watch_ids: List[str] = []
+        prev = 0
+        for key, watch_id in sorted(entries, key=itemgetter(0)):
+            # Copy the run of existing watches before this one as a slice
+            pos = bisect_right(old_keys, key, prev)
+            keys += old_keys[prev:pos]
+            watch_ids += old_ids[prev:pos]
+            keys.append(key)
+            watch_ids.append(watch_id)
+            prev = pos
+        keys += old_keys[prev:]
+        watch_ids += old_ids[prev:]
+        self.keys, self.watch_ids = keys, watch_ids
+
+    def remove(self, key: float, watch_id: str) -> None:
+        pos = bisect_left(self.keys, key)
+        while self.watch_ids[pos] != watch_id:
+            pos += 1
+        del self.keys[pos], self.watch_ids[pos]
+
+    def between(self, lo: float, hi: float) -> List[str]:
+        """Watches with keys in [lo, hi], widened by a few ulps for rounding."""
+        return self.watch_ids[
+            bisect_left(self.keys, lo * (1.0 - 1e-12)):bisect_right(self.keys, hi * (1.0 + 1e-12))
+        ]
+
+
+class WatchList:
+    """
+    Price watches over the sites of one SiteRegistry, re-evaluated
+    incrementally as sellers change. Methods that change prices return the
+    alerts they raised (already appended to `feed`).
+    """
+    def __init__(self, registry: SiteRegistry, max_alerts: int = 65536):
+        self.registry = registry
+        self.feed = AlertFeed(max_alerts)
+        self._watches: Dict[str, Watch] = {}
+        self._triggered: Set[str] = set()
+        self._indexes: Dict[Tuple[str, bool], _ThresholdIndex] = {}
+
+    def __len__(self) -> int:
+        return len(self._watches)
+
+    def __contains__(self, watch_id: str) -> bool:
+        return watch_id in self._watches
+
+    # ----- WATCHES -----
+
+    def add(self, watch: Watch) -> WatchStatus:
+        """Add (or replace) a watch on a registered site; raises KeyError for unknown sites."""
+        self._check(watch)
+        if watch.watch_id in self._watches:
+            self.remove(watch.watch_id)
+        tindex = self._index_for(watch.site_id, watch.eaf_only)
+        tindex.add(self._key(watch), watch.watch_id)
+        self._watches[watch.watch_id] = watch
+        if self._is_triggered(watch, tindex):
+            self._triggered.add(watch.watch_id)
+        return self._status(watch, tindex)
+
+    def add_many(self, watches: Sequence[Watch]) -> List[WatchStatus]:
+        """
+        Add (or replace) several watches, with one sorted merge per (site,
+        eaf_only) pair. Raises like add, before any watch is added; a
+        watch_id repeated in the batch keeps its last watch.
+        """
+        for watch in watches:
+            self._check(watch)
+        latest = {watch.watch_id: watch for watch in watches}
+        for watch in latest.values():
+            if watch.watch_id in self._watches:
+                self.remove(watch.watch_id)
+        batches: Dict[Tuple[str, bool], List[Tuple[float, str]]] = {}
+        for watch in latest.values():
+            pair = (watch.site_id, watch.eaf_only)
+            batches.setdefault(pair, []).append((self._key(watch), watch.watch_id))
+            self._watches[watch.watch_id] = watch
+        for pair, entries in batches.items():
+            tindex = self._index_for(*pair)
+            tindex.add_many(entries)
+            for _, watch_id in entries:
+                if self._is_triggered(self._watches[watch_id], tindex):
+                    self._triggered.add(watch_id)
+        return [self._status(w, self._indexes[(w.site_id, w.eaf_only)]) for w in watches]
+
+    def remove(self, watch_id: str) -> None:
+        watch = self._watches.pop(watch_id)
+        self._triggered.discard(watch_id)
+        pair = (watch.site_id, watch.eaf_only)
+        tindex = self._indexes[pair]
+        tindex.remove(self._key(watch), watch_id)
+        if not tindex.keys:
+            del self._indexes[pair]
+
+    def get(self, watch_id: str) -> WatchStatus:
+        watch = self._watches[watch_id]
+        return self._status(watch, self._indexes[(watch.site_id, watch.eaf_only)])
+
+    def watches(self, site_id: Optional[str] = None, owner: Optional[str] = None) -> List[WatchStatus]:
+        return [
+            self._status(w, self._indexes[(w.site_id, w.eaf_only)])
+            for w in self._watches.values()
+            if (site_id is None or w.site_id == site_id) and (owner is None or w.owner == owner)
+        ]
+
+    # ----- INCREMENTAL RE-EVALUATION -----
+
+    def seller_updated(self, index: int) -> List[PriceAlert]:
+        """
+        Re-evaluate after SiteRegistry.update_seller(index). Only pairs
+        whose best effective price moved touch their watches.
+        """
+        alerts: List[PriceAlert] = []
+        for (site_id, eaf_only), tindex in self._indexes.items():
+            table = self.registry.table(site_id)
+            price = table.effective_price[index]
+            eligible = not eaf_only or table.is_eaf[index]
+            old = tindex.best_price
+            if index == tindex.best_index:
+                if eligible and price <= old:
+                    tindex.best_price = price
+                else:
+                    # The winner got dearer or left the EAF pool: someone else may win
+                    self._rescan(tindex, table, eaf_only)
+            elif eligible and (price < old or (price == old and index < tindex.best_index)):
+                tindex.best_index, tindex.best_price = index, price
+            if tindex.best_price != old:
+                alerts.extend(self._reevaluate(tindex, old))
+        return alerts
+
+    def site_refreshed(self, site_id: str) -> List[PriceAlert]:
+        """Re-evaluate a site whose quote table was rebuilt (e.g. re-registered)."""
+        alerts: List[PriceAlert] = []
+        for eaf_only in (False, True):
+            tindex = self._indexes.get((site_id, eaf_only))
+            if tindex is not None:
+                old = tindex.best_price
+                self._rescan(tindex, self.registry.table(site_id), eaf_only)
+                if tindex.best_price != old:
+                    alerts.extend(self._reevaluate(tindex, old))
+        return alerts
+
+    def site_removed(self, site_id: str) -> int:
+        """Drop the watches of an unregistered site; returns how many."""
+        removed = 0
+        for eaf_only in (False, True):
+            tindex = self._indexes.pop((site_id, eaf_only), None)
+            if tindex is None:
+                continue
+            for watch_id in tindex.watch_ids:
+                del self._watches[watch_id]
+                self._triggered.discard(watch_id)
+            removed += len(tindex.watch_ids)
+        return removed
+
+    def _reevaluate(self, tindex: _ThresholdIndex, old_price: float) -> List[PriceAlert]:
+        new_price = tindex.best_price
+        alerts = []
+        for watch_id in tindex.between(min(old_price, new_price), max(old_price, new_price)):
+            watch = self._watches[watch_id]
+            now = self._is_triggered(watch, tindex)
+            if now == (watch_id in self._triggered):
+                continue
+            if now:
+                self._triggered.add(watch_id)
+            else:
+                self._triggered.discard(watch_id)
+            status = self._status(watch, tindex)
+            alerts.append(self.feed.append(
+                "triggered" if now else "cleared", watch, status.net_price_per_ton, status.seller_name,
+            ))
+        return alerts
+
+    # ----- HELPERS -----
+
+    def _check(self, watch: Watch) -> None:
+        if watch.site_id not in self.registry:
+            raise KeyError(watch.site_id)
+        if watch.quantity_tons <= 0:
+            raise ValueError("quantity_tons must be positive")
+
+    def _index_for(self, site_id: str, eaf_only: bool) -> _ThresholdIndex:
+        tindex = self._indexes.get((site_id, eaf_only))
+        if tindex is None:
+            tindex = self._indexes[(site_id, eaf_only)] = _ThresholdIndex()
+            self._rescan(tindex, self.registry.table(site_id), eaf_only)
+        return tindex
+
+    def _multiplier(self, quantity_tons: float) -> float:
+        return 1.0 - self.registry.policy.volume_discount_pct(quantity_tons)
+
+    def _key(self, watch: Watch) -> float:
+        m = self._multiplier(watch.quantity_tons)
+        return watch.threshold_per_ton / m if m > 0 else float("inf")
+
+    def _is_triggered(self, watch: Watch, tindex: _ThresholdIndex) -> bool:
+        if tindex.best_index < 0:
+            return False
+        return tindex.best_price * self._multiplier(watch.quantity_tons) < watch.threshold_per_ton
+
+    def _status(self, watch: Watch, tindex: _ThresholdIndex) -> WatchStatus:
+        if tindex.best_index < 0:
+            return WatchStatus(watch=watch, triggered=False, net_price_per_ton=None, seller_name=None)
+        return WatchStatus(
+            watch=watch,
+            triggered=watch.watch_id in self._triggered,
+            net_price_per_ton=tindex.best_price * self._multiplier(watch.quantity_tons),
+            seller_name=self.registry.sellers[tindex.best_index].name,
+        )
+
+    @staticmethod
+    def _rescan(tindex: _ThresholdIndex, table: SiteQuoteTable, eaf_only: bool) -> None:
+        price = table.effective_price
+        candidates = range(len(price))
+        if eaf_only:
+            candidates = [i for i in candidates if table.is_eaf[i]]
+        # min() keeps the first of equal prices: ties go to the lower index, as in SiteRegistry
+        best = min(candidates, key=price.__getitem__, default=-1)
+        tindex.best_index = best
+        tindex.best_price = price[best] if best >= 0 else float("inf")
@@ -1,441 +1,167 @@
+"""
+Console demo and bulk pricing CLI for the Hot Iron reverse auction.
+
+The pricing formula lives in backend/ (models.py, policy.py); this script
+only drives it, so there is one copy of the rules to keep up to date.
+
+    python pricingformula.py                          # interactive, one order
+    python pricingformula.py bulk orders.csv -o out.csv [--workers N]
+    python pricingformula.py generate --sellers 1000000 --sites 10000 -o data/
+    python pricingformula.py loadtest --url http://127.0.0.1:8000 --rates 50,100,200,400
+    python pricingformula.py snapshot -o hot_iron.snap [--sellers sellers.jsonl] [--addresses sites.jsonl]
+
+Bulk order files are CSV (with a header) or JSONL with `quantity_tons` and
+either `address` or `lat`/`lon`, plus an optional `id`.
+"""
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import List, Protocol, Literal, Tuple
-import math
-import random
-
-
-# ---------- GEO MODEL ----------
-
-@dataclass(frozen=True)
-class Point:
-    """
-    Geographic point in degrees.
-    """
-    lat: float
-    lon: float
-
-    def distance_km_to(self, other: "Point") -> float:
-        """
-        Great-circle distance between two points on Earth using the haversine formula.
-        Returns distance in kilometers.
-        """
-        R = 6371.0  # Earth radius in km
-        lat1 = math.radians(self.lat)
-        lon1 = math.radians(self.lon)
-        lat2 = math.radians(other.lat)
-        lon2 = math.radians(other.lon)
-
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-
-        a = (
-            math.sin(dlat / 2) ** 2
-            + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
-
-
-class Geocoder(Protocol):
-    """
-    Abstraction layer: any geocoder just needs to return a Point.
-    Replace StaticGeocoder with a real geocoding service in production.
-    """
-    def geocode(self, address: str) -> Point:
-        ...
-
-
-class StaticGeocoder:
-    """
-    Very simple geocoder for demos/tests.
-    In production, replace with a real geocoding service.
-    """
-    def __init__(self):
-        self._address_book = {
-            "central us warehouse": Point(41.8781, -87.6298),  # Chicago
-            "chicago, il": Point(41.8781, -87.6298),
-            "pittsburgh, pa": Point(40.4406, -79.9959),
-        }
-
-    def geocode(self, address: str) -> Point:
-        key = address.strip().lower()
-        if key not in self._address_book:
-            raise KeyError(
-                f"Unknown address in StaticGeocoder: {address!r}. "
-                f"Known keys: {list(self._address_book.keys())}"
-            )
-        return self._address_book[key]
-
-
-TransportMode = Literal["truck", "rail", "ocean"]
-
-
-# ---------- SELLER / BID MODEL ----------
-
-@dataclass
-class Seller:
-    name: str
-    location: Point                 # actual geo coords
-    msrp: float                     # nominal price per ton of steel [$/t]
-    base_cost: float                # production cost per ton [$/t], no distance
-    risk_aversion: float            # 1.0–1.5, higher = bigger risk buffer
-    is_eaf: bool                    # True if seller offers EAF-based (green) steel
-
-    def distance_to(self, buyer_location: Point) -> float:
-        return self.location.distance_km_to(buyer_location)
-
-    # ----- MODE-AWARE, COST-SCALED LOGISTICS (distance-based mode) -----
-
-    @staticmethod
-    def choose_transport_mode(distance_km: float) -> TransportMode:
-        """
-        Simple distance-based routing:
-          - ≤ 500 km    -> truck
-          - 500–3000 km -> rail
-          - > 3000 km   -> ocean
-        """
-        if distance_km <= 500:
-            return "truck"
-        elif distance_km <= 3000:
-            return "rail"
-        else:
-            return "ocean"
-
-    def logistics_cost_per_ton(
-        self,
-        distance_km: float,
-    ) -> Tuple[float, TransportMode]:
-        """
-        Logistics cost per ton based on:
-          - distance in km
-          - transport mode (chosen by distance)
-          - base_cost (scaled as a fraction of base_cost per 1000 km)
-
-        Rough calibration (per 1000 km):
-          - truck: ~1% of base_cost per 1000 km
-          - rail:  ~0.5%
-          - ocean: ~0.2%
-        """
-        mode = self.choose_transport_mode(distance_km)
-
-        if mode == "truck":
-            fraction_per_1000km = 0.010  # 1% of base_cost per 1000 km
-        elif mode == "rail":
-            fraction_per_1000km = 0.005  # 0.5%
-        elif mode == "ocean":
-            fraction_per_1000km = 0.002  # 0.2%
-        else:
-            fraction_per_1000km = 0.007  # fallback
-
-        logistics_cost = self.base_cost * fraction_per_1000km * (distance_km / 1000.0)
-        return logistics_cost, mode
-
-    def production_cost(self, buyer_location: Point) -> float:
-        """
-        Cost per ton including distance-based logistics (mode-aware).
-        """
-        distance_km = self.distance_to(buyer_location)
-        logistics_cost, _ = self.logistics_cost_per_ton(distance_km)
-        return self.base_cost + logistics_cost
-
-    def risk_buffer(self) -> float:
-        """
-        Risk buffer per ton based on margin and risk aversion.
-
-        risk_aversion in [1.0, 1.5]:
-          - 1.0  → 0 extra buffer
-          - 1.5  → 50% of baseline margin as extra buffer
-        """
-        baseline_margin = max(self.msrp - self.base_cost, 0)
-        return (self.risk_aversion - 1.0) * baseline_margin
-
-    @staticmethod
-    def volume_discount_pct(quantity_tons: float) -> float:
-        """
-        Simple piecewise volume discount based on order size.
-
-        Returns a fraction in [0, 0.15], e.g. 0.07 = 7% discount.
-        Larger orders monotonically decrease per-ton prices.
-        """
-        if quantity_tons <= 1_000:
-            return 0.00    # no discount
-        elif quantity_tons <= 5_000:
-            return 0.03    # 3%
-        elif quantity_tons <= 20_000:
-            return 0.07    # 7%
-        else:
-            return 0.12    # 12% for very large orders
-
-    def quote_price(
-        self,
-        buyer_location: Point,
-        quantity_tons: float,
-    ) -> dict:
-        """
-        Compute this seller's offer and net price, including:
-          - production + logistics cost
-          - risk buffer
-          - volume discount (all sellers)
-          - EAF discount (if is_eaf == True)
-
-        EAF discount is a flat discount on total price *after* volume discount:
-          eaf_discount_total = risk_aversion * 0.06 * gross_total_after_volume
-        """
-        distance_km = self.distance_to(buyer_location)
-        logistics_cost, mode = self.logistics_cost_per_ton(distance_km)
-
-        # Base cost + logistics
-        cost_per_ton = self.base_cost + logistics_cost
-
-        # Add risk buffer to form offer (per ton, before discounts)
-        buffer_per_ton = self.risk_buffer()
-        offer_price_per_ton = cost_per_ton + buffer_per_ton*0.5
-
-        # Total gross price BEFORE volume discount
-        gross_total_undiscounted = offer_price_per_ton * quantity_tons
-
-        # Volume discount on gross total
-        volume_pct = self.volume_discount_pct(quantity_tons)
-        volume_discount_total = gross_total_undiscounted * volume_pct
-        gross_total_after_volume = gross_total_undiscounted - volume_discount_total
-
-        # EAF discount (if applicable) – applied on volume-discounted total
-        eaf_discount_total = 0.0
-        if self.is_eaf:
-            eaf_discount_total = self.risk_aversion * 0.06 * gross_total_after_volume
-
-        net_total = gross_total_after_volume - eaf_discount_total
-        net_price_per_ton = net_total / quantity_tons
-
-        return {
-            "seller": self.name,
-            "distance_km": distance_km,
-            "transport_mode": mode,
-            "cost_per_ton": cost_per_ton,
-            "risk_buffer_per_ton": buffer_per_ton,
-            "offer_price_per_ton": offer_price_per_ton,
-            "gross_total_undiscounted": gross_total_undiscounted,
-            "volume_discount_pct": volume_pct,
-            "volume_discount_total": volume_discount_total,
-            "gross_total": gross_total_after_volume,
-            "is_eaf": self.is_eaf,
-            "eaf_discount_total": eaf_discount_total,
-            "net_total": net_total,
-            "net_price_per_ton": net_price_per_ton,
-        }
-
-
-@dataclass
-class Bid:
-    seller: Seller
-    distance_km: float
-    transport_mode: TransportMode
-    cost_per_ton: float
-    risk_buffer_per_ton: float
-    offer_price_per_ton: float
-    gross_total_undiscounted: float
-    volume_discount_pct: float
-    volume_discount_total: float
-    gross_total: float
-    is_eaf: bool
-    eaf_discount_total: float
-    net_price_per_ton: float
-    net_total: float
-    quantity_tons: float
-
-    @property
-    def total_net_cost(self) -> float:
-        return self.net_total
-
-
-# ---------- AUCTION LOGIC ----------
-
-def run_reverse_auction(
-    sellers: List[Seller],
-    buyer_location: Point,
-    quantity_tons: float,
-):
-    """
-    Simple reverse auction: each seller submits a price; lowest net price wins.
-    """
-    bids: List[Bid] = []
-
-    for s in sellers:
-        quote = s.quote_price(
-            buyer_location=buyer_location,
-            quantity_tons=quantity_tons,
-        )
-        bid = Bid(
-            seller=s,
-            distance_km=quote["distance_km"],
-            transport_mode=quote["transport_mode"],
-            cost_per_ton=quote["cost_per_ton"],
-            risk_buffer_per_ton=quote["risk_buffer_per_ton"],
-            offer_price_per_ton=quote["offer_price_per_ton"],
-            gross_total_undiscounted=quote["gross_total_undiscounted"],
-            volume_discount_pct=quote["volume_discount_pct"],
-            volume_discount_total=quote["volume_discount_total"],
-            gross_total=quote["gross_total"],
-            is_eaf=quote["is_eaf"],
-            eaf_discount_total=quote["eaf_discount_total"],
-            net_price_per_ton=quote["net_price_per_ton"],
-            net_total=quote["net_total"],
-            quantity_tons=quantity_tons,
+from contextlib import nullcontext
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+
+from backend.models import (  # noqa: F401  (re-exported for existing imports)
+    Point,
+    Geocoder,
+    StaticGeocoder,
+    TransportMode,
+    Seller,
+    Bid,
+    make_default_sellers,
+)
+from backend.auction import run_reverse_auction, run_reverse_auction_for_address  # noqa: F401
+from backend.bulk import BulkStats, ResultWriter, price_order_stream, read_orders
+from backend.loadtest import (
+    DEFAULT_MIX, STEP_HEADER, format_curve, format_step, parse_mix, run_load_curve, write_curve_csv,
+)
+from backend.policy import DEFAULT_COMPILED_POLICY, PricingPolicy
+from backend.routing import make_default_network
+from backend.snapshot import read_addresses_jsonl, write_snapshot
+from backend.synthetic import read_sellers_jsonl, write_sellers_jsonl, write_sites_jsonl
+
+
+# ---------- BULK MODE ----------
+
+def _format_of(path: str, explicit: str | None) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _report(stats: BulkStats) -> None:
+    print(
+        f"\r{stats.rows:,} rows  {stats.errors:,} errors  "
+        f"{stats.rows_per_s:,.0f} rows/s  {stats.elapsed_s:,.1f}s",
+        end="", file=sys.stderr, flush=True,
+    )
+
+
+def run_bulk(args: argparse.Namespace) -> None:
+    policy = DEFAULT_COMPILED_POLICY
+    if args.policy:
+        with open(args.policy) as f:
+            policy = PricingPolicy.from_dict(json.load(f)).compile()
+    network = make_default_network() if args.routed else None
+
+    in_fmt = _format_of(args.input, args.input_format)
+    out_path = args.output or "-"
+    out_fmt = _format_of(out_path, args.output_format)
+
+    with open(args.input, newline="") as fin, \
+            (open(out_path, "w", newline="") if out_path != "-" else nullcontext(sys.stdout)) as fout:
+        stats = price_order_stream(
+            read_orders(fin, in_fmt),
+            ResultWriter(fout, out_fmt),
+            sellers=make_default_sellers(),
+            geocoder=StaticGeocoder(),
+            network=network,
+            policy=policy,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            progress=None if args.quiet else _report,
         )
-        bids.append(bid)
-
-    # Winner is the lowest net price per ton
-    winning_bid = min(bids, key=lambda b: b.net_price_per_ton)
-    return winning_bid, bids
-
-
-def run_reverse_auction_for_address(
-    sellers: List[Seller],
-    buyer_address: str,
-    geocoder: Geocoder,
-    quantity_tons: float,
-):
-    """
-    Convenience wrapper: take a buyer address string, geocode it,
-    then run the auction.
-    """
-    buyer_location = geocoder.geocode(buyer_address)
-    return run_reverse_auction(
-        sellers=sellers,
-        buyer_location=buyer_location,
-        quantity_tons=quantity_tons,
+    if not args.quiet:
+        _report(stats)
+        print(file=sys.stderr)
+
+
+# ---------- SYNTHETIC UNIVERSE ----------
+
+def run_generate(args: argparse.Namespace) -> None:
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    with open(os.path.join(args.output_dir, "sellers.jsonl"), "w") as f:
+        n = write_sellers_jsonl(f, args.sellers, seed=args.seed, eaf_share=args.eaf_share)
+    with open(os.path.join(args.output_dir, "sites.jsonl"), "w") as f:
+        m = write_sites_jsonl(f, args.sites, seed=args.seed)
+    print(
+        f"{n:,} sellers and {m:,} sites (seed {args.seed}) written to {args.output_dir} "
+        f"in {time.perf_counter() - started:,.1f}s",
+        file=sys.stderr,
     )
 
 
-# ---------- DEFAULT SELLERS ----------
-
-def make_default_sellers() -> List[Seller]:
-    """
-    Create steel sellers with hand-tuned parameters.
-
-    Distances are computed in km using lat/lon coordinates.
-    Logistics are mode-aware and scaled as a fraction of base_cost per 1000 km.
-    is_eaf is a rough proxy for whether they offer EAF-based steel.
-
-    All EAF (green) sellers have msrp = 1000 (fixed).
-    Parameters are loosely tuned so that typical net prices end up
-    in the ballpark of recent market HRC levels (~800–900 $/t),
-    before large volume discounts.
-    """
-
-    def jitter(base: float, pct: float = 0.03) -> float:
-        return base * (1 + random.uniform(-pct, pct))
-
-    sellers = [
-        # ----- EAF / GREEN STEEL (msrp = 1000) -----
-        Seller(
-            name="Nucor",
-            location=Point(35.2271, -80.8431),  # Charlotte, US
-            msrp=1000.0,
-            base_cost=780.0,
-            risk_aversion=1.20,
-            is_eaf=True,
-        ),
-        Seller(
-            name="U.S. Steel",
-            location=Point(40.4406, -79.9959),  # Pittsburgh, US
-            msrp=1000.0,
-            base_cost=790.0,
-            risk_aversion=1.30,
-            is_eaf=True,
-        ),
-        Seller(
-            name="ArcelorMittal",
-            location=Point(49.6117, 6.1319),    # Luxembourg
-            msrp=1000.0,
-            base_cost=795.0,
-            risk_aversion=1.25,
-            is_eaf=True,
-        ),
-        Seller(
-            name="Nippon Steel",
-            location=Point(35.6762, 139.6503),  # Tokyo, Japan
-            msrp=1000.0,
-            base_cost=800.0,
-            risk_aversion=1.30,
-            is_eaf=True,
-        ),
-        Seller(
-            name="POSCO",
-            location=Point(36.0190, 129.3435),  # Pohang, Korea
-            msrp=1000.0,
-            base_cost=790.0,
-            risk_aversion=1.28,
-            is_eaf=True,
-        ),
-        Seller(
-            name="Baosteel",
-            location=Point(31.2304, 121.4737),  # Shanghai, China
-            msrp=980.0,
-            base_cost=785.0,
-            risk_aversion=1.22,
-            is_eaf=True,
-        ),
-
-        # ----- NON-EAF / STANDARD STEEL -----
-        Seller(
-            name="Tata Steel",
-            location=Point(22.8046, 86.2029),   # Jamshedpur, India
-            msrp=790.0,
-            base_cost=750.0,
-            risk_aversion=1.35,
-            is_eaf=False,
-        ),
-        Seller(
-            name="Thyssenkrupp",
-            location=Point(51.4352, 6.7627),    # Duisburg, Germany
-            msrp=820.0,
-            base_cost=770.0,
-            risk_aversion=1.32,
-            is_eaf=False,
-        ),
-        Seller(
-            name="Cleveland-Cliffs",
-            location=Point(41.4993, -81.6944),  # Cleveland, US
-            msrp=765.0,
-            base_cost=720.0,
-            risk_aversion=1.30,
-            is_eaf=False,
-        ),
-        Seller(
-            name="JSW Steel",
-            location=Point(15.3490, 74.1230),   # Approx. Vijayanagar, India
-            msrp=720.0,
-            base_cost=670.0,
-            risk_aversion=1.33,
-            is_eaf=False,
-        ),
-        Seller(
-            name="China Steel Corp",
-            location=Point(22.6400, 120.3000),  # Kaohsiung, Taiwan
-            msrp=745.0,
-            base_cost=700.0,
-            risk_aversion=1.27,
-            is_eaf=False,
-        ),
-    ]
-
-    # Add small randomness so the profiles aren't totally rigid
-    for s in sellers:
-        s.base_cost = jitter(s.base_cost, 0.02)
-        # Only jitter msrp for non-EAF sellers; keep green steel at exactly 1000
-        if not s.is_eaf:
-            s.msrp = jitter(s.msrp, 0.02)
-        else:
-            s.msrp = 1000.0
-
-    return sellers
+# ---------- SNAPSHOT ----------
+
+def run_snapshot(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    if args.sellers:
+        with open(args.sellers) as f:
+            sellers = read_sellers_jsonl(f).sellers
+    else:
+        sellers = make_default_sellers()
+    addresses = list(StaticGeocoder().address_book.items())
+    if args.addresses:
+        with open(args.addresses) as f:
+            addresses += read_addresses_jsonl(f)
+    info = write_snapshot(args.output, sellers, addresses)
+    print(
+        f"{info.sellers:,} sellers and {info.addresses:,} addresses -> {info.path} "
+        f"({info.bytes / 1e6:,.1f} MB, id {info.snapshot_id}) in {time.perf_counter() - started:,.1f}s",
+        file=sys.stderr,
+    )
+
+
+# ---------- LOAD TEST ----------
+
+def run_loadtest(args: argparse.Namespace) -> None:
+    rates = [float(r) for r in args.rates.split(",") if r.strip()] * args.repeat
+    mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    print(
+        f"{args.url}: {len(rates)} steps of {args.step_seconds:g}s "
+        f"(+{args.warmup_seconds:g}s warmup), mix {mix}",
+        file=sys.stderr,
+    )
+    print(STEP_HEADER, flush=True)
+    results = run_load_curve(
+        args.url,
+        rates,
+        step_seconds=args.step_seconds,
+        warmup_seconds=args.warmup_seconds,
+        mix=mix,
+        seed=args.seed,
+        max_in_flight=args.max_in_flight,
+        timeout_s=args.timeout,
+        stop_error_rate=args.stop_error_rate,
+        stop_p99_ms=args.stop_p99_ms,
+        on_step=lambda result: print(format_step(result), flush=True),
+    )
+    print()
+    print(format_curve(results))
+    if args.output:
+        with open(args.output, "w") as f:
+            if _format_of(args.output, None) == "jsonl":
+                for result in results:
+                    f.write(json.dumps(dataclasses.asdict(result)) + "\n")
+            else:
+                write_curve_csv(f, results)
 
 
 # ---------- DEMO WITH CONSOLE INPUT ----------
 
-if __name__ == "__main__":
+def run_interactive() -> None:
     geocoder = StaticGeocoder()
     sellers = make_default_sellers()
 
@@ -494,3 +220,62 @@ if __name__ == "__main__":
         f"${winner.net_price_per_ton:.2f}/t "
         f"for total net cost ${winner.total_net_cost:,.0f}"
     )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    sub = parser.add_subparsers(dest="command")
+    bulk = sub.add_parser("bulk", help="price an order file (CSV or JSONL)")
+    bulk.add_argument("input", help="order file")
+    bulk.add_argument("-o", "--output", help="result file (default: stdout)")
+    bulk.add_argument("--input-format", choices=("csv", "jsonl"), help="default: from extension")
+    bulk.add_argument("--output-format", choices=("csv", "jsonl"), help="default: from extension")
+    bulk.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    bulk.add_argument("--chunk-size", type=int, default=2000, help="orders per chunk")
+    bulk.add_argument("--policy", help="pricing policy JSON file (see PricingPolicy.from_dict)")
+    bulk.add_argument("--routed", action="store_true", help="use routed (multimodal) logistics")
+    bulk.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+
+    gen = sub.add_parser("generate", help="write a seeded synthetic seller / buyer-site universe")
+    gen.add_argument("--sellers", type=int, default=1_000_000, help="number of sellers")
+    gen.add_argument("--sites", type=int, default=10_000, help="number of buyer sites")
+    gen.add_argument("--seed", type=int, default=0)
+    gen.add_argument("--eaf-share", type=float, default=6 / 11, help="fraction of EAF sellers")
+    gen.add_argument("-o", "--output-dir", default=".", help="directory for sellers.jsonl and sites.jsonl")
+
+    load = sub.add_parser("loadtest", help="open-loop load steps against a running server")
+    load.add_argument("--url", default="http://127.0.0.1:8000", help="server root")
+    load.add_argument("--rates", default="25,50,100,200", help="offered requests/s per step, comma-separated")
+    load.add_argument("--repeat", type=int, default=1, help="run the rate list this many times (soak)")
+    load.add_argument("--step-seconds", type=float, default=30.0, help="measured seconds per step")
+    load.add_argument("--warmup-seconds", type=float, default=5.0, help="unmeasured seconds before each step")
+    load.add_argument("--mix", help="kind=weight,... over auction_coords, auction_address, "
+                                    "auction_by_address, sellers, sellers_conditional")
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--max-in-flight", type=int, default=256, help="client threads")
+    load.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    load.add_argument("--stop-error-rate", type=float, help="stop after a step above this error rate (0-1)")
+    load.add_argument("--stop-p99-ms", type=float, help="stop after a step above this p99 latency")
+    load.add_argument("-o", "--output", help="curve file, CSV or JSONL (by extension)")
+
+    snap = sub.add_parser("snapshot", help="compile a seller / address snapshot for HOT_IRON_SNAPSHOT")
+    snap.add_argument("-o", "--output", default="hot_iron.snap", help="snapshot file")
+    snap.add_argument("--sellers", help="seller JSONL (GET /sellers fields; default: built-in sellers)")
+    snap.add_argument("--addresses", help="address JSONL with address (or site_id), lat, lon; "
+                                          "added to the built-in address book")
+    args = parser.parse_args(argv)
+
+    if args.command == "bulk":
+        run_bulk(args)
+    elif args.command == "generate":
+        run_generate(args)
+    elif args.command == "loadtest":
+        run_loadtest(args)
+    elif args.command == "snapshot":
+        run_snapshot(args)
+    else:
+        run_interactive()
+
+
+if __name__ == "__main__":
+    main()